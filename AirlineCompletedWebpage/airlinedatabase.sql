@@ -103,7 +103,13 @@ CREATE TABLE flights (
     FOREIGN KEY (pilot_first_officer_id) REFERENCES pilots(pilot_id),
     INDEX idx_flight_number (flight_number),
     INDEX idx_status (flight_status),
-    INDEX idx_departure_time (scheduled_departure_time)
+    INDEX idx_departure_time (scheduled_departure_time),
+    INDEX idx_status_departure (flight_status, scheduled_departure_time),
+    INDEX idx_departure_board (departure_airport_id, scheduled_departure_time),
+    INDEX idx_arrival_board (arrival_airport_id, scheduled_arrival_time),
+    INDEX idx_pilot_command_schedule (pilot_command_id, scheduled_departure_time, scheduled_arrival_time),
+    INDEX idx_pilot_first_officer_schedule (pilot_first_officer_id, scheduled_departure_time, scheduled_arrival_time),
+    INDEX idx_aircraft_rotation (aircraft_id, scheduled_departure_time, scheduled_arrival_time)
 );
 
 -- Table > Flight Crew Assignment.
@@ -112,11 +118,28 @@ CREATE TABLE flight_crew_assignment (
     assignment_id INT PRIMARY KEY AUTO_INCREMENT,
     flight_id INT NOT NULL,
     crew_member_id INT NOT NULL,
+    -- Copy of flights.scheduled_departure_time, kept by the triggers below.
+    scheduled_departure_time DATETIME NOT NULL,
     FOREIGN KEY (flight_id) REFERENCES flights(flight_id) ON DELETE CASCADE,
     FOREIGN KEY (crew_member_id) REFERENCES cabincrew(crew_member_id),
-    UNIQUE KEY unique_flight_crew (flight_id, crew_member_id)
+    UNIQUE KEY unique_flight_crew (flight_id, crew_member_id),
+    INDEX idx_crew_schedule (crew_member_id, scheduled_departure_time, flight_id)
 );
 
+-- Triggers > Crew assignment departure time.
+-- ==========================================
+CREATE TRIGGER crew_assignment_departure BEFORE INSERT ON flight_crew_assignment
+FOR EACH ROW
+    SET NEW.scheduled_departure_time =
+        (SELECT scheduled_departure_time FROM flights WHERE flight_id = NEW.flight_id);
+
+CREATE TRIGGER flight_departure_to_crew AFTER UPDATE ON flights
+FOR EACH ROW
+    UPDATE flight_crew_assignment
+    SET scheduled_departure_time = NEW.scheduled_departure_time
+    WHERE flight_id = NEW.flight_id
+      AND scheduled_departure_time <> NEW.scheduled_departure_time;
+
 -- Table > Flight Plans.
 -- =====================
 CREATE TABLE flight_plans (
@@ -132,7 +155,9 @@ CREATE TABLE flight_plans (
     FOREIGN KEY (flight_id) REFERENCES flights(flight_id) ON DELETE CASCADE,
     FOREIGN KEY (departure_airport_id) REFERENCES airports(airport_id),
     FOREIGN KEY (arrival_airport_id) REFERENCES airports(airport_id),
-    FOREIGN KEY (alternate_airport_id) REFERENCES airports(airport_id)
+    FOREIGN KEY (alternate_airport_id) REFERENCES airports(airport_id),
+    INDEX idx_plan_departure (scheduled_departure_time),
+    INDEX idx_plan_approval (approved_by_authority, scheduled_departure_time)
 );
 
 -- Table > Aircraft Parking.
@@ -146,7 +171,8 @@ CREATE TABLE aircraft_parking (
     aircraft_id INT,
     FOREIGN KEY (airport_id) REFERENCES airports(airport_id) ON DELETE CASCADE,
     FOREIGN KEY (aircraft_id) REFERENCES aircraft(aircraft_id) ON DELETE SET NULL,
-    UNIQUE KEY unique_location (airport_id, location_identifier)
+    UNIQUE KEY unique_location (airport_id, location_identifier),
+    UNIQUE KEY unique_parked_aircraft (aircraft_id)
 );
 
 -- Table > Maintenance Hangars.
@@ -172,10 +198,36 @@ CREATE TABLE maintenance_events (
     maintenance_status ENUM('Scheduled', 'InProgress', 'Completed', 'Canceled', 'Deferred', 'OnHold') NOT NULL DEFAULT 'Scheduled',
     description TEXT,
     cost DECIMAL(10,2),
+    duration_minutes INT GENERATED ALWAYS AS (TIMESTAMPDIFF(MINUTE, start_date_time, end_date_time)) STORED,
     FOREIGN KEY (aircraft_id) REFERENCES aircraft(aircraft_id) ON DELETE CASCADE,
     FOREIGN KEY (hangar_id) REFERENCES maintenance_hangars(hangar_id) ON DELETE SET NULL,
     INDEX idx_status (maintenance_status),
-    INDEX idx_aircraft (aircraft_id)
+    INDEX idx_aircraft (aircraft_id),
+    INDEX idx_start_time (start_date_time),
+    INDEX idx_duration (duration_minutes),
+    INDEX idx_open_events (end_date_time, start_date_time),
+    INDEX idx_aircraft_completed (aircraft_id, maintenance_status, end_date_time)
+);
+
+-- Table > Maintenance Totals.
+-- ===========================
+-- Event count, total cost and last completed event per aircraft, kept up
+-- to date by the API's maintenance handlers.
+CREATE TABLE maintenance_totals (
+    aircraft_id INT PRIMARY KEY,
+    event_count INT NOT NULL DEFAULT 0,
+    total_cost DECIMAL(14,2) NOT NULL DEFAULT 0,
+    last_completed_event_id INT,
+    FOREIGN KEY (aircraft_id) REFERENCES aircraft(aircraft_id) ON DELETE CASCADE,
+    FOREIGN KEY (last_completed_event_id) REFERENCES maintenance_events(maintenance_event_id) ON DELETE SET NULL
+);
+
+-- Table > Table Versions.
+-- ========================
+-- Change counter per table, used by the API for ETags.
+CREATE TABLE table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0
 );
 
 -- =========================================
@@ -265,6 +317,25 @@ INSERT INTO flight_plans (flight_id, departure_airport_id, arrival_airport_id, a
 (2, 3, 4, 1, '2025-11-17 14:30:00', '2025-11-17 16:00:00', true, 'Route MAD-CDG airway UN871'),
 (3, 5, 2, 1, '2025-11-16 10:30:00', '2025-11-16 13:00:00', true, 'Route ORD-LAX waypoints ACITO-ROCKIES-BARSTOW');
 
+-- MAINTENANCE TOTALS
+INSERT INTO maintenance_totals (aircraft_id, event_count, total_cost, last_completed_event_id)
+SELECT
+    e.aircraft_id,
+    COUNT(*),
+    COALESCE(SUM(e.cost), 0),
+    (SELECT c.maintenance_event_id FROM maintenance_events c
+     WHERE c.aircraft_id = e.aircraft_id AND c.maintenance_status = 'Completed'
+     ORDER BY c.end_date_time DESC, c.maintenance_event_id DESC
+     LIMIT 1)
+FROM maintenance_events e
+GROUP BY e.aircraft_id;
+
+-- TABLE VERSIONS
+INSERT INTO table_versions (table_name) VALUES
+('pilots'), ('cabincrew'), ('airports'), ('aircraft'), ('flights'),
+('flight_crew_assignment'), ('flight_plans'), ('aircraft_parking'),
+('maintenance_hangars'), ('maintenance_events');
+
 -- ==============================================
 --   IMPORTANT VIEWS FOR REPORTING AND ANALYSIS  
 -- ==============================================
@@ -1,15 +1,41 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, g, has_request_context, Response, stream_with_context, make_response
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import mysql.connector
 from mysql.connector import Error
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from decimal import Decimal
+from contextlib import nullcontext
+from functools import wraps
+import hashlib
+import io
+import json
+import logging
 import os
+import tempfile
+import threading
+import time
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from db_pool import ConnectionPool
+from pagination import parse_page_args, keyset_condition, encode_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from serializers import row_serializer, serialize_rows, get_encoder
+from bulk_import import IMPORT_SPECS, DEFAULT_CHUNK_SIZE, read_records, import_records
+from refdata import ReferenceData
+from parking import ParkingOccupancy, PARKING_COLUMNS
+from schedule_conflicts import (ScheduleIndex, BatchConflicts, flight_interval, parse_time, INACTIVE_STATUSES,
+                                MAX_FLIGHT_DURATION, PILOT, CREW)
+from rotations import LEG_COLUMNS, build_rotations
+from geo import DistanceMatrix, AirportIndex, block_minutes
+from sql_metrics import RequestStats, InstrumentedCursor
+from metrics import Registry, Counter, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from compression import StaticAssets, IMMUTABLE_CACHE_CONTROL, negotiate, compressible, compress
 
 app = Flask(__name__, 
             static_folder='../frontend',
             static_url_path='')
-CORS(app)
+# X-Next-Cursor carries the next page of the collection routes.
+CORS(app, expose_headers=['X-Next-Cursor'])
 
 # ====================================
 # ==     DATABASE CONFIGURATION     ==
@@ -22,16 +48,181 @@ DB_CONFIG = {
     'port': 3306
 }
 
+# Connection pool settings (timeout / max_lifetime in seconds).
+POOL_CONFIG = {
+    'size': 5,
+    'max_overflow': 10,
+    'timeout': 10,
+    'validate': True,
+    'max_lifetime': 1800
+}
+
+# Requests that wait longer than this for a connection are logged.
+POOL_WAIT_WARNING = 0.5
+
+# SQL instrumentation (see sql_metrics.py). Statements slower than
+# SLOW_QUERY_THRESHOLD seconds go to the slow query log, and a request
+# that runs the same statement N_PLUS_ONE_THRESHOLD times or more is
+# logged as an N+1 pattern. The log is JSON lines on stderr, or in
+# SLOW_QUERY_LOG_FILE when set.
+SLOW_QUERY_THRESHOLD = 0.2
+N_PLUS_ONE_THRESHOLD = 10
+SLOW_QUERY_LOG_FILE = None
+
+slow_query_log = logging.getLogger('airline.sql')
+if SLOW_QUERY_LOG_FILE:
+    slow_query_log.addHandler(logging.FileHandler(SLOW_QUERY_LOG_FILE))
+
+def instrument_cursor(cursor):
+    """ Count and time the statements of the request being served """
+    stats = g.get('sql_stats') if has_request_context() else None
+    return InstrumentedCursor(cursor, stats) if stats is not None else cursor
+
+db_pool = ConnectionPool(DB_CONFIG, cursor_wrapper=instrument_cursor, **POOL_CONFIG)
+
+# Airports and aircraft kept in memory (see refdata.py).
+reference_data = ReferenceData(db_pool)
+
+# Stand occupancy per airport, updated by the parking handlers (see parking.py).
+parking_occupancy = ParkingOccupancy(db_pool)
+
+# Flights of every pilot and crew member, to refuse double bookings
+# (see schedule_conflicts.py).
+schedule_index = ScheduleIndex(db_pool)
+
+# Where the airport distance matrix is cached (see geo.py).
+GEO_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'airline-geo')
+distance_matrix = DistanceMatrix(GEO_CACHE_DIR)
+airport_index = AirportIndex()
+
+# Defaults of the alternate airport suggestions (radius in km).
+ALTERNATE_COUNT = 3
+ALTERNATE_RADIUS_KM = 500
+
+# Encoder behind jsonify (see serializers.py): 'json' keeps Flask's own,
+# 'orjson' encodes rows with native datetime / Decimal support.
+JSON_ENCODER = 'json'
+
+# Compression of /api responses (see compression.py). Bodies smaller than
+# COMPRESSION_MIN_SIZE bytes are sent as they are; the levels trade CPU
+# for size (gzip 1-9, brotli 0-11).
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_LEVELS = {'br': 4, 'gzip': 6}
+
+# Frontend files, precompressed and fingerprinted (see compression.py).
+static_assets = StaticAssets(app.static_folder)
+
+# Seconds a computed /api/dashboard payload is reused (0 = no cache).
+DASHBOARD_CACHE_TTL = 10
+
+# /api/maintenance/window scans closed events by start_date_time from this
+# many minutes before the window; longer events are found by duration.
+MAINTENANCE_WINDOW_SCAN_MINUTES = 7 * 24 * 60
+
 # ====================================
 # ==       AUXILIAR FUNCTIONS       ==
 # ====================================
+class EncoderJSONProvider(DefaultJSONProvider):
+    """
+    jsonify / app.json through a serializers.py encoder (the 'json' one
+    keeps Flask's own output). Encoding time counts as serialization.
+    """
+
+    def __init__(self, app, encoder):
+        super().__init__(app)
+        self.encoder = encoder
+
+    def dumps(self, obj, **kwargs):
+        if not self.encoder.native:
+            return super().dumps(obj, **kwargs)
+        return self.encoder.dumps(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        with serialization_timer():
+            if not self.encoder.native:
+                return super().response(*args, **kwargs)
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(self.encoder.dumps(obj) + b'\n', mimetype=self.mimetype)
+
+json_encoder = get_encoder(JSON_ENCODER)
+app.json = EncoderJSONProvider(app, json_encoder)
+
 def get_db_connection():
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
+        connection = db_pool.get_connection()
     except Error as e:
         print(f"ERROR: Error while connecting to MYSQL: {e}")
         return None
+    if connection.wait_time > POOL_WAIT_WARNING:
+        print(f"WARNING: Waited {connection.wait_time:.3f}s for a database connection.")
+    g.setdefault('db_connections', []).append(connection)
+    g.pool_wait = g.get('pool_wait', 0.0) + connection.wait_time
+    return connection
+
+@app.before_request
+def start_sql_stats():
+    g.sql_stats = RequestStats(SLOW_QUERY_THRESHOLD)
+
+@app.after_request
+def add_pool_wait_header(response):
+    if 'pool_wait' in g:
+        response.headers['X-DB-Pool-Wait'] = f"{g.pool_wait * 1000:.2f}ms"
+    return response
+
+@app.after_request
+def add_server_timing_header(response):
+    stats = g.get('sql_stats')
+    if stats is not None:
+        response.headers['Server-Timing'] = stats.server_timing(g.get('pool_wait', 0.0))
+    return response
+
+@app.teardown_request
+def log_sql_stats(exception=None):
+    """ Slow statements and N+1 patterns of the request, as JSON lines """
+    stats = g.get('sql_stats')
+    if stats is None:
+        return
+    route = request.url_rule.rule if request.url_rule else request.path
+    for entry in stats.slow:
+        slow_query_log.warning(json.dumps({'event': 'slow_query', 'method': request.method,
+                                           'route': route, **entry}, sort_keys=True))
+    for sql, count, seconds in stats.repeated(N_PLUS_ONE_THRESHOLD):
+        slow_query_log.warning(json.dumps({'event': 'n_plus_one', 'method': request.method, 'route': route,
+                                           'sql': sql, 'count': count,
+                                           'duration_ms': round(seconds * 1000, 2)}, sort_keys=True))
+
+def serialization_timer(rows=0):
+    stats = g.get('sql_stats') if has_request_context() else None
+    return stats.serializing(rows) if stats is not None else nullcontext()
+
+@app.after_request
+def compress_response(response):
+    """ gzip / brotli for /api responses of COMPRESSION_MIN_SIZE bytes or more """
+    if (not request.path.startswith('/api') or response.status_code != 200
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or not compressible(response.mimetype)):
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESSION_MIN_SIZE:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+    response.set_data(compress(data, encoding, COMPRESSION_LEVELS[encoding]))
+    response.headers['Content-Encoding'] = encoding
+    etag, _ = response.get_etag()
+    if etag:
+        # Same content in another encoding: only weakly equal.
+        response.set_etag(etag, weak=True)
+    return response
+
+@app.teardown_request
+def release_db_connections(exception=None):
+    # Handlers that fail half way do not always close their connection;
+    # give everything checked out during the request back to the pool.
+    for connection in g.pop('db_connections', []):
+        connection.close()
 
 def serialize_result(obj):
     if isinstance(obj, (datetime, date)):
@@ -41,18 +232,426 @@ def serialize_result(obj):
     return obj
 
 def format_results(cursor, data):
-    columns = [column[0] for column in cursor.description]
-    results = []
-    for row in data:
-        results.append(dict(zip(columns, [serialize_result(item) for item in row])))
-    return results
+    with serialization_timer(len(data)):
+        return serialize_rows(cursor.description, data)
+
+# Max number of ids sent in a single IN (...) list.
+IN_BATCH_SIZE = 1000
+
+def decorate_flights(cursor, flights):
+    """
+    Add airport codes and tail number from the in-memory reference data
+    (instead of joining airports / aircraft) and the cabin crew
+    """
+    add_flight_codes(flights)
+    add_stage_lengths(flights)
+    attach_crew_members(cursor, flights)
+
+def add_flight_codes(flights):
+    """ Set departure / arrival IATA codes and tail number from the reference data """
+    for flight in flights:
+        departure = reference_data.airport(flight['departure_airport_id'])
+        arrival = reference_data.airport(flight['arrival_airport_id'])
+        aircraft = reference_data.aircraft(flight['aircraft_id'])
+        flight['departure_airport'] = departure['iata_code'] if departure else None
+        flight['arrival_airport'] = arrival['iata_code'] if arrival else None
+        flight['aircraft'] = aircraft['tail_number'] if aircraft else None
+
+def add_stage_lengths(flights):
+    """ Great-circle stage length and estimated block time of every flight """
+    distances = distance_matrix.distances(
+        reference_data.airports(),
+        [(flight['departure_airport_id'], flight['arrival_airport_id']) for flight in flights]
+    )
+    for flight, distance in zip(flights, distances):
+        flight['stage_length_km'] = distance
+        flight['estimated_block_minutes'] = block_minutes(distance)
+
+def attach_crew_members(cursor, flights):
+    """ Set flight['crew_members'] on every flight of the list """
+    crew_by_flight = fetch_crew_by_flight(cursor, [flight['flight_id'] for flight in flights])
+    for flight in flights:
+        flight['crew_members'] = crew_by_flight.get(flight['flight_id'], [])
+
+CREW_BY_FLIGHT_QUERY = """
+    SELECT 
+        fca.flight_id,
+        cc.crew_member_id,
+        cc.first_name,
+        cc.last_name,
+        cc.current_role
+    FROM flight_crew_assignment fca
+    JOIN cabincrew cc ON fca.crew_member_id = cc.crew_member_id
+    WHERE fca.flight_id IN ({placeholders})
+    ORDER BY fca.flight_id, fca.assignment_id
+"""
+
+def fetch_crew_by_flight(cursor, flight_ids):
+    """ Cabin crew of many flights in one query per batch, grouped by flight_id """
+    crew_by_flight = {}
+    for start in range(0, len(flight_ids), IN_BATCH_SIZE):
+        batch = flight_ids[start:start + IN_BATCH_SIZE]
+        cursor.execute(CREW_BY_FLIGHT_QUERY.format(placeholders=', '.join(['%s'] * len(batch))), tuple(batch))
+        group_crew_rows(crew_by_flight, cursor.fetchall())
+    return crew_by_flight
+
+def group_crew_rows(crew_by_flight, rows):
+    for flight_id, crew_member_id, first_name, last_name, current_role in rows:
+        crew_by_flight.setdefault(flight_id, []).append({
+            'crew_member_id': crew_member_id,
+            'first_name': first_name,
+            'last_name': last_name,
+            'current_role': current_role
+        })
+
+def build_collection_query(select_query, order_columns, filters, descending=False, paginate=True,
+                           fixed=(), default_limit=DEFAULT_PAGE_SIZE):
+    """
+    Add the filters and the keyset page asked for in the query string to
+    `select_query`. `filters` maps a query-string argument to a SQL
+    condition with one placeholder; `fixed` holds (condition, value) pairs
+    that always apply. Without ?limit= a page holds `default_limit` rows
+    (at most MAX_PAGE_SIZE); the whole collection is read by following
+    X-Next-Cursor or with ?stream=. Returns (query, params, limit).
+    """
+    conditions = [condition for condition, _ in fixed]
+    params = [value for _, value in fixed]
+    for arg, condition in filters.items():
+        value = request.args.get(arg)
+        if value not in (None, ''):
+            conditions.append(condition)
+            params.append(value)
+
+    limit, after = parse_page_args(request.args, len(order_columns)) if paginate else (None, None)
+    if paginate and limit is None:
+        limit = min(default_limit, MAX_PAGE_SIZE)
+    if after is not None:
+        condition, values = keyset_condition(order_columns, after, descending)
+        conditions.append(condition)
+        params.extend(values)
+
+    query = select_query
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    direction = " DESC" if descending else ""
+    query += " ORDER BY " + ", ".join(column + direction for column in order_columns)
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit + 1)
+    return query, tuple(params), limit
+
+def query_collection(cursor, select_query, order_columns, filters, descending=False,
+                     fixed=(), default_limit=DEFAULT_PAGE_SIZE):
+    """ Filtered, optionally paginated collection. Returns (rows, next_cursor) """
+    query, params, limit = build_collection_query(select_query, order_columns, filters, descending,
+                                                  fixed=fixed, default_limit=default_limit)
+    cursor.execute(query, params)
+    # Collections go straight to jsonify: dates and decimals can be left
+    # to a native encoder.
+    data = cursor.fetchall()
+    with serialization_timer(len(data)):
+        rows = serialize_rows(cursor.description, data, json_encoder.native)
+    return page_rows(rows, limit, order_columns)
+
+def page_rows(rows, limit, order_columns):
+    """ Cut the extra row fetched by the LIMIT; returns (rows, next_cursor) """
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        keys = [column.split('.')[-1] for column in order_columns]
+        next_cursor = encode_cursor([serialize_result(rows[-1][key]) for key in keys])
+    return rows, next_cursor
+
+# Rows pulled from the server per fetchmany() while streaming.
+STREAM_CHUNK_SIZE = 1000
+
+def stream_collection(connection, cursor, select_query, order_columns, filters,
+                      descending=False, decorate=None):
+    """
+    Stream a filtered collection as a JSON array (?stream=json) or as
+    NDJSON (?stream=ndjson). Rows are read from the unbuffered cursor in
+    chunks and written out as they arrive, so memory does not grow with
+    the table. `decorate(side_cursor, rows)` can add data to each chunk;
+    it gets a cursor on a second connection because the first one is
+    busy with the pending result set.
+    """
+    fmt = request.args.get('stream')
+    if fmt not in ('json', 'ndjson'):
+        raise ValueError("stream must be 'json' or 'ndjson'.")
+    ndjson = fmt == 'ndjson'
+
+    query, params, _ = build_collection_query(select_query, order_columns, filters,
+                                              descending, paginate=False)
+    cursor.execute(query, params)
+    serialize = row_serializer(cursor.description, json_encoder.native)
+    side_connection = get_db_connection() if decorate else None
+    if decorate and not side_connection:
+        raise Error('Failed to establish a database connection.')
+
+    def generate():
+        side_cursor = side_connection.cursor() if side_connection else None
+        try:
+            first = True
+            if not ndjson:
+                yield '['
+            while True:
+                chunk = cursor.fetchmany(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                with serialization_timer(len(chunk)):
+                    rows = [serialize(row) for row in chunk]
+                if decorate:
+                    decorate(side_cursor, rows)
+                with serialization_timer():
+                    if ndjson:
+                        body = ''.join(app.json.dumps(row) + '\n' for row in rows)
+                    else:
+                        body = ','.join(app.json.dumps(row) for row in rows)
+                        body = body if first else ',' + body
+                        first = False
+                yield body
+            if not ndjson:
+                yield ']'
+        finally:
+            cursor.close()
+            connection.close()
+            if side_connection:
+                side_cursor.close()
+                side_connection.close()
+
+    mimetype = 'application/x-ndjson' if ndjson else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+def collection_response(rows, next_cursor):
+    """ JSON list response; the next page cursor travels in X-Next-Cursor """
+    response = jsonify(rows)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+# Query string filters of the collection routes (also served by asgi_app.py).
+PERSON_FILTERS = {
+    'status': "employment_status = %s",
+    'license_number': "license_number = %s"
+}
+
+AIRCRAFT_FILTERS = {
+    'status': "status = %s",
+    'tail_number': "tail_number = %s",
+    'base_airport_id': "assigned_base_airport_id = %s"
+}
+
+AIRPORT_FILTERS = {
+    'iata_code': "iata_code = %s",
+    'icao_code': "icao_code = %s"
+}
+
+FLIGHT_LIST_QUERY = """
+    SELECT 
+        f.flight_id,
+        f.flight_number,
+        f.scheduled_departure_time,
+        f.scheduled_arrival_time,
+        f.flight_status,
+        f.aircraft_id,
+        f.departure_airport_id,
+        f.arrival_airport_id,
+        f.pilot_command_id,
+        f.pilot_first_officer_id
+    FROM flights f
+"""
+
+FLIGHT_LIST_ORDER = ['f.scheduled_departure_time', 'f.flight_id']
+
+FLIGHT_FILTERS = {
+    'status': "f.flight_status = %s",
+    'flight_number': "f.flight_number = %s",
+    'departure_airport_id': "f.departure_airport_id = %s",
+    'arrival_airport_id': "f.arrival_airport_id = %s",
+    'aircraft_id': "f.aircraft_id = %s",
+    'date_from': "f.scheduled_departure_time >= %s",
+    'date_to': "f.scheduled_departure_time < %s"
+}
+
+# Columns of maintenance_events in API responses. duration_minutes
+# (migration 005) only serves the window query's index; it is not part of
+# the public shape, so the table is never read with SELECT *.
+MAINTENANCE_QUERY = """
+    SELECT maintenance_event_id, aircraft_id, hangar_id, maintenance_type,
+           start_date_time, end_date_time, maintenance_status, description, cost
+    FROM maintenance_events
+"""
+
+def parse_id(value, field):
+    """ Validate one id from a JSON body: an integer or a string of digits """
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f"{field} must be a positive integer id.")
+    return value
+
+def parse_id_list(value, field):
+    """ Validate a JSON list of ids; duplicates are dropped, order is kept """
+    if not isinstance(value, list):
+        raise ValueError(f"{field} must be a list of ids.")
+    ids = []
+    for item in value:
+        if isinstance(item, bool) or not isinstance(item, int):
+            raise ValueError(f"{field} must only contain integer ids.")
+        if item not in ids:
+            ids.append(item)
+    return ids
+
+def insert_crew_assignments(cursor, pairs, keep_existing=False):
+    """
+    Insert (flight_id, crew_member_id) pairs with one multi-row INSERT per
+    batch. With keep_existing, pairs that are already assigned are left as
+    they are instead of failing on the unique key.
+    """
+    for start in range(0, len(pairs), IN_BATCH_SIZE):
+        batch = pairs[start:start + IN_BATCH_SIZE]
+        query = ("INSERT INTO flight_crew_assignment (flight_id, crew_member_id) VALUES "
+                 + ', '.join(['(%s, %s)'] * len(batch)))
+        if keep_existing:
+            query += " ON DUPLICATE KEY UPDATE flight_id = flight_id"
+        cursor.execute(query, tuple(value for pair in batch for value in pair))
+
+def delete_crew_assignments(cursor, pairs):
+    """ Delete (flight_id, crew_member_id) pairs in batches; returns rows removed """
+    removed = 0
+    for start in range(0, len(pairs), IN_BATCH_SIZE):
+        batch = pairs[start:start + IN_BATCH_SIZE]
+        cursor.execute(
+            "DELETE FROM flight_crew_assignment WHERE (flight_id, crew_member_id) IN ("
+            + ', '.join(['(%s, %s)'] * len(batch)) + ")",
+            tuple(value for pair in batch for value in pair)
+        )
+        removed += cursor.rowcount
+    return removed
+
+def bump_table_versions(connection, *tables):
+    """
+    Increase the change counter of `tables` in the current transaction, so
+    cached GET responses (ETag) built from them are no longer valid. Uses
+    its own cursor to leave lastrowid / rowcount of the caller's alone.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "UPDATE table_versions SET version = version + 1 WHERE table_name IN ("
+            + ', '.join(['%s'] * len(tables)) + ")",
+            tables
+        )
+    except Error as e:
+        # Missing migration 002: the write itself must still go through.
+        print(f"WARNING: Could not bump table versions: {e}")
+    finally:
+        cursor.close()
+
+def table_versions_query(tables):
+    return ("SELECT table_name, version FROM table_versions WHERE table_name IN ("
+            + ', '.join(['%s'] * len(tables)) + ")")
+
+def table_versions_etag(tables, extra=''):
+    """ ETag for the current request from the version counters of `tables` """
+    connection = get_db_connection()
+    if not connection:
+        raise Error('Failed to establish a database connection.')
+    cursor = connection.cursor()
+    cursor.execute(table_versions_query(tables), tables)
+    versions = cursor.fetchall()
+    cursor.close()
+    connection.close()
+    return versions_etag(tables, versions, extra)
+
+def versions_etag(tables, versions, extra=''):
+    versions = sorted(versions)
+    if len(versions) != len(tables):
+        raise Error('table_versions is missing rows.')
+    g.table_versions = dict(versions)
+    key = f"{request.full_path}|{versions}|{extra}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def conditional(*tables, key=None):
+    """
+    Conditional GET: answer 304 Not Modified without running the view when
+    If-None-Match still matches the version of every table the response is
+    built from. `key(**view_args)` can add anything else the response
+    depends on.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                etag = table_versions_etag(tables, key(**kwargs) if key else '')
+            except Error:
+                return view(*args, **kwargs)
+            g.etag = etag
+            if request.if_none_match.contains_weak(etag):
+                cache_requests.inc(cache='conditional_get', result='hit')
+                return not_modified(etag)
+            cache_requests.inc(cache='conditional_get', result='miss')
+            sync_caches()
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+def sync_caches():
+    """
+    The ETag names the table versions just read (g.table_versions), but
+    reference_data and parking_occupancy may still hold rows from before a
+    write made by another worker: drop those so the body matches the ETag.
+    """
+    versions = g.get('table_versions')
+    if versions:
+        reference_data.sync(versions)
+        parking_occupancy.sync(versions)
+
+def not_modified(etag):
+    """
+    304 for a matching If-None-Match, with the headers of the 200 it stands
+    for: compress_response sends W/ ETags for compressed bodies, so the tag
+    is echoed in the form the client holds, and Vary: Accept-Encoding
+    """
+    response = Response(status=304)
+    response.set_etag(etag, weak=not request.if_none_match.contains(etag))
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 # ====================================
 # ==           MAIN ROUTE           ==
 # ====================================
 @app.route('/')
 def index():
-    return send_from_directory(app.static_folder, 'index.html')
+    return static_response('index.html')
+
+def static_response(filename):
+    """
+    A frontend file from static_assets in the best encoding the browser
+    accepts. Fingerprinted names are cached for a year, plain names are
+    revalidated with the ETag.
+    """
+    asset, immutable = static_assets.get(filename)
+    if asset is None:
+        return app.send_static_file(filename)
+    encoding = negotiate(request.headers.get('Accept-Encoding')) if len(asset.bodies) > 1 else None
+    response = Response(asset.bodies[encoding], mimetype=asset.mimetype)
+    if len(asset.bodies) > 1:
+        response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.set_etag(f"{asset.etag}-{encoding}" if encoding else asset.etag)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if immutable else 'no-cache'
+    return response.make_conditional(request)
+
+# Flask's static route (static_url_path='') is served from static_assets.
+app.view_functions['static'] = static_response
 
 # ====================================
 # ==         API ROUTE INFO         ==
@@ -72,12 +671,245 @@ def api_info():
             'maintenance': '/api/maintenance',
             'hangars': '/api/hangars',
             'parkings': '/api/parkings',
+            'parking_move': '/api/parkings/move',
+            'parking_occupancy': '/api/airports/{airport_id}/parking',
             'flight_plans': '/api/flight-plans',
+            'flight_plans_by_flight': '/api/flights/{flight_id}/flight-plans',
+            'flight_plan_approval': '/api/flight-plans/approval',
             'flight_crew_assignments': '/api/flight-crew-assignments',
-            'flight_crew_by_flight': '/api/flights/{flight_id}/crew'
+            'flight_crew_by_flight': '/api/flights/{flight_id}/crew',
+            'flight_crew_bulk': '/api/flight-crew-assignments/bulk',
+            'bulk_import': '/api/import/{pilots|crew-members|aircraft|flights}',
+            'dashboard': '/api/dashboard',
+            'departures': '/api/airports/{airport_id}/departures',
+            'arrivals': '/api/airports/{airport_id}/arrivals',
+            'pilot_schedule': '/api/pilots/{pilot_id}/schedule?from=&to=',
+            'crew_schedule': '/api/crew-members/{crew_id}/schedule?from=&to=',
+            'schedule_conflicts': '/api/schedule/conflicts',
+            'rotations': '/api/rotations?from=&to=&aircraft_id=',
+            'routes': '/api/routes?from=&to=',
+            'airports_near': '/api/airports/near?lat=&lon=&radius=',
+            'airport_alternates': '/api/airports/{airport_id}/alternates',
+            'flight_plan_alternates': '/api/flight-plans/{flight_plan_id}/alternates',
+            'maintenance_window': '/api/maintenance/window?from=&to=',
+            'maintenance_by_tail': '/api/aircraft/by-tail/{tail_number}/maintenance',
+            'pool': '/api/pool',
+            'metrics': '/metrics',
+            'static_assets': '/api/static-assets'
         }
     })
 
+@app.route('/api/pool', methods=['GET'])
+def get_pool_stats():
+    """ Connection pool usage and time spent waiting for a connection """
+    return jsonify(db_pool.stats())
+
+@app.route('/api/static-assets', methods=['GET'])
+def get_static_assets():
+    """ Fingerprinted names and compressed sizes of the frontend files """
+    return jsonify(static_assets.stats())
+
+# ====================================
+# ==            METRICS             ==
+# ====================================
+metrics = Registry()
+http_requests = metrics.counter('airline_http_requests_total',
+                                'HTTP requests by route template and status code.',
+                                ('method', 'route', 'status'))
+http_latency = metrics.histogram('airline_http_request_duration_seconds',
+                                 'Request latency by route template, until the response is sent.',
+                                 ('method', 'route'))
+http_in_flight = metrics.gauge('airline_http_requests_in_flight', 'Requests being served.')
+db_queries = metrics.counter('airline_db_queries_total', 'SQL statements run, by route template.', ('route',))
+db_time = metrics.counter('airline_db_time_seconds_total', 'Time spent running and fetching SQL.', ('route',))
+db_rows = metrics.counter('airline_db_rows_fetched_total', 'Rows fetched from MySQL.', ('route',))
+rows_serialized = metrics.counter('airline_rows_serialized_total', 'Rows turned into JSON.', ('route',))
+serialize_time = metrics.counter('airline_serialize_seconds_total',
+                                 'Time spent serializing rows and encoding JSON.', ('route',))
+# Hits and misses of the caches without counters of their own; rendered
+# together with the reference data ones by cache_metrics().
+cache_requests = Counter('airline_cache_requests_total', '', ('cache', 'result'))
+
+def request_route():
+    """ Route template (/api/flights/<int:flight_id>), so ids do not become labels """
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_start = time.perf_counter()
+    http_in_flight.inc()
+
+@app.after_request
+def record_response_status(response):
+    g.response_status = response.status_code
+    return response
+
+@app.teardown_request
+def record_request_metrics(exception=None):
+    # Runs after a streamed body is sent, so the latency includes it.
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return
+    http_in_flight.dec()
+    route = request_route()
+    status = g.get('response_status', 500) if exception is None else 500
+    http_requests.inc(method=request.method, route=route, status=str(status))
+    http_latency.observe(time.perf_counter() - start, method=request.method, route=route)
+    stats = g.get('sql_stats')
+    if stats is not None:
+        db_queries.inc(stats.queries, route=route)
+        db_time.inc(stats.db_time, route=route)
+        db_rows.inc(stats.rows, route=route)
+        rows_serialized.inc(stats.serialized, route=route)
+        serialize_time.inc(stats.serialize_time, route=route)
+
+@metrics.collector
+def pool_metrics():
+    stats = db_pool.stats()
+    return [
+        ('airline_db_pool_connections', 'gauge', 'Open connections of the pool by state.', ('state',),
+         [(('idle',), stats['idle']), (('in_use',), stats['in_use'])]),
+        ('airline_db_pool_limit', 'gauge', 'Connections kept idle (size) and opened at most (max).', ('limit',),
+         [(('size',), stats['size']), (('max',), stats['size'] + stats['max_overflow'])]),
+        ('airline_db_pool_checkouts_total', 'counter', 'Connections handed out.', (),
+         [((), stats['checkouts'])]),
+        ('airline_db_pool_waits_total', 'counter', 'Checkouts that had to wait for a free connection.', (),
+         [((), stats['waits'])]),
+        ('airline_db_pool_timeouts_total', 'counter', 'Checkouts that gave up waiting.', (),
+         [((), stats['timeouts'])]),
+        ('airline_db_pool_wait_seconds_total', 'counter', 'Time spent waiting for connections.', (),
+         [((), stats['wait_time_total'])]),
+        ('airline_db_pool_wait_seconds_max', 'gauge', 'Longest wait for a connection.', (),
+         [((), stats['wait_time_max'])]),
+    ]
+
+@metrics.collector
+def cache_metrics():
+    counts = {key: value for key, value in cache_requests.samples()}
+    refdata = reference_data.stats()
+    counts[('reference_data', 'hit')] = refdata['hits']
+    counts[('reference_data', 'miss')] = refdata['misses']
+    ratios = []
+    for cache in sorted({cache for cache, _ in counts}):
+        hits = counts.get((cache, 'hit'), 0)
+        total = hits + counts.get((cache, 'miss'), 0)
+        ratios.append(((cache,), hits / total if total else 0.0))
+    return [
+        ('airline_cache_requests_total', 'counter', 'Cache lookups by result.', ('cache', 'result'),
+         sorted(counts.items())),
+        ('airline_cache_hit_ratio', 'gauge', 'Hits over lookups since the process started.', ('cache',), ratios),
+        ('airline_cache_loads_total', 'counter', 'Reloads of the in-memory structures from MySQL.', ('cache',),
+         [(('reference_data',), refdata['loads']),
+          (('parking_occupancy',), parking_occupancy.stats()['loads']),
+          (('schedule_index',), schedule_index.stats()['loads'])]),
+    ]
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """ Prometheus text format metrics of this process """
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+# ====================================
+# ==           DASHBOARD            ==
+# ====================================
+_dashboard_cache = {'expires': 0.0, 'etag': None, 'data': None}
+_dashboard_lock = threading.Lock()
+
+def count_by(cursor, table, column):
+    """ {value: count} for one column, computed by MySQL """
+    cursor.execute(f"SELECT {column}, COUNT(*) FROM {table} GROUP BY {column}")
+    return {value: count for value, count in cursor.fetchall()}
+
+def build_dashboard(cursor):
+    pilots = count_by(cursor, 'pilots', 'employment_status')
+    crew = count_by(cursor, 'cabincrew', 'employment_status')
+    flights = count_by(cursor, 'flights', 'flight_status')
+    aircraft = count_by(cursor, 'aircraft', 'status')
+    maintenance = count_by(cursor, 'maintenance_events', 'maintenance_status')
+    cursor.execute("SELECT COUNT(*) FROM airports")
+    airports = cursor.fetchone()[0]
+
+    cursor.execute("""
+        SELECT flight_id, flight_number, departure_airport_id, arrival_airport_id,
+               scheduled_departure_time
+        FROM flights
+        WHERE flight_status = 'Scheduled'
+        ORDER BY scheduled_departure_time, flight_id
+        LIMIT 5
+    """)
+    upcoming = format_results(cursor, cursor.fetchall())
+    for flight in upcoming:
+        departure = reference_data.airport(flight['departure_airport_id'])
+        arrival = reference_data.airport(flight['arrival_airport_id'])
+        flight['departure_airport'] = departure['iata_code'] if departure else None
+        flight['arrival_airport'] = arrival['iata_code'] if arrival else None
+
+    cursor.execute("""
+        SELECT maintenance_event_id, aircraft_id, maintenance_type,
+               maintenance_status, start_date_time
+        FROM maintenance_events
+        ORDER BY start_date_time DESC, maintenance_event_id DESC
+        LIMIT 5
+    """)
+    recent = format_results(cursor, cursor.fetchall())
+    for event in recent:
+        aircraft_row = reference_data.aircraft(event['aircraft_id'])
+        event['tail_number'] = aircraft_row['tail_number'] if aircraft_row else None
+
+    return {
+        'stats': {
+            'active_pilots': pilots.get('Active', 0),
+            'active_crew': crew.get('Active', 0),
+            'scheduled_flights': flights.get('Scheduled', 0),
+            'operational_aircraft': aircraft.get('Operational', 0),
+            'airports': airports,
+            'maintenance_in_progress': maintenance.get('InProgress', 0)
+        },
+        'by_status': {
+            'pilots': pilots,
+            'crew': crew,
+            'flights': flights,
+            'aircraft': aircraft,
+            'maintenance': maintenance
+        },
+        'upcoming_flights': upcoming,
+        'recent_maintenance': recent
+    }
+
+@app.route('/api/dashboard', methods=['GET'])
+@conditional('pilots', 'cabincrew', 'flights', 'aircraft', 'airports', 'maintenance_events')
+def get_dashboard():
+    """ Status counts, next 5 scheduled flights and last 5 maintenance events """
+    # The cached payload is only reused while the table versions it was
+    # built from (g.etag, set by @conditional) are unchanged.
+    etag = g.get('etag')
+    with _dashboard_lock:
+        if (_dashboard_cache['data'] is not None
+                and _dashboard_cache['etag'] == etag
+                and time.monotonic() < _dashboard_cache['expires']):
+            cache_requests.inc(cache='dashboard', result='hit')
+            return jsonify(_dashboard_cache['data'])
+    cache_requests.inc(cache='dashboard', result='miss')
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        cursor = connection.cursor()
+        dashboard = build_dashboard(cursor)
+        cursor.close()
+        connection.close()
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+    if DASHBOARD_CACHE_TTL:
+        with _dashboard_lock:
+            _dashboard_cache['data'] = dashboard
+            _dashboard_cache['etag'] = etag
+            _dashboard_cache['expires'] = time.monotonic() + DASHBOARD_CACHE_TTL
+    return jsonify(dashboard)
+
 # ====================================
 # ==             PILOTS             ==
 # ====================================
@@ -106,6 +938,7 @@ def create_pilot():
             data['current_rank'], data['employment_status']
         )
         cursor.execute(query, values)
+        bump_table_versions(connection, 'pilots')
         connection.commit()
         new_id = cursor.lastrowid
         cursor.close()
@@ -115,6 +948,7 @@ def create_pilot():
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/pilots', methods=['GET']) #READ (GROUP)
+@conditional('pilots')
 def get_pilots():
     """ Obtain all the pilots information """
     connection = get_db_connection()
@@ -122,15 +956,19 @@ def get_pilots():
         return jsonify({'error': 'ERROR: An error occurred while attempting to connect to the database.'}), 500
     try:
         cursor = connection.cursor()
-        cursor.execute("SELECT * FROM pilots ORDER BY pilot_id")
-        pilots = format_results(cursor, cursor.fetchall())
+        if request.args.get('stream'):
+            return stream_collection(connection, cursor, "SELECT * FROM pilots", ['pilot_id'], PERSON_FILTERS)
+        pilots, next_cursor = query_collection(cursor, "SELECT * FROM pilots", ['pilot_id'], PERSON_FILTERS)
         cursor.close()
         connection.close()
-        return jsonify(pilots)
+        return collection_response(pilots, next_cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Error as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/pilots/<int:pilot_id>', methods=['GET']) #READ (ONE)
+@conditional('pilots')
 def get_pilot(pilot_id):
     """ Obtain a specific pilot information """
     connection = get_db_connection()
@@ -181,6 +1019,7 @@ def update_pilot(pilot_id):
             data['current_rank'], data['employment_status'], pilot_id
         )
         cursor.execute(query, values)
+        bump_table_versions(connection, 'pilots')
         connection.commit()
         cursor.close()
         connection.close()
@@ -198,6 +1037,7 @@ def delete_pilot(pilot_id):
     try:
         cursor = connection.cursor()
         cursor.execute("DELETE FROM pilots WHERE pilot_id = %s", (pilot_id,))
+        bump_table_versions(connection, 'pilots')
         connection.commit()
         cursor.close()
         connection.close()
@@ -232,6 +1072,7 @@ def create_crew_member():
             data['current_role'], data['employment_status']
         )
         cursor.execute(query, values)
+        bump_table_versions(connection, 'cabincrew')
         connection.commit()
         new_id = cursor.lastrowid
         cursor.close()
@@ -241,6 +1082,7 @@ def create_crew_member():
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/crew-members', methods=['GET']) #READ (GROUP)
+@conditional('cabincrew')
 def get_crew_members():
     """ Obtain all the crew members information """
     connection = get_db_connection()
@@ -249,15 +1091,19 @@ def get_crew_members():
     
     try:
         cursor = connection.cursor()
-        cursor.execute("SELECT * FROM cabincrew ORDER BY crew_member_id")
-        crew = format_results(cursor, cursor.fetchall())
+        if request.args.get('stream'):
+            return stream_collection(connection, cursor, "SELECT * FROM cabincrew", ['crew_member_id'], PERSON_FILTERS)
+        crew, next_cursor = query_collection(cursor, "SELECT * FROM cabincrew", ['crew_member_id'], PERSON_FILTERS)
         cursor.close()
         connection.close()
-        return jsonify(crew)
+        return collection_response(crew, next_cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Error as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/crew-members/<int:crew_id>', methods=['GET']) #READ (ONE)
+@conditional('cabincrew')
 def get_crew_member(crew_id):
     """ Obtain a specific crew member information """
     connection = get_db_connection()
@@ -307,6 +1153,7 @@ def update_crew_member(crew_id):
             data['current_role'], data['employment_status'], crew_id
         )
         cursor.execute(query, values)
+        bump_table_versions(connection, 'cabincrew')
         connection.commit()
         cursor.close()
         connection.close()
@@ -324,6 +1171,7 @@ def delete_crew_member(crew_id):
     try:
         cursor = connection.cursor()
         cursor.execute("DELETE FROM cabincrew WHERE crew_member_id = %s", (crew_id,))
+        bump_table_versions(connection, 'cabincrew')
         connection.commit()
         cursor.close()
         connection.close()
@@ -331,6 +1179,372 @@ def delete_crew_member(crew_id):
     except Error as e:
         return jsonify({'error': str(e)}), 400
         
+# ====================================
+# ==           SCHEDULES            ==
+# ====================================
+# Flights a pilot or cabin crew member operates in a time window. The
+# lookups go through the person-first indexes of migration 007.
+SCHEDULE_DEFAULT_DAYS = 7
+
+SCHEDULE_COLUMNS = """
+    f.flight_id, f.flight_number, f.departure_airport_id, f.arrival_airport_id,
+    f.scheduled_departure_time, f.scheduled_arrival_time, f.aircraft_id, f.flight_status
+"""
+
+def schedule_window():
+    """ ?from=&to= (ISO date or datetime); by default today and the next days """
+    start = parse_local_datetime(request.args['from'], 'from') if request.args.get('from') else None
+    end = parse_local_datetime(request.args['to'], 'to') if request.args.get('to') else None
+    if start is None:
+        start = end - timedelta(days=SCHEDULE_DEFAULT_DAYS) if end else \
+            datetime.combine(date.today(), datetime.min.time())
+    if end is None:
+        end = start + timedelta(days=SCHEDULE_DEFAULT_DAYS)
+    if end <= start:
+        raise ValueError('to must be later than from.')
+    return start, end
+
+def schedule_etag_key(**kwargs):
+    """ The default window moves with the current day """
+    if request.args.get('from') or request.args.get('to'):
+        return ''
+    return date.today().isoformat()
+
+def schedule_response(person, start, end, flights):
+    add_flight_codes(flights)
+    person.update({
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'flights': flights
+    })
+    return jsonify(person)
+
+def schedule_conflict_response(conflicts):
+    """ 409 listing the flights a pilot / crew member is already busy on """
+    return jsonify({
+        'error': 'Schedule conflict: a pilot or crew member is already assigned to an overlapping flight.',
+        'conflicts': conflicts
+    }), 409
+
+# schedule_index answers conflict checks without a query, but it belongs
+# to one process and can be stale, so for writes it is only a hint. Write
+# handlers lock the people they book, write, and let the overlaps found in
+# the database decide before committing.
+
+def settle_schedule_conflicts(hint, conflicts):
+    """
+    Conflicts found in the database, which decide. When schedule_index
+    (`hint`) disagreed, it missed a write of another worker: reload it.
+    """
+    if bool(hint) != bool(conflicts):
+        schedule_index.invalidate()
+    return conflicts
+
+def lock_schedule_people(cursor, pilots=(), crew=()):
+    """
+    Lock the pilot and cabin crew rows of a schedule write (FOR UPDATE, in
+    id order). Writers booking the same person then go one at a time, and
+    each one's check sees what the previous one committed.
+    """
+    for table, column, ids in (('pilots', 'pilot_id', pilots), ('cabincrew', 'crew_member_id', crew)):
+        ids = sorted(set(ids))
+        for start in range(0, len(ids), IN_BATCH_SIZE):
+            batch = ids[start:start + IN_BATCH_SIZE]
+            cursor.execute(
+                f"SELECT {column} FROM {table} WHERE {column} IN ("
+                + ', '.join(['%s'] * len(batch)) + f") ORDER BY {column} FOR UPDATE",
+                tuple(batch)
+            )
+            cursor.fetchall()
+
+def stored_pilot_conflicts(cursor, flight_id):
+    """
+    Other active flights of the pilots of `flight_id` that overlap it, as
+    stored in the current transaction. One range scan per role on
+    idx_pilot_command_schedule / idx_pilot_first_officer_schedule, bounded
+    below by MAX_FLIGHT_DURATION.
+    """
+    cursor.execute("""
+        SELECT scheduled_departure_time, scheduled_arrival_time,
+               pilot_command_id, pilot_first_officer_id, flight_status
+        FROM flights WHERE flight_id = %s
+    """, (flight_id,))
+    row = cursor.fetchone()
+    if row is None or row[4] in INACTIVE_STATUSES:
+        return []
+    start, end = parse_time(row[0], 'start'), parse_time(row[1], 'end')
+    pilots = (row[2], row[3])
+    statuses = ', '.join(['%s'] * len(INACTIVE_STATUSES))
+    params = []
+    selects = []
+    for column in ('pilot_command_id', 'pilot_first_officer_id'):
+        selects.append(f"""
+            SELECT flight_id, {column} FROM flights
+            WHERE {column} IN (%s, %s)
+              AND scheduled_departure_time >= %s AND scheduled_departure_time < %s
+              AND scheduled_arrival_time > %s
+              AND flight_id <> %s AND flight_status NOT IN ({statuses})
+        """)
+        params.extend(pilots + (start - MAX_FLIGHT_DURATION, end, start, flight_id) + INACTIVE_STATUSES)
+    cursor.execute(" UNION ALL ".join(selects), tuple(params))
+    return [{'person': PILOT, 'id': pilot_id, 'flight_id': other_id}
+            for other_id, pilot_id in cursor.fetchall()]
+
+def stored_crew_conflicts(cursor, pairs):
+    """
+    Other active flights overlapping the (flight_id, crew_member_id)
+    `pairs`, as stored in the current transaction: for each pair one range
+    scan of idx_crew_schedule, bounded below by MAX_FLIGHT_DURATION.
+    """
+    statuses = ', '.join(['%s'] * len(INACTIVE_STATUSES))
+    found = []
+    for start in range(0, len(pairs), IN_BATCH_SIZE):
+        batch = pairs[start:start + IN_BATCH_SIZE]
+        cursor.execute(f"""
+            SELECT b.crew_member_id, b.flight_id
+            FROM flight_crew_assignment a
+            JOIN flights fa ON fa.flight_id = a.flight_id
+            JOIN flight_crew_assignment b
+              ON b.crew_member_id = a.crew_member_id AND b.flight_id <> a.flight_id
+             AND b.scheduled_departure_time >= fa.scheduled_departure_time - INTERVAL %s MINUTE
+             AND b.scheduled_departure_time < fa.scheduled_arrival_time
+            JOIN flights fb ON fb.flight_id = b.flight_id
+            WHERE (a.flight_id, a.crew_member_id) IN ({', '.join(['(%s, %s)'] * len(batch))})
+              AND fb.scheduled_arrival_time > fa.scheduled_departure_time
+              AND fa.flight_status NOT IN ({statuses}) AND fb.flight_status NOT IN ({statuses})
+        """, (int(MAX_FLIGHT_DURATION.total_seconds() // 60),) + tuple(value for pair in batch for value in pair)
+             + INACTIVE_STATUSES + INACTIVE_STATUSES)
+        found.extend({'person': CREW, 'id': crew_member_id, 'flight_id': flight_id}
+                     for crew_member_id, flight_id in cursor.fetchall())
+    return found
+
+@app.route('/api/schedule/conflicts', methods=['GET'])
+def get_schedule_conflicts():
+    """ Audit of the whole schedule: every pilot / crew member booked on overlapping flights """
+    try:
+        return jsonify(schedule_index.audit())
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/pilots/<int:pilot_id>/schedule', methods=['GET'])
+@conditional('flights', 'pilots', 'airports', 'aircraft', key=schedule_etag_key)
+def get_pilot_schedule(pilot_id):
+    """ Flights of a pilot, as captain or first officer, departing in [from, to) """
+    try:
+        start, end = schedule_window()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT pilot_id, first_name, last_name FROM pilots WHERE pilot_id = %s", (pilot_id,))
+        pilot = format_results(cursor, cursor.fetchall())
+        if not pilot:
+            cursor.close()
+            connection.close()
+            return jsonify({'error': 'The Pilot that you selected is not found.'}), 404
+
+        # One range scan per role: idx_pilot_command_schedule and
+        # idx_pilot_first_officer_schedule.
+        cursor.execute(f"""
+            SELECT {SCHEDULE_COLUMNS}, 'Captain' AS role
+            FROM flights f
+            WHERE f.pilot_command_id = %s
+              AND f.scheduled_departure_time >= %s AND f.scheduled_departure_time < %s
+            UNION ALL
+            SELECT {SCHEDULE_COLUMNS}, 'First Officer' AS role
+            FROM flights f
+            WHERE f.pilot_first_officer_id = %s
+              AND f.scheduled_departure_time >= %s AND f.scheduled_departure_time < %s
+            ORDER BY scheduled_departure_time, flight_id
+        """, (pilot_id, start, end, pilot_id, start, end))
+        flights = format_results(cursor, cursor.fetchall())
+        cursor.close()
+        connection.close()
+        return schedule_response(pilot[0], start, end, flights)
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/crew-members/<int:crew_id>/schedule', methods=['GET'])
+@conditional('flights', 'flight_crew_assignment', 'cabincrew', 'airports', 'aircraft', key=schedule_etag_key)
+def get_crew_member_schedule(crew_id):
+    """ Flights a cabin crew member is assigned to, departing in [from, to) """
+    try:
+        start, end = schedule_window()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT crew_member_id, first_name, last_name, current_role
+            FROM cabincrew WHERE crew_member_id = %s
+        """, (crew_id,))
+        crew = format_results(cursor, cursor.fetchall())
+        if not crew:
+            cursor.close()
+            connection.close()
+            return jsonify({'error': 'The Cabin Crew that you selected is not found.'}), 404
+
+        # One range scan of idx_crew_schedule over the window (the
+        # assignment carries the departure time, migration 012); only the
+        # flights found are read, by primary key.
+        cursor.execute(f"""
+            SELECT {SCHEDULE_COLUMNS}
+            FROM flight_crew_assignment fca
+            JOIN flights f ON f.flight_id = fca.flight_id
+            WHERE fca.crew_member_id = %s
+              AND fca.scheduled_departure_time >= %s AND fca.scheduled_departure_time < %s
+            ORDER BY fca.scheduled_departure_time, fca.flight_id
+        """, (crew_id, start, end))
+        flights = format_results(cursor, cursor.fetchall())
+        cursor.close()
+        connection.close()
+        return schedule_response(crew[0], start, end, flights)
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+# ====================================
+# ==           ROTATIONS            ==
+# ====================================
+
+@app.route('/api/rotations', methods=['GET'])
+@conditional('flights', 'aircraft', 'airports', key=schedule_etag_key)
+def get_rotations():
+    """
+    Gantt style timeline per aircraft for flights departing in [from, to):
+    legs, ground turns between them and broken chains / impossible turns.
+    Optional aircraft_id or tail to look at one aircraft.
+    """
+    try:
+        start, end = schedule_window()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    conditions = ["scheduled_departure_time >= %s", "scheduled_departure_time < %s",
+                  "flight_status NOT IN (" + ', '.join(['%s'] * len(INACTIVE_STATUSES)) + ")"]
+    params = [start, end, *INACTIVE_STATUSES]
+    aircraft_id = request.args.get('aircraft_id', type=int)
+    if request.args.get('tail'):
+        try:
+            aircraft_id = reference_data.aircraft_id(request.args['tail'])
+        except Error as e:
+            return jsonify({'error': str(e)}), 500
+        if aircraft_id is None:
+            return jsonify({'error': 'Aircraft not found'}), 404
+    if aircraft_id is not None:
+        conditions.append("aircraft_id = %s")
+        params.append(aircraft_id)
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        cursor = connection.cursor()
+        # Read in idx_aircraft_rotation order, so the sort in
+        # build_rotations() finds the legs already in place.
+        cursor.execute(f"""
+            SELECT {', '.join(LEG_COLUMNS)} FROM flights
+            WHERE {' AND '.join(conditions)}
+            ORDER BY aircraft_id, scheduled_departure_time, flight_id
+        """, tuple(params))
+        legs = cursor.fetchall()
+        cursor.close()
+        connection.close()
+        rotations = build_rotations(legs, reference_data.aircraft, reference_data.airport)
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'legs': len(legs),
+        'issues': sum(len(rotation['issues']) for rotation in rotations),
+        'aircraft': rotations
+    })
+
+# ====================================
+# ==         ROUTE NETWORK          ==
+# ====================================
+
+@app.route('/api/routes', methods=['GET'])
+@conditional('flights', 'airports')
+def get_route_network():
+    """
+    City pairs flown, with the number of flights each way, great-circle
+    distance and block time estimate. ?from=&to= limit it to flights
+    departing in that window; canceled flights are not counted.
+    """
+    conditions = ["flight_status NOT IN (" + ', '.join(['%s'] * len(INACTIVE_STATUSES)) + ")"]
+    params = list(INACTIVE_STATUSES)
+    try:
+        for arg, condition in (('from', "scheduled_departure_time >= %s"),
+                               ('to', "scheduled_departure_time < %s")):
+            if request.args.get(arg):
+                conditions.append(condition)
+                params.append(parse_local_datetime(request.args[arg], arg))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"""
+            SELECT departure_airport_id, arrival_airport_id, COUNT(*)
+            FROM flights
+            WHERE {' AND '.join(conditions)}
+            GROUP BY departure_airport_id, arrival_airport_id
+        """, tuple(params))
+        directed = cursor.fetchall()
+        cursor.close()
+        connection.close()
+        airports = reference_data.airports()
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+    pairs = {}
+    for origin, destination, count in directed:
+        a, b = sorted((origin, destination))
+        pair = pairs.setdefault((a, b), [0, 0])
+        pair[0 if origin == a else 1] += count
+
+    # Every distance of the network in one lookup on the matrix.
+    keys = sorted(pairs)
+    distances = distance_matrix.distances(airports, keys)
+    routes = []
+    for (a, b), distance in zip(keys, distances):
+        first = reference_data.airport(a)
+        second = reference_data.airport(b)
+        routes.append({
+            'airports': [first['iata_code'] if first else None, second['iata_code'] if second else None],
+            'cities': [first['city'] if first else None, second['city'] if second else None],
+            'airport_ids': [a, b],
+            'flights_outbound': pairs[(a, b)][0],
+            'flights_return': pairs[(a, b)][1],
+            'frequency': sum(pairs[(a, b)]),
+            'distance_km': distance,
+            'estimated_block_minutes': block_minutes(distance)
+        })
+    routes.sort(key=lambda route: (-route['frequency'], route['airport_ids']))
+
+    return jsonify({
+        'city_pairs': len(routes),
+        'flights': sum(route['frequency'] for route in routes),
+        'routes': routes
+    })
+
 # ====================================
 # ==            FLIGHTS             ==
 # ====================================
@@ -343,6 +1557,15 @@ def create_flight():
         return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
     
     try:
+        start, end = flight_interval(data['scheduled_departure_time'], data['scheduled_arrival_time'])
+        pilots = (data['pilot_command_id'], data['pilot_first_officer_id'])
+        if pilots[0] == pilots[1]:
+            raise ValueError('pilot_command_id and pilot_first_officer_id must be different.')
+        status = data.get('flight_status', 'Scheduled')
+        crew_member_ids = parse_id_list(data.get('crew_member_ids') or [], 'crew_member_ids')
+        hint = (schedule_index.conflicts(start, end, pilots, crew_member_ids)
+                if status not in INACTIVE_STATUSES else [])
+
         cursor = connection.cursor()
         query = """
             INSERT INTO flights 
@@ -360,30 +1583,25 @@ def create_flight():
             data['aircraft_id'], 
             data['pilot_command_id'], 
             data['pilot_first_officer_id'],
-            data.get('flight_status', 'Scheduled')
+            status
         )
+
+        # Flight and crew go in the same transaction: either both are
+        # stored or neither is.
+        lock_schedule_people(cursor, pilots, crew_member_ids)
         cursor.execute(query, values)
-        connection.commit()
-        
         new_flight_id = cursor.lastrowid
-        
-        crew_assigned = 0
-        crew_member_ids = data.get('crew_member_ids', [])
-        
-        if crew_member_ids and isinstance(crew_member_ids, list):
-            crew_query = """
-                INSERT INTO flight_crew_assignment (flight_id, crew_member_id)
-                VALUES (%s, %s)
-            """
-            for crew_id in crew_member_ids:
-                try:
-                    cursor.execute(crew_query, (new_flight_id, crew_id))
-                    crew_assigned += 1
-                except Error as e:
-                    print(f"Warning: Could not assign crew member {crew_id}: {e}")
-                    continue
-            
-            connection.commit()
+        crew_pairs = [(new_flight_id, crew_id) for crew_id in crew_member_ids]
+        insert_crew_assignments(cursor, crew_pairs)
+        conflicts = settle_schedule_conflicts(
+            hint, stored_pilot_conflicts(cursor, new_flight_id) + stored_crew_conflicts(cursor, crew_pairs))
+        if conflicts:
+            connection.rollback()
+            return schedule_conflict_response(conflicts)
+        bump_table_versions(connection, 'flights', 'flight_crew_assignment')
+        connection.commit()
+        schedule_index.set_flight(new_flight_id, start, end, pilots, status)
+        schedule_index.add_crew(crew_pairs)
         
         cursor.close()
         connection.close()
@@ -394,17 +1612,20 @@ def create_flight():
         }
         
         if crew_member_ids:
-            response['crew_assigned'] = crew_assigned
+            response['crew_assigned'] = len(crew_member_ids)
             response['crew_requested'] = len(crew_member_ids)
         
         return jsonify(response), 201
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Error as e:
         if connection:
             connection.rollback()
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/flights', methods=['GET']) #READ (GROUP)
+@conditional('flights', 'flight_crew_assignment', 'cabincrew', 'airports', 'aircraft')
 def get_flights():
     """Obtain all flights information"""
     connection = get_db_connection()
@@ -413,52 +1634,24 @@ def get_flights():
     
     try:
         cursor = connection.cursor()
-        query = """
-            SELECT 
-                f.flight_id,
-                f.flight_number,
-                f.scheduled_departure_time,
-                f.scheduled_arrival_time,
-                f.flight_status,
-                dep.iata_code AS departure_airport,
-                arr.iata_code AS arrival_airport,
-                a.tail_number AS aircraft,
-                f.aircraft_id,
-                f.departure_airport_id,
-                f.arrival_airport_id,
-                f.pilot_command_id,
-                f.pilot_first_officer_id
-            FROM flights f
-            LEFT JOIN airports dep ON f.departure_airport_id = dep.airport_id
-            LEFT JOIN airports arr ON f.arrival_airport_id = arr.airport_id
-            LEFT JOIN aircraft a ON f.aircraft_id = a.aircraft_id
-            ORDER BY f.scheduled_departure_time DESC
-        """
-        cursor.execute(query)
-        flights = format_results(cursor, cursor.fetchall())
+        if request.args.get('stream'):
+            return stream_collection(connection, cursor, FLIGHT_LIST_QUERY, FLIGHT_LIST_ORDER, FLIGHT_FILTERS,
+                                     descending=True, decorate=decorate_flights)
+        flights, next_cursor = query_collection(cursor, FLIGHT_LIST_QUERY, FLIGHT_LIST_ORDER, FLIGHT_FILTERS,
+                                                descending=True)
 
-        for flight in flights:
-            crew_query = """
-                SELECT 
-                    cc.crew_member_id,
-                    cc.first_name,
-                    cc.last_name,
-                    cc.current_role
-                FROM flight_crew_assignment fca
-                JOIN cabincrew cc ON fca.crew_member_id = cc.crew_member_id
-                WHERE fca.flight_id = %s
-            """
-            cursor.execute(crew_query, (flight['flight_id'],))
-            crew_members = format_results(cursor, cursor.fetchall())
-            flight['crew_members'] = crew_members
+        decorate_flights(cursor, flights)
         
         cursor.close()
         connection.close()
-        return jsonify(flights)
+        return collection_response(flights, next_cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Error as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/flights/<int:flight_id>', methods=['GET']) #READ (ONE)
+@conditional('flights', 'airports')
 def get_flight(flight_id):
     """Obtain a specific flight information"""
     connection = get_db_connection()
@@ -475,6 +1668,7 @@ def get_flight(flight_id):
             flight = dict(zip(columns, [serialize_result(item) for item in result]))
             cursor.close()
             connection.close()
+            add_stage_lengths([flight])
             return jsonify(flight)
         
         cursor.close()
@@ -492,7 +1686,19 @@ def update_flight(flight_id):
         return jsonify({'error': 'Error de conexión'}), 500
     
     try:
+        start, end = flight_interval(data['scheduled_departure_time'], data['scheduled_arrival_time'])
+        pilots = (data['pilot_command_id'], data['pilot_first_officer_id'])
+        if pilots[0] == pilots[1]:
+            raise ValueError('pilot_command_id and pilot_first_officer_id must be different.')
+        # The flight's cabin crew moves with it, so check them too.
+        hint = (schedule_index.conflicts(start, end, pilots, schedule_index.flight_crew(flight_id),
+                                         exclude_flight_id=flight_id)
+                if data['flight_status'] not in INACTIVE_STATUSES else [])
+
         cursor = connection.cursor()
+        cursor.execute("SELECT crew_member_id FROM flight_crew_assignment WHERE flight_id = %s", (flight_id,))
+        crew_ids = [row[0] for row in cursor.fetchall()]
+        lock_schedule_people(cursor, pilots, crew_ids)
         query = """
             UPDATE flights SET
             flight_number = %s, departure_airport_id = %s, arrival_airport_id = %s,
@@ -514,10 +1720,20 @@ def update_flight(flight_id):
             flight_id
         )
         cursor.execute(query, values)
+        conflicts = settle_schedule_conflicts(
+            hint, stored_pilot_conflicts(cursor, flight_id)
+            + stored_crew_conflicts(cursor, [(flight_id, crew_id) for crew_id in crew_ids]))
+        if conflicts:
+            connection.rollback()
+            return schedule_conflict_response(conflicts)
+        bump_table_versions(connection, 'flights')
         connection.commit()
+        schedule_index.set_flight(flight_id, start, end, pilots, data['flight_status'])
         cursor.close()
         connection.close()
         return jsonify({'message': 'Flight updated successfully.'}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Error as e:
         return jsonify({'error': str(e)}), 400
 
@@ -531,7 +1747,9 @@ def delete_flight(flight_id):
     try:
         cursor = connection.cursor()
         cursor.execute("DELETE FROM flights WHERE flight_id = %s", (flight_id,))
+        bump_table_versions(connection, 'flights', 'flight_crew_assignment', 'flight_plans')
         connection.commit()
+        schedule_index.remove_flight(flight_id)
         cursor.close()
         connection.close()
         return jsonify({'message': 'Flight deleted successfully.'}), 200
@@ -543,23 +1761,36 @@ def delete_flight(flight_id):
 # ====================================
 
 @app.route('/api/aircraft', methods=['GET'])
+@conditional('aircraft')
 def get_aircraft():
     """Obtener todas las aeronaves"""
+    if not request.args:
+        # Whole fleet: answered from the in-memory reference data.
+        try:
+            return jsonify(reference_data.aircraft_list())
+        except Error as e:
+            return jsonify({'error': str(e)}), 500
+
     connection = get_db_connection()
     if not connection:
         return jsonify({'error': 'Error de conexión'}), 500
     
     try:
         cursor = connection.cursor()
-        cursor.execute("SELECT * FROM aircraft ORDER BY aircraft_id")
-        aircraft_list = format_results(cursor, cursor.fetchall())
+        if request.args.get('stream'):
+            return stream_collection(connection, cursor, "SELECT * FROM aircraft", ['aircraft_id'], AIRCRAFT_FILTERS)
+        aircraft_list, next_cursor = query_collection(cursor, "SELECT * FROM aircraft", ['aircraft_id'],
+                                                      AIRCRAFT_FILTERS)
         cursor.close()
         connection.close()
-        return jsonify(aircraft_list)
+        return collection_response(aircraft_list, next_cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Error as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/aircraft/<int:aircraft_id>', methods=['GET'])
+@conditional('aircraft')
 def get_single_aircraft(aircraft_id):
     """Obtener una aeronave específica"""
     connection = get_db_connection()
@@ -584,17 +1815,97 @@ def get_single_aircraft(aircraft_id):
     except Error as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/aircraft', methods=['POST'])
-def create_aircraft():
-    """Crear nueva aeronave"""
-    data = request.get_json()
-    connection = get_db_connection()
-    if not connection:
-        return jsonify({'error': 'Error de conexión'}), 500
-    
+@app.route('/api/aircraft/by-tail/<tail_number>', methods=['GET'])
+@conditional('aircraft')
+def get_aircraft_by_tail(tail_number):
+    """Aeronave por matrícula, desde la caché de datos de referencia"""
     try:
-        cursor = connection.cursor()
-        query = """
+        aircraft_id = reference_data.aircraft_id(tail_number)
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+    if aircraft_id is None:
+        return jsonify({'error': 'Aeronave no encontrada'}), 404
+    return jsonify(reference_data.aircraft(aircraft_id))
+
+@app.route('/api/aircraft/by-tail/<tail_number>/maintenance', methods=['GET'])
+@conditional('aircraft', 'maintenance_events')
+def get_aircraft_maintenance_by_tail(tail_number):
+    """
+    Historial de mantenimiento de una aeronave por matrícula, del más
+    reciente al más antiguo, paginado (?limit=&cursor=) y con los totales
+    precalculados en maintenance_totals. Filtro opcional: status.
+    """
+    try:
+        aircraft_id = reference_data.aircraft_id(tail_number)
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+    if aircraft_id is None:
+        return jsonify({'error': 'Aeronave no encontrada'}), 404
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'Error de conexión'}), 500
+
+    try:
+        cursor = connection.cursor()
+        aircraft = reference_data.aircraft(aircraft_id)
+        if aircraft is None:
+            # Gone from a snapshot reloaded since the tail lookup: the row decides.
+            cursor.execute("SELECT tail_number FROM aircraft WHERE aircraft_id = %s", (aircraft_id,))
+            row = cursor.fetchone()
+            if row is None:
+                cursor.close()
+                connection.close()
+                return jsonify({'error': 'Aeronave no encontrada'}), 404
+            aircraft = {'tail_number': row[0]}
+        cursor.execute("""
+            SELECT event_count, total_cost, last_completed_event_id
+            FROM maintenance_totals WHERE aircraft_id = %s
+        """, (aircraft_id,))
+        totals = cursor.fetchone() or (0, 0, None)
+        last_completed = None
+        if totals[2] is not None:
+            cursor.execute(MAINTENANCE_QUERY + " WHERE maintenance_event_id = %s", (totals[2],))
+            rows = format_results(cursor, cursor.fetchall())
+            last_completed = rows[0] if rows else None
+
+        # Walks idx_aircraft (aircraft_id, maintenance_event_id) backwards.
+        events, next_cursor = query_collection(
+            cursor, MAINTENANCE_QUERY, ['maintenance_event_id'],
+            {'status': "maintenance_status = %s"}, descending=True,
+            fixed=[("aircraft_id = %s", aircraft_id)], default_limit=DEFAULT_PAGE_SIZE)
+        cursor.close()
+        connection.close()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+    response = jsonify({
+        'aircraft_id': aircraft_id,
+        'tail_number': aircraft['tail_number'],
+        'totals': {
+            'event_count': totals[0],
+            'total_cost': float(totals[1]),
+            'last_completed': last_completed
+        },
+        'events': events
+    })
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+@app.route('/api/aircraft', methods=['POST'])
+def create_aircraft():
+    """Crear nueva aeronave"""
+    data = request.get_json()
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'Error de conexión'}), 500
+    
+    try:
+        cursor = connection.cursor()
+        query = """
             INSERT INTO aircraft 
             (tail_number, aircraft_model, manufacturer, year_of_manufacture,
              seating_capacity, cargo_capacity, status, last_maintenance_date,
@@ -614,7 +1925,9 @@ def create_aircraft():
             data.get('assigned_base_airport_id')
         )
         cursor.execute(query, values)
+        bump_table_versions(connection, 'aircraft')
         connection.commit()
+        reference_data.invalidate('aircraft')
         new_id = cursor.lastrowid
         cursor.close()
         connection.close()
@@ -654,7 +1967,9 @@ def update_aircraft(aircraft_id):
             aircraft_id
         )
         cursor.execute(query, values)
+        bump_table_versions(connection, 'aircraft')
         connection.commit()
+        reference_data.invalidate('aircraft')
         cursor.close()
         connection.close()
         return jsonify({'message': 'Aeronave actualizada exitosamente'})
@@ -671,7 +1986,10 @@ def delete_aircraft(aircraft_id):
     try:
         cursor = connection.cursor()
         cursor.execute("DELETE FROM aircraft WHERE aircraft_id = %s", (aircraft_id,))
+        bump_table_versions(connection, 'aircraft', 'maintenance_events', 'aircraft_parking')
         connection.commit()
+        reference_data.invalidate('aircraft')
+        parking_occupancy.invalidate()
         cursor.close()
         connection.close()
         return jsonify({'message': 'Aeronave eliminada exitosamente'})
@@ -683,23 +2001,35 @@ def delete_aircraft(aircraft_id):
 # ====================================
 
 @app.route('/api/airports', methods=['GET'])
+@conditional('airports')
 def get_airports():
     """Obtener todos los aeropuertos"""
+    if not request.args:
+        # All airports: answered from the in-memory reference data.
+        try:
+            return jsonify(reference_data.airports())
+        except Error as e:
+            return jsonify({'error': str(e)}), 500
+
     connection = get_db_connection()
     if not connection:
         return jsonify({'error': 'Error de conexión'}), 500
     
     try:
         cursor = connection.cursor()
-        cursor.execute("SELECT * FROM airports ORDER BY airport_id")
-        airports = format_results(cursor, cursor.fetchall())
+        if request.args.get('stream'):
+            return stream_collection(connection, cursor, "SELECT * FROM airports", ['airport_id'], AIRPORT_FILTERS)
+        airports, next_cursor = query_collection(cursor, "SELECT * FROM airports", ['airport_id'], AIRPORT_FILTERS)
         cursor.close()
         connection.close()
-        return jsonify(airports)
+        return collection_response(airports, next_cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Error as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/airports/<int:airport_id>', methods=['GET'])
+@conditional('airports')
 def get_airport(airport_id):
     """Obtener un aeropuerto específico"""
     connection = get_db_connection()
@@ -724,6 +2054,242 @@ def get_airport(airport_id):
     except Error as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/airports/by-code/<code>', methods=['GET'])
+@conditional('airports')
+def get_airport_by_code(code):
+    """Aeropuerto por código IATA o ICAO, desde la caché de datos de referencia"""
+    try:
+        airport_id = reference_data.airport_id(code)
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+    if airport_id is None:
+        return jsonify({'error': 'Aeropuerto no encontrado'}), 404
+    return jsonify(reference_data.airport(airport_id))
+
+def float_arg(name, low, high, default=None):
+    """ Float query-string argument within [low, high]. Raises ValueError """
+    value = request.args.get(name)
+    if value in (None, ''):
+        if default is None:
+            raise ValueError(f"{name} is required.")
+        return default
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number.")
+    if not low <= number <= high:
+        raise ValueError(f"{name} must be between {low} and {high}.")
+    return number
+
+def suggest_alternates(arrival_airport_id, exclude_ids=()):
+    """
+    Nearest airports to the destination that can take the diversion:
+    not one of `exclude_ids` and with at least ?min_runways= runways.
+    ?k= and ?radius= (km) bound the search.
+    """
+    arrival = reference_data.airport(arrival_airport_id)
+    if arrival is None:
+        return None
+    k = int(float_arg('k', 1, 20, ALTERNATE_COUNT))
+    radius = float_arg('radius', 1, 20000, ALTERNATE_RADIUS_KM)
+    min_runways = int(float_arg('min_runways', 1, 10, 1))
+    excluded = set(exclude_ids) | {arrival_airport_id}
+    nearest = airport_index.nearest(
+        reference_data.airports(), arrival['latitude'], arrival['longitude'], k,
+        accept=lambda airport: airport['airport_id'] not in excluded
+                               and airport['number_of_runways'] >= min_runways,
+        radius_km=radius)
+    return {
+        'arrival_airport_id': arrival_airport_id,
+        'arrival_airport': arrival['iata_code'],
+        'radius_km': radius,
+        'alternates': [dict(airport, distance_km=distance) for airport, distance in nearest]
+    }
+
+@app.route('/api/airports/near', methods=['GET'])
+@conditional('airports')
+def get_airports_near():
+    """Aeropuertos a menos de ?radius= km (por defecto 100) de ?lat=&lon=, del más cercano al más lejano"""
+    try:
+        latitude = float_arg('lat', -90, 90)
+        longitude = float_arg('lon', -180, 180)
+        radius = float_arg('radius', 0, 20040, 100)
+        limit = int(float_arg('limit', 1, MAX_PAGE_SIZE, DEFAULT_PAGE_SIZE))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        found = airport_index.within(reference_data.airports(), latitude, longitude, radius)
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+    return jsonify({
+        'lat': latitude,
+        'lon': longitude,
+        'radius_km': radius,
+        'count': len(found),
+        'airports': [dict(airport, distance_km=distance) for airport, distance in found[:limit]]
+    })
+
+@app.route('/api/airports/<int:airport_id>/alternates', methods=['GET'])
+@conditional('airports')
+def get_airport_alternates(airport_id):
+    """Aeropuertos alternativos más cercanos para un destino (?exclude=id,id para descartar el origen)"""
+    try:
+        exclude = [int(value) for value in request.args.get('exclude', '').split(',') if value.strip()]
+        suggestion = suggest_alternates(airport_id, exclude)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+    if suggestion is None:
+        return jsonify({'error': 'Aeropuerto no encontrado'}), 404
+    return jsonify(suggestion)
+
+def parse_local_datetime(value, name):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO date or datetime.")
+
+def board_window(airport):
+    """
+    Time window of a departures / arrivals board, in the airport's local
+    time (the schedule stores local times). ?from=&to= win over ?date=;
+    with neither, the current local day at the airport is used.
+    """
+    if request.args.get('from') or request.args.get('to'):
+        start = parse_local_datetime(request.args.get('from', ''), 'from') if request.args.get('from') else None
+        end = parse_local_datetime(request.args.get('to', ''), 'to') if request.args.get('to') else None
+        if start is None:
+            start = end - timedelta(days=1)
+        if end is None:
+            end = start + timedelta(days=1)
+    else:
+        if request.args.get('date'):
+            day = parse_local_datetime(request.args['date'], 'date').date()
+        else:
+            try:
+                day = datetime.now(ZoneInfo(airport['timezone'])).date()
+            except (ZoneInfoNotFoundError, ValueError):
+                day = date.today()
+        start = datetime.combine(day, datetime.min.time())
+        end = start + timedelta(days=1)
+    if end <= start:
+        raise ValueError('to must be later than from.')
+    return start, end
+
+def airport_board(airport_id, direction):
+    """
+    Flights leaving (departures) or reaching (arrivals) an airport in a
+    time window, read through idx_departure_board / idx_arrival_board and
+    paginated with ?limit=&cursor=. ?explain=1 returns the query plan
+    instead (debug mode only).
+    """
+    try:
+        airport = reference_data.airport(airport_id)
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+    if not airport:
+        return jsonify({'error': 'Aeropuerto no encontrado'}), 404
+
+    airport_column, time_column = (('departure_airport_id', 'scheduled_departure_time')
+                                   if direction == 'departures'
+                                   else ('arrival_airport_id', 'scheduled_arrival_time'))
+    select_query = """
+        SELECT 
+            f.flight_id,
+            f.flight_number,
+            f.scheduled_departure_time,
+            f.scheduled_arrival_time,
+            f.flight_status,
+            f.departure_airport_id,
+            f.arrival_airport_id,
+            f.aircraft_id,
+            f.pilot_command_id,
+            pc.first_name AS pilot_first_name,
+            pc.last_name AS pilot_last_name
+        FROM flights f
+        JOIN pilots pc ON f.pilot_command_id = pc.pilot_id
+    """
+    # Busy hubs have more flights in a day than a page holds: the rest is
+    # read with ?cursor= from X-Next-Cursor, like the other collections.
+    order_columns = [f"f.{time_column}", 'f.flight_id']
+    try:
+        start, end = board_window(airport)
+        query, params, limit = build_collection_query(
+            select_query, order_columns, {'status': "f.flight_status = %s"},
+            fixed=[(f"f.{airport_column} = %s", airport_id),
+                   (f"f.{time_column} >= %s", start),
+                   (f"f.{time_column} < %s", end)],
+            default_limit=DEFAULT_PAGE_SIZE)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'Error de conexión'}), 500
+
+    try:
+        cursor = connection.cursor()
+        if app.debug and request.args.get('explain'):
+            cursor.execute("EXPLAIN " + query, params)
+            plan = format_results(cursor, cursor.fetchall())
+            cursor.close()
+            connection.close()
+            return jsonify(plan)
+
+        cursor.execute(query, params)
+        flights, next_cursor = page_rows(format_results(cursor, cursor.fetchall()), limit, order_columns)
+        cursor.close()
+        connection.close()
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+    for flight in flights:
+        departure = reference_data.airport(flight['departure_airport_id'])
+        arrival = reference_data.airport(flight['arrival_airport_id'])
+        aircraft = reference_data.aircraft(flight['aircraft_id'])
+        flight['departure_airport'] = departure['iata_code'] if departure else None
+        flight['arrival_airport'] = arrival['iata_code'] if arrival else None
+        flight['aircraft'] = aircraft['tail_number'] if aircraft else None
+        flight['pilot_in_command'] = f"{flight.pop('pilot_first_name')} {flight.pop('pilot_last_name')}"
+
+    response = jsonify({
+        'airport': {
+            'airport_id': airport['airport_id'],
+            'iata_code': airport['iata_code'],
+            'city': airport['city'],
+            'timezone': airport['timezone']
+        },
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'flights': flights
+    })
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+def board_etag_key(airport_id):
+    """ Without an explicit window the board follows the airport's local day """
+    if request.args.get('date') or request.args.get('from') or request.args.get('to'):
+        return ''
+    airport = reference_data.airport(airport_id)
+    try:
+        return datetime.now(ZoneInfo(airport['timezone'])).date().isoformat() if airport else ''
+    except (ZoneInfoNotFoundError, ValueError):
+        return date.today().isoformat()
+
+@app.route('/api/airports/<int:airport_id>/departures', methods=['GET'])
+@conditional('flights', 'airports', 'aircraft', 'pilots', key=board_etag_key)
+def get_airport_departures(airport_id):
+    """Salidas de un aeropuerto en un día / rango en hora local"""
+    return airport_board(airport_id, 'departures')
+
+@app.route('/api/airports/<int:airport_id>/arrivals', methods=['GET'])
+@conditional('flights', 'airports', 'aircraft', 'pilots', key=board_etag_key)
+def get_airport_arrivals(airport_id):
+    """Llegadas a un aeropuerto en un día / rango en hora local"""
+    return airport_board(airport_id, 'arrivals')
+
 @app.route('/api/airports', methods=['POST'])
 def create_airport():
     """Crear nuevo aeropuerto"""
@@ -753,7 +2319,9 @@ def create_airport():
             data['number_of_parkings']
         )
         cursor.execute(query, values)
+        bump_table_versions(connection, 'airports')
         connection.commit()
+        reference_data.invalidate('airports')
         new_id = cursor.lastrowid
         cursor.close()
         connection.close()
@@ -792,7 +2360,9 @@ def update_airport(airport_id):
             airport_id
         )
         cursor.execute(query, values)
+        bump_table_versions(connection, 'airports')
         connection.commit()
+        reference_data.invalidate('airports')
         cursor.close()
         connection.close()
         return jsonify({'message': 'Aeropuerto actualizado exitosamente'})
@@ -809,7 +2379,10 @@ def delete_airport(airport_id):
     try:
         cursor = connection.cursor()
         cursor.execute("DELETE FROM airports WHERE airport_id = %s", (airport_id,))
+        bump_table_versions(connection, 'airports', 'aircraft', 'maintenance_hangars', 'aircraft_parking', 'maintenance_events')
         connection.commit()
+        reference_data.invalidate()
+        parking_occupancy.invalidate()
         cursor.close()
         connection.close()
         return jsonify({'message': 'Aeropuerto eliminado exitosamente'})
@@ -820,7 +2393,63 @@ def delete_airport(airport_id):
 # ==          MAINTENANCE           ==
 # ====================================
 
+def lock_maintenance_totals(cursor, aircraft_ids):
+    """
+    Create (if missing) and lock the maintenance_totals rows of the
+    aircraft touched by a write, before the write. Concurrent writes for the
+    same aircraft then refresh its totals one after the other.
+    """
+    for aircraft_id in sorted(set(aircraft_ids)):
+        cursor.execute("""
+            INSERT INTO maintenance_totals (aircraft_id) VALUES (%s)
+            ON DUPLICATE KEY UPDATE aircraft_id = aircraft_id
+        """, (aircraft_id,))
+
+def maintenance_totals_row(cursor, maintenance_id):
+    """ (aircraft_id, cost, maintenance_status) of an event, locked; None if missing """
+    cursor.execute("""
+        SELECT aircraft_id, cost, maintenance_status FROM maintenance_events
+        WHERE maintenance_event_id = %s FOR UPDATE
+    """, (maintenance_id,))
+    return cursor.fetchone()
+
+def update_maintenance_totals(cursor, old=None, new=None):
+    """
+    Apply one event write to maintenance_totals. `old` and `new` are the
+    event's maintenance_totals_row() before and after the write (None when
+    it was created / deleted): count and cost move by the difference, and
+    the last completed event is looked up again, one entry of
+    idx_aircraft_completed, only where a completed event was involved.
+    """
+    changes = {}
+    for row, sign in ((old, -1), (new, 1)):
+        if row is None:
+            continue
+        aircraft_id, cost, status = row
+        count, total, completed = changes.get(aircraft_id, (0, Decimal(0), False))
+        changes[aircraft_id] = (count + sign, total + sign * Decimal(cost or 0),
+                                completed or status == 'Completed')
+
+    for aircraft_id, (count, total, completed) in sorted(changes.items()):
+        cursor.execute("""
+            UPDATE maintenance_totals
+            SET event_count = event_count + %s, total_cost = total_cost + %s
+            WHERE aircraft_id = %s
+        """, (count, total, aircraft_id))
+        if not completed:
+            continue
+        cursor.execute("""
+            SELECT maintenance_event_id FROM maintenance_events
+            WHERE aircraft_id = %s AND maintenance_status = 'Completed'
+            ORDER BY end_date_time DESC, maintenance_event_id DESC
+            LIMIT 1
+        """, (aircraft_id,))
+        last_completed = cursor.fetchone()
+        cursor.execute("UPDATE maintenance_totals SET last_completed_event_id = %s WHERE aircraft_id = %s",
+                       (last_completed[0] if last_completed else None, aircraft_id))
+
 @app.route('/api/maintenance', methods=['GET'])
+@conditional('maintenance_events')
 def get_maintenance():
     """Obtener eventos de mantenimiento"""
     connection = get_db_connection()
@@ -829,15 +2458,105 @@ def get_maintenance():
 
     try:
         cursor = connection.cursor()
-        cursor.execute("SELECT * FROM maintenance_events ORDER BY start_date_time DESC")
+        filters = {
+            'status': "maintenance_status = %s",
+            'aircraft_id': "aircraft_id = %s",
+            'hangar_id': "hangar_id = %s",
+            'date_from': "start_date_time >= %s",
+            'date_to': "start_date_time < %s"
+        }
+        if request.args.get('stream'):
+            return stream_collection(connection, cursor, MAINTENANCE_QUERY, ['start_date_time', 'maintenance_event_id'], filters, descending=True)
+        events, next_cursor = query_collection(cursor, MAINTENANCE_QUERY, ['start_date_time', 'maintenance_event_id'], filters, descending=True)
+        cursor.close()
+        connection.close()
+        return collection_response(events, next_cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/maintenance/window', methods=['GET'])
+@conditional('maintenance_events', 'aircraft')
+def get_maintenance_window():
+    """
+    Eventos de mantenimiento que se solapan con [from, to). Un evento sin
+    end_date_time sigue en curso. Filtros: aircraft_id, hangar_id, status.
+
+    Closed events are read in two ranges: by start_date_time from
+    MAINTENANCE_WINDOW_SCAN_MINUTES before `from`, and the few longer than
+    that by idx_duration. One very long event only adds itself to the
+    second range instead of widening the first for every query.
+    """
+    try:
+        start = parse_local_datetime(request.args.get('from', ''), 'from')
+        end = parse_local_datetime(request.args.get('to', ''), 'to')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if end <= start:
+        return jsonify({'error': 'to must be later than from.'}), 400
+
+    conditions = []
+    params = []
+    for arg, column in (('aircraft_id', 'aircraft_id'), ('hangar_id', 'hangar_id'),
+                        ('status', 'maintenance_status')):
+        if request.args.get(arg):
+            conditions.append(f" AND {column} = %s")
+            params.append(request.args[arg])
+    extra = ''.join(conditions)
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'Error de conexión'}), 500
+
+    try:
+        cursor = connection.cursor()
+        # A closed event starting before earliest_start and still running at
+        # `start` lasts more than the scan margin plus a minute, so its
+        # duration_minutes (TIMESTAMPDIFF, rounded down) is above the margin.
+        earliest_start = start - timedelta(minutes=MAINTENANCE_WINDOW_SCAN_MINUTES + 1)
+
+        query = f"""
+            {MAINTENANCE_QUERY}
+            WHERE end_date_time IS NOT NULL
+              AND start_date_time >= %s AND start_date_time < %s
+              AND end_date_time > %s{extra}
+            UNION ALL
+            {MAINTENANCE_QUERY}
+            WHERE duration_minutes > %s
+              AND start_date_time < %s
+              AND end_date_time > %s{extra}
+            UNION ALL
+            {MAINTENANCE_QUERY}
+            WHERE end_date_time IS NULL
+              AND start_date_time < %s{extra}
+            ORDER BY start_date_time, maintenance_event_id
+        """
+        cursor.execute(query, tuple([earliest_start, end, start] + params
+                                    + [MAINTENANCE_WINDOW_SCAN_MINUTES, earliest_start, start] + params
+                                    + [end] + params))
         events = format_results(cursor, cursor.fetchall())
         cursor.close()
         connection.close()
-        return jsonify(events)
     except Error as e:
         return jsonify({'error': str(e)}), 500
 
+    aircraft_ids = []
+    for event in events:
+        aircraft = reference_data.aircraft(event['aircraft_id'])
+        event['tail_number'] = aircraft['tail_number'] if aircraft else None
+        if event['aircraft_id'] not in aircraft_ids:
+            aircraft_ids.append(event['aircraft_id'])
+
+    return jsonify({
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'aircraft_ids': aircraft_ids,
+        'events': events
+    })
+
 @app.route('/api/maintenance/<int:maintenance_id>', methods=['GET'])
+@conditional('maintenance_events')
 def get_maintenance_event(maintenance_id):
     """Obtener un evento de mantenimiento específico"""
     connection = get_db_connection()
@@ -846,7 +2565,7 @@ def get_maintenance_event(maintenance_id):
     
     try:
         cursor = connection.cursor()
-        cursor.execute("SELECT * FROM maintenance_events WHERE maintenance_event_id = %s", (maintenance_id,))
+        cursor.execute(MAINTENANCE_QUERY + " WHERE maintenance_event_id = %s", (maintenance_id,))
         result = cursor.fetchone()
         
         if result:
@@ -872,6 +2591,7 @@ def create_maintenance():
     
     try:
         cursor = connection.cursor()
+        lock_maintenance_totals(cursor, [data['aircraft_id']])
         query = """
             INSERT INTO maintenance_events 
             (aircraft_id, hangar_id, maintenance_type, start_date_time,
@@ -889,8 +2609,10 @@ def create_maintenance():
             data.get('cost')
         )
         cursor.execute(query, values)
-        connection.commit()
         new_id = cursor.lastrowid
+        update_maintenance_totals(cursor, new=maintenance_totals_row(cursor, new_id))
+        bump_table_versions(connection, 'maintenance_events')
+        connection.commit()
         cursor.close()
         connection.close()
         return jsonify({'message': 'Evento de mantenimiento creado exitosamente', 'id': new_id}), 201
@@ -907,6 +2629,8 @@ def update_maintenance(maintenance_id):
     
     try:
         cursor = connection.cursor()
+        previous = maintenance_totals_row(cursor, maintenance_id)
+        lock_maintenance_totals(cursor, [data['aircraft_id']] + ([previous[0]] if previous else []))
         query = """
             UPDATE maintenance_events SET
             aircraft_id = %s, hangar_id = %s, maintenance_type = %s,
@@ -926,6 +2650,9 @@ def update_maintenance(maintenance_id):
             maintenance_id
         )
         cursor.execute(query, values)
+        if previous:
+            update_maintenance_totals(cursor, previous, maintenance_totals_row(cursor, maintenance_id))
+        bump_table_versions(connection, 'maintenance_events')
         connection.commit()
         cursor.close()
         connection.close()
@@ -942,7 +2669,12 @@ def delete_maintenance(maintenance_id):
     
     try:
         cursor = connection.cursor()
+        previous = maintenance_totals_row(cursor, maintenance_id)
+        lock_maintenance_totals(cursor, [previous[0]] if previous else [])
         cursor.execute("DELETE FROM maintenance_events WHERE maintenance_event_id = %s", (maintenance_id,))
+        if previous:
+            update_maintenance_totals(cursor, old=previous)
+        bump_table_versions(connection, 'maintenance_events')
         connection.commit()
         cursor.close()
         connection.close()
@@ -950,11 +2682,319 @@ def delete_maintenance(maintenance_id):
     except Error as e:
         return jsonify({'error': str(e)}), 400
 
+# ====================================
+# ==          FLIGHT PLANS          ==
+# ====================================
+FLIGHT_PLAN_ORDER = ['scheduled_departure_time', 'flight_plan_id']
+
+def parse_bool(value, name):
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ('1', 'true', 'yes'):
+        return True
+    if str(value).lower() in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f"{name} must be true or false.")
+
+def decorate_flight_plans(plans):
+    """ Airport codes, stage length and block time estimate of each plan """
+    for plan in plans:
+        for field in ('departure', 'arrival', 'alternate'):
+            airport = reference_data.airport(plan[f'{field}_airport_id'])
+            plan[f'{field}_airport'] = airport['iata_code'] if airport else None
+    add_stage_lengths(plans)
+
+def flight_plan_values(cursor, data, flight_id):
+    """
+    Column values of a plan. Airports and times left out of the body are
+    copied from the flight; a missing alternate is the nearest suitable
+    airport to the destination.
+    """
+    cursor.execute("""
+        SELECT departure_airport_id, arrival_airport_id, scheduled_departure_time, scheduled_arrival_time
+        FROM flights WHERE flight_id = %s
+    """, (flight_id,))
+    flight = cursor.fetchone()
+    if flight is None:
+        raise LookupError('Flight not found')
+    departure_id = data.get('departure_airport_id') or flight[0]
+    arrival_id = data.get('arrival_airport_id') or flight[1]
+    alternate_id = data.get('alternate_airport_id')
+    if not alternate_id:
+        suggestion = suggest_alternates(arrival_id, [departure_id])
+        if not suggestion or not suggestion['alternates']:
+            raise ValueError('alternate_airport_id is required: no suitable airport near the destination.')
+        alternate_id = suggestion['alternates'][0]['airport_id']
+    return (
+        flight_id,
+        departure_id,
+        arrival_id,
+        alternate_id,
+        data.get('scheduled_departure_time') or flight[2],
+        data.get('scheduled_arrival_time') or flight[3],
+        parse_bool(data.get('approved_by_authority', False), 'approved_by_authority'),
+        data.get('route_description')
+    )
+
+@app.route('/api/flight-plans', methods=['GET'])
+@conditional('flight_plans', 'airports')
+def get_flight_plans():
+    """
+    Flight plans in scheduled_departure_time order, DEFAULT_PAGE_SIZE at a
+    time unless ?limit= says otherwise; ?cursor= continues from
+    X-Next-Cursor. Filters: flight_id, approved, date_from, date_to.
+    """
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        fixed = []
+        if request.args.get('approved'):
+            fixed.append(("approved_by_authority = %s", parse_bool(request.args['approved'], 'approved')))
+        filters = {
+            'flight_id': "flight_id = %s",
+            'date_from': "scheduled_departure_time >= %s",
+            'date_to': "scheduled_departure_time < %s"
+        }
+        cursor = connection.cursor()
+        plans, next_cursor = query_collection(cursor, "SELECT * FROM flight_plans", FLIGHT_PLAN_ORDER,
+                                              filters, fixed=fixed, default_limit=DEFAULT_PAGE_SIZE)
+        cursor.close()
+        connection.close()
+        decorate_flight_plans(plans)
+        return collection_response(plans, next_cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/flight-plans/<int:flight_plan_id>', methods=['GET'])
+@conditional('flight_plans', 'airports')
+def get_flight_plan(flight_plan_id):
+    """ Obtain a specific flight plan """
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT * FROM flight_plans WHERE flight_plan_id = %s", (flight_plan_id,))
+        plans = format_results(cursor, cursor.fetchall())
+        cursor.close()
+        connection.close()
+        if not plans:
+            return jsonify({'error': 'Flight plan not found'}), 404
+        decorate_flight_plans(plans)
+        return jsonify(plans[0])
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/flights/<int:flight_id>/flight-plans', methods=['GET'])
+@conditional('flight_plans', 'airports')
+def get_flight_plans_by_flight(flight_id):
+    """ Flight plans filed for one flight, oldest first """
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT * FROM flight_plans WHERE flight_id = %s ORDER BY flight_plan_id", (flight_id,))
+        plans = format_results(cursor, cursor.fetchall())
+        cursor.close()
+        connection.close()
+        decorate_flight_plans(plans)
+        return jsonify(plans)
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/flight-plans', methods=['POST'])
+def create_flight_plan():
+    """ Create a flight plan for a flight """
+    data = request.get_json(silent=True) or {}
+    if not data.get('flight_id'):
+        return jsonify({'error': 'flight_id is required.'}), 400
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        cursor = connection.cursor()
+        values = flight_plan_values(cursor, data, data['flight_id'])
+        cursor.execute("""
+            INSERT INTO flight_plans
+            (flight_id, departure_airport_id, arrival_airport_id, alternate_airport_id,
+             scheduled_departure_time, scheduled_arrival_time, approved_by_authority, route_description)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, values)
+        new_id = cursor.lastrowid
+        bump_table_versions(connection, 'flight_plans')
+        connection.commit()
+        cursor.close()
+        connection.close()
+        return jsonify({'message': 'Flight plan created successfully.', 'id': new_id,
+                        'alternate_airport_id': values[3]}), 201
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Error as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/flight-plans/<int:flight_plan_id>', methods=['PUT'])
+def update_flight_plan(flight_plan_id):
+    """ Update a specific flight plan """
+    data = request.get_json(silent=True) or {}
+    if not data.get('flight_id'):
+        return jsonify({'error': 'flight_id is required.'}), 400
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        cursor = connection.cursor()
+        values = flight_plan_values(cursor, data, data['flight_id'])
+        cursor.execute("""
+            UPDATE flight_plans SET
+            flight_id = %s, departure_airport_id = %s, arrival_airport_id = %s, alternate_airport_id = %s,
+            scheduled_departure_time = %s, scheduled_arrival_time = %s,
+            approved_by_authority = %s, route_description = %s
+            WHERE flight_plan_id = %s
+        """, values + (flight_plan_id,))
+        bump_table_versions(connection, 'flight_plans')
+        connection.commit()
+        cursor.close()
+        connection.close()
+        return jsonify({'message': 'Flight plan updated successfully.'})
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Error as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/flight-plans/<int:flight_plan_id>', methods=['DELETE'])
+def delete_flight_plan(flight_plan_id):
+    """ Delete a specific flight plan """
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM flight_plans WHERE flight_plan_id = %s", (flight_plan_id,))
+        bump_table_versions(connection, 'flight_plans')
+        connection.commit()
+        cursor.close()
+        connection.close()
+        return jsonify({'message': 'Flight plan deleted successfully.'})
+    except Error as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/flight-plans/approval', methods=['POST'])
+def set_flight_plan_approval():
+    """
+    Approve or reject many flight plans at once, in one transaction.
+    Body: {"approved": true, "flight_plan_ids": [1, 2, ...]}
+       or {"approved": true, "date": "2025-11-16"}   (every plan departing that day)
+       or {"approved": false, "from": "...", "to": "..."}
+    Ids are updated with one UPDATE ... IN (...) per batch of IN_BATCH_SIZE,
+    a day or window with a single range UPDATE on idx_plan_departure.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        approved = parse_bool(data.get('approved'), 'approved')
+        ids = parse_id_list(data['flight_plan_ids'], 'flight_plan_ids') if 'flight_plan_ids' in data else None
+        window = None
+        if ids is None:
+            if data.get('date'):
+                start = datetime.combine(parse_local_datetime(data['date'], 'date').date(), datetime.min.time())
+                window = (start, start + timedelta(days=1))
+            elif data.get('from') and data.get('to'):
+                window = (parse_local_datetime(data['from'], 'from'), parse_local_datetime(data['to'], 'to'))
+            else:
+                raise ValueError('Send flight_plan_ids, date, or from and to.')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        cursor = connection.cursor()
+        updated = 0
+        statements = 0
+        if ids is not None:
+            for start in range(0, len(ids), IN_BATCH_SIZE):
+                batch = ids[start:start + IN_BATCH_SIZE]
+                cursor.execute(
+                    "UPDATE flight_plans SET approved_by_authority = %s WHERE flight_plan_id IN ("
+                    + ', '.join(['%s'] * len(batch)) + ")",
+                    (approved, *batch)
+                )
+                updated += cursor.rowcount
+                statements += 1
+        else:
+            cursor.execute("""
+                UPDATE flight_plans SET approved_by_authority = %s
+                WHERE scheduled_departure_time >= %s AND scheduled_departure_time < %s
+            """, (approved, *window))
+            updated = cursor.rowcount
+            statements = 1
+        bump_table_versions(connection, 'flight_plans')
+        connection.commit()
+        cursor.close()
+        connection.close()
+        return jsonify({
+            'message': 'Flight plans approved.' if approved else 'Flight plans rejected.',
+            'approved': approved,
+            'updated': updated,
+            'statements': statements
+        })
+    except Error as e:
+        connection.rollback()
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/flight-plans/<int:flight_plan_id>/alternates', methods=['GET'])
+@conditional('flight_plans', 'airports')
+def get_flight_plan_alternates(flight_plan_id):
+    """ Nearest suitable alternates for the destination of a flight plan """
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT departure_airport_id, arrival_airport_id, alternate_airport_id
+            FROM flight_plans WHERE flight_plan_id = %s
+        """, (flight_plan_id,))
+        plan = cursor.fetchone()
+        cursor.close()
+        connection.close()
+        if plan is None:
+            return jsonify({'error': 'Flight plan not found'}), 404
+        departure_id, arrival_id, current_id = plan
+        suggestion = suggest_alternates(arrival_id, [departure_id])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+    if suggestion is None:
+        return jsonify({'error': 'Airport not found'}), 404
+
+    suggestion['flight_plan_id'] = flight_plan_id
+    suggestion['current_alternate_airport_id'] = current_id
+    return jsonify(suggestion)
+
 # ====================================
 # ==            HANGARS             ==
 # ====================================
 
 @app.route('/api/hangars', methods=['GET'])
+@conditional('maintenance_hangars')
 def get_hangars():
     """Obtener todos los hangares"""
     connection = get_db_connection()
@@ -963,15 +3003,22 @@ def get_hangars():
     
     try:
         cursor = connection.cursor()
-        cursor.execute("SELECT * FROM maintenance_hangars ORDER BY hangar_id")
-        hangars = format_results(cursor, cursor.fetchall())
+        filters = {
+            'airport_id': "airport_id = %s"
+        }
+        if request.args.get('stream'):
+            return stream_collection(connection, cursor, "SELECT * FROM maintenance_hangars", ['hangar_id'], filters)
+        hangars, next_cursor = query_collection(cursor, "SELECT * FROM maintenance_hangars", ['hangar_id'], filters)
         cursor.close()
         connection.close()
-        return jsonify(hangars)
+        return collection_response(hangars, next_cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Error as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/hangars/<int:hangar_id>', methods=['GET'])
+@conditional('maintenance_hangars')
 def get_hangar(hangar_id):
     """Obtener un hangar específico"""
     connection = get_db_connection()
@@ -1018,6 +3065,7 @@ def create_hangar():
             data.get('availability_status', 'Available')
         )
         cursor.execute(query, values)
+        bump_table_versions(connection, 'maintenance_hangars')
         connection.commit()
         new_id = cursor.lastrowid
         cursor.close()
@@ -1050,6 +3098,7 @@ def update_hangar(hangar_id):
             hangar_id
         )
         cursor.execute(query, values)
+        bump_table_versions(connection, 'maintenance_hangars')
         connection.commit()
         cursor.close()
         connection.close()
@@ -1067,6 +3116,7 @@ def delete_hangar(hangar_id):
     try:
         cursor = connection.cursor()
         cursor.execute("DELETE FROM maintenance_hangars WHERE hangar_id = %s", (hangar_id,))
+        bump_table_versions(connection, 'maintenance_hangars', 'maintenance_events')
         connection.commit()
         cursor.close()
         connection.close()
@@ -1074,11 +3124,288 @@ def delete_hangar(hangar_id):
     except Error as e:
         return jsonify({'error': str(e)}), 400
 
+# ====================================
+# ==            PARKINGS            ==
+# ====================================
+
+def fetch_parking_rows(cursor, parking_ids):
+    """ Stands as dicts of PARKING_COLUMNS, read inside the current transaction """
+    placeholders = ', '.join(['%s'] * len(parking_ids))
+    cursor.execute(f"""
+        SELECT {', '.join(PARKING_COLUMNS)} FROM aircraft_parking
+        WHERE parking_id IN ({placeholders})
+    """, tuple(parking_ids))
+    return [dict(zip(PARKING_COLUMNS, row)) for row in cursor.fetchall()]
+
+def parked_elsewhere(cursor, aircraft_id, parking_id=None):
+    """
+    Location of another stand already holding the aircraft, or None. The
+    row is locked until the transaction ends; two requests that both find
+    nothing are told apart by unique_parked_aircraft (migration 010).
+    """
+    cursor.execute("""
+        SELECT location_identifier FROM aircraft_parking
+        WHERE aircraft_id = %s AND parking_id <> %s
+        LIMIT 1
+        FOR UPDATE
+    """, (aircraft_id, parking_id or 0))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def parked_elsewhere_response(location=None):
+    where = f"ya está en {location}" if location else "ya está en otro estacionamiento"
+    return jsonify({'error': f"La aeronave {where}. Use /api/parkings/move"}), 409
+
+@app.route('/api/parkings', methods=['GET'])
+@conditional('aircraft_parking')
+def get_parkings():
+    """Obtener todos los estacionamientos"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'Error de conexión'}), 500
+    
+    try:
+        cursor = connection.cursor()
+        filters = {
+            'airport_id': "airport_id = %s",
+            'parking_type': "parking_type = %s",
+            'status': "current_occupancy_status = %s",
+            'aircraft_id': "aircraft_id = %s"
+        }
+        if request.args.get('stream'):
+            return stream_collection(connection, cursor, "SELECT * FROM aircraft_parking", ['parking_id'], filters)
+        parkings, next_cursor = query_collection(cursor, "SELECT * FROM aircraft_parking", ['parking_id'], filters)
+        cursor.close()
+        connection.close()
+        return collection_response(parkings, next_cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/parkings/<int:parking_id>', methods=['GET'])
+@conditional('aircraft_parking')
+def get_parking(parking_id):
+    """Obtener un estacionamiento específico"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'Error de conexión'}), 500
+    
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT * FROM aircraft_parking WHERE parking_id = %s", (parking_id,))
+        result = format_results(cursor, cursor.fetchall())
+        cursor.close()
+        connection.close()
+        if result:
+            return jsonify(result[0])
+        return jsonify({'error': 'Estacionamiento no encontrado'}), 404
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/parkings', methods=['POST'])
+def create_parking():
+    """Crear nuevo estacionamiento"""
+    data = request.get_json()
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'Error de conexión'}), 500
+    
+    try:
+        cursor = connection.cursor()
+        if data.get('aircraft_id'):
+            location = parked_elsewhere(cursor, data['aircraft_id'])
+            if location:
+                connection.rollback()
+                return parked_elsewhere_response(location)
+        query = """
+            INSERT INTO aircraft_parking 
+            (airport_id, location_identifier, parking_type, current_occupancy_status, aircraft_id)
+            VALUES (%s, %s, %s, %s, %s)
+        """
+        values = (
+            data['airport_id'],
+            data['location_identifier'],
+            data['parking_type'],
+            data.get('current_occupancy_status', 'Available'),
+            data.get('aircraft_id')
+        )
+        cursor.execute(query, values)
+        new_id = cursor.lastrowid
+        rows = fetch_parking_rows(cursor, [new_id])
+        bump_table_versions(connection, 'aircraft_parking')
+        connection.commit()
+        parking_occupancy.apply(rows)
+        cursor.close()
+        connection.close()
+        return jsonify({'message': 'Estacionamiento creado exitosamente', 'id': new_id}), 201
+    except Error as e:
+        connection.rollback()
+        if 'unique_parked_aircraft' in str(e):
+            return parked_elsewhere_response()
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/parkings/<int:parking_id>', methods=['PUT'])
+def update_parking(parking_id):
+    """Actualizar estacionamiento"""
+    data = request.get_json()
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'Error de conexión'}), 500
+    
+    try:
+        cursor = connection.cursor()
+        if data.get('aircraft_id'):
+            location = parked_elsewhere(cursor, data['aircraft_id'], parking_id)
+            if location:
+                connection.rollback()
+                return parked_elsewhere_response(location)
+        query = """
+            UPDATE aircraft_parking SET
+            airport_id = %s, location_identifier = %s, parking_type = %s,
+            current_occupancy_status = %s, aircraft_id = %s
+            WHERE parking_id = %s
+        """
+        values = (
+            data['airport_id'],
+            data['location_identifier'],
+            data['parking_type'],
+            data['current_occupancy_status'],
+            data.get('aircraft_id'),
+            parking_id
+        )
+        cursor.execute(query, values)
+        rows = fetch_parking_rows(cursor, [parking_id])
+        if not rows:
+            connection.rollback()
+            return jsonify({'error': 'Estacionamiento no encontrado'}), 404
+        bump_table_versions(connection, 'aircraft_parking')
+        connection.commit()
+        parking_occupancy.apply(rows)
+        cursor.close()
+        connection.close()
+        return jsonify({'message': 'Estacionamiento actualizado exitosamente'})
+    except Error as e:
+        connection.rollback()
+        if 'unique_parked_aircraft' in str(e):
+            return parked_elsewhere_response()
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/parkings/<int:parking_id>', methods=['DELETE'])
+def delete_parking(parking_id):
+    """Eliminar estacionamiento"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'Error de conexión'}), 500
+    
+    try:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM aircraft_parking WHERE parking_id = %s", (parking_id,))
+        bump_table_versions(connection, 'aircraft_parking')
+        connection.commit()
+        parking_occupancy.remove(parking_id)
+        cursor.close()
+        connection.close()
+        return jsonify({'message': 'Estacionamiento eliminado exitosamente'})
+    except Error as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/parkings/move', methods=['POST'])
+def move_aircraft_parking():
+    """
+    Mover una aeronave a otro estacionamiento en una sola transacción:
+    el anterior queda Available y el nuevo Occupied.
+    Body: {"aircraft_id": 1, "to_parking_id": 5}
+    """
+    data = request.get_json() or {}
+    if not data.get('aircraft_id') or not data.get('to_parking_id'):
+        return jsonify({'error': 'aircraft_id y to_parking_id son obligatorios'}), 400
+    try:
+        # Compared with the locked rows and used as occupancy keys: "5"
+        # would match neither.
+        aircraft_id = parse_id(data['aircraft_id'], 'aircraft_id')
+        to_parking_id = parse_id(data['to_parking_id'], 'to_parking_id')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'Error de conexión'}), 500
+    
+    try:
+        cursor = connection.cursor()
+        # Lock the destination and the stand the aircraft is on now, so a
+        # concurrent move cannot take either of them half way through.
+        cursor.execute("""
+            SELECT parking_id, current_occupancy_status, aircraft_id FROM aircraft_parking
+            WHERE parking_id = %s OR aircraft_id = %s
+            FOR UPDATE
+        """, (to_parking_id, aircraft_id))
+        locked = cursor.fetchall()
+        target = next((row for row in locked if row[0] == to_parking_id), None)
+        if target is None:
+            connection.rollback()
+            return jsonify({'error': 'Estacionamiento no encontrado'}), 404
+        _, status, current_aircraft = target
+        if current_aircraft != aircraft_id and (current_aircraft is not None
+                                                or status not in ('Available', 'Reserved')):
+            connection.rollback()
+            return jsonify({'error': f'Estacionamiento no disponible ({status})'}), 409
+
+        cursor.execute("""
+            UPDATE aircraft_parking SET current_occupancy_status = 'Available', aircraft_id = NULL
+            WHERE aircraft_id = %s AND parking_id <> %s
+        """, (aircraft_id, to_parking_id))
+        cursor.execute("""
+            UPDATE aircraft_parking SET current_occupancy_status = 'Occupied', aircraft_id = %s
+            WHERE parking_id = %s
+        """, (aircraft_id, to_parking_id))
+        rows = fetch_parking_rows(cursor, [row[0] for row in locked])
+        bump_table_versions(connection, 'aircraft_parking')
+        connection.commit()
+        parking_occupancy.apply(rows)
+        cursor.close()
+        connection.close()
+        return jsonify({
+            'message': 'Aeronave movida exitosamente',
+            'from': [row[0] for row in locked if row[0] != to_parking_id],
+            'to': to_parking_id
+        })
+    except Error as e:
+        connection.rollback()
+        if 'unique_parked_aircraft' in str(e):
+            return parked_elsewhere_response()
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/airports/<int:airport_id>/parking', methods=['GET'])
+@conditional('aircraft_parking', 'aircraft')
+def get_airport_parking(airport_id):
+    """
+    Ocupación actual de los estacionamientos de un aeropuerto: totales por
+    parking_type y current_occupancy_status y la matrícula en cada puesto.
+    Se sirve desde memoria (parking.py).
+    """
+    try:
+        airport = reference_data.airport(airport_id)
+        if airport is None:
+            return jsonify({'error': 'Aeropuerto no encontrado'}), 404
+        occupancy = parking_occupancy.snapshot(airport_id)
+        for stand in occupancy['stands']:
+            aircraft = reference_data.aircraft(stand['aircraft_id']) if stand['aircraft_id'] else None
+            stand['tail_number'] = aircraft['tail_number'] if aircraft else None
+    except Error as e:
+        return jsonify({'error': str(e)}), 500
+
+    occupancy['airport_id'] = airport_id
+    occupancy['iata_code'] = airport['iata_code']
+    return jsonify(occupancy)
+
 # ====================================
 # ==    FLIGHT CREW ASSIGNMENT      ==
 # ====================================
 
 @app.route('/api/flight-crew-assignments', methods=['GET'])
+@conditional('flight_crew_assignment', 'flights', 'cabincrew')
 def get_all_flight_crew_assignments():
     """Obtener todas las asignaciones de tripulación de cabina"""
     connection = get_db_connection()
@@ -1110,6 +3437,7 @@ def get_all_flight_crew_assignments():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/flights/<int:flight_id>/crew', methods=['GET'])
+@conditional('flight_crew_assignment', 'cabincrew')
 def get_flight_crew(flight_id):
     """Obtener la tripulación de cabina asignada a un vuelo específico"""
     connection = get_db_connection()
@@ -1147,14 +3475,23 @@ def assign_crew_to_flight(flight_id):
         return jsonify({'error': 'Error de conexión'}), 500
     
     try:
+        hint = schedule_index.flight_conflicts(flight_id, [data['crew_member_id']])
         cursor = connection.cursor()
+        lock_schedule_people(cursor, crew=[data['crew_member_id']])
         query = """
             INSERT INTO flight_crew_assignment (flight_id, crew_member_id)
             VALUES (%s, %s)
         """
         cursor.execute(query, (flight_id, data['crew_member_id']))
-        connection.commit()
         new_id = cursor.lastrowid
+        conflicts = settle_schedule_conflicts(
+            hint, stored_crew_conflicts(cursor, [(flight_id, data['crew_member_id'])]))
+        if conflicts:
+            connection.rollback()
+            return schedule_conflict_response(conflicts)
+        bump_table_versions(connection, 'flight_crew_assignment')
+        connection.commit()
+        schedule_index.add_crew([(flight_id, data['crew_member_id'])])
         cursor.close()
         connection.close()
         return jsonify({'message': 'Tripulación asignada exitosamente', 'id': new_id}), 201
@@ -1163,6 +3500,66 @@ def assign_crew_to_flight(flight_id):
             return jsonify({'error': 'Este miembro de tripulación ya está asignado a este vuelo'}), 400
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/flight-crew-assignments/bulk', methods=['POST'])
+def bulk_crew_assignments():
+    """
+    Assign and unassign cabin crew for many flights in one transaction.
+    Body: {"assign": [{"flight_id": 1, "crew_member_ids": [2, 3]}, ...],
+           "unassign": [{"flight_id": 4, "crew_member_ids": [5]}, ...]}
+    Pairs that are already assigned are kept; nothing is written if any
+    statement fails or if an assignment overlaps another flight of the
+    crew member.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        to_assign = parse_assignment_pairs(data.get('assign', []), 'assign')
+        to_unassign = parse_assignment_pairs(data.get('unassign', []), 'unassign')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        # Checked against the schedule as it will be: without the pairs
+        # unassigned here and with every pair assigned here.
+        hint = schedule_index.crew_changes_conflicts(to_assign, to_unassign)
+        cursor = connection.cursor()
+        lock_schedule_people(cursor, crew=[crew_id for _, crew_id in to_assign])
+        removed = delete_crew_assignments(cursor, to_unassign)
+        insert_crew_assignments(cursor, to_assign, keep_existing=True)
+        conflicts = settle_schedule_conflicts(hint, stored_crew_conflicts(cursor, to_assign))
+        if conflicts:
+            connection.rollback()
+            return schedule_conflict_response(conflicts)
+        bump_table_versions(connection, 'flight_crew_assignment')
+        connection.commit()
+        schedule_index.remove_crew(to_unassign)
+        schedule_index.add_crew(to_assign)
+        cursor.close()
+        connection.close()
+        return jsonify({
+            'message': 'Crew assignments updated successfully.',
+            'assigned': len(to_assign),
+            'unassigned': removed
+        })
+    except Error as e:
+        connection.rollback()
+        return jsonify({'error': str(e)}), 400
+
+def parse_assignment_pairs(entries, field):
+    """ [{"flight_id": f, "crew_member_ids": [...]}, ...] -> [(f, crew_id), ...] """
+    if not isinstance(entries, list):
+        raise ValueError(f"{field} must be a list.")
+    pairs = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not isinstance(entry.get('flight_id'), int):
+            raise ValueError(f"Every {field} entry needs an integer flight_id.")
+        crew_ids = parse_id_list(entry.get('crew_member_ids', []), 'crew_member_ids')
+        pairs.extend((entry['flight_id'], crew_id) for crew_id in crew_ids)
+    return list(dict.fromkeys(pairs))
+
 @app.route('/api/flight-crew-assignments/<int:assignment_id>', methods=['DELETE'])
 def delete_crew_assignment(assignment_id):
     """Eliminar una asignación de tripulación de cabina"""
@@ -1172,8 +3569,13 @@ def delete_crew_assignment(assignment_id):
     
     try:
         cursor = connection.cursor()
+        cursor.execute("SELECT flight_id, crew_member_id FROM flight_crew_assignment WHERE assignment_id = %s",
+                       (assignment_id,))
+        pairs = cursor.fetchall()
         cursor.execute("DELETE FROM flight_crew_assignment WHERE assignment_id = %s", (assignment_id,))
+        bump_table_versions(connection, 'flight_crew_assignment')
         connection.commit()
+        schedule_index.remove_crew(pairs)
         cursor.close()
         connection.close()
         return jsonify({'message': 'Asignación eliminada exitosamente'})
@@ -1193,7 +3595,9 @@ def remove_crew_from_flight(flight_id, crew_member_id):
             "DELETE FROM flight_crew_assignment WHERE flight_id = %s AND crew_member_id = %s",
             (flight_id, crew_member_id)
         )
+        bump_table_versions(connection, 'flight_crew_assignment')
         connection.commit()
+        schedule_index.remove_crew([(flight_id, crew_member_id)])
         affected_rows = cursor.rowcount
         cursor.close()
         connection.close()
@@ -1205,6 +3609,99 @@ def remove_crew_from_flight(flight_id, crew_member_id):
     except Error as e:
         return jsonify({'error': str(e)}), 400
 
+# ====================================
+# ==          BULK IMPORT           ==
+# ====================================
+
+def import_check(entity):
+    """
+    Extra row check of an import (see bulk_import.import_records): imported
+    flights must not double-book a pilot, with the stored schedule or with
+    the rows stored before them by the same import. None for the other
+    entities.
+    """
+    return FlightImportCheck() if entity == 'flights' else None
+
+class FlightImportCheck:
+    """ import_check of flights, on a BatchConflicts over schedule_index """
+
+    def __init__(self):
+        self.columns = [field[0] for field in IMPORT_SPECS['flights'][1]]
+        # Nothing re-checks imported rows in the database: start from a
+        # fresh load rather than a possibly stale index.
+        schedule_index.load()
+        self.batch = BatchConflicts(schedule_index)
+
+    def __call__(self, line_number, values):
+        flight = dict(zip(self.columns, values))
+        start, end = flight_interval(flight['scheduled_departure_time'], flight['scheduled_arrival_time'])
+        pilots = (flight['pilot_command_id'], flight['pilot_first_officer_id'])
+        if pilots[0] == pilots[1]:
+            raise ValueError('pilot_command_id and pilot_first_officer_id must be different.')
+        if flight['flight_status'] in INACTIVE_STATUSES:
+            return
+        conflicts = self.batch.check(start, end, pilots, f"line {line_number}")
+        if conflicts:
+            raise ValueError('Schedule conflict: ' + '; '.join(
+                f"pilot {conflict['id']} is already on "
+                + (conflict['flight_id'] if isinstance(conflict['flight_id'], str)
+                   else f"flight {conflict['flight_id']}")
+                for conflict in conflicts))
+
+    def commit(self):
+        self.batch.commit()
+
+    def rollback(self):
+        self.batch.rollback()
+
+@app.route('/api/import/<entity>', methods=['POST'])
+def bulk_import(entity):
+    """
+    Load many pilots, crew members, aircraft or flights at once. The body is
+    either the raw CSV / NDJSON data or a multipart upload in the 'file'
+    field. ?format=csv|ndjson (default from the Content-Type or file name),
+    ?chunk_size=N rows per commit.
+    """
+    if entity not in IMPORT_SPECS:
+        return jsonify({'error': f"Unknown entity '{entity}'. Use one of: {', '.join(IMPORT_SPECS)}."}), 404
+
+    upload = request.files.get('file')
+    fmt = request.args.get('format')
+    if not fmt:
+        name = upload.filename if upload else ''
+        content_type = upload.mimetype if upload else request.mimetype
+        fmt = 'ndjson' if 'ndjson' in content_type or name.endswith(('.ndjson', '.jsonl')) else 'csv'
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'error': "format must be 'csv' or 'ndjson'."}), 400
+
+    chunk_size = request.args.get('chunk_size', DEFAULT_CHUNK_SIZE, type=int)
+    if not chunk_size or not 1 <= chunk_size <= 50000:
+        return jsonify({'error': 'chunk_size must be between 1 and 50000.'}), 400
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500
+
+    try:
+        # Every chunk is committed with its table_versions bump, so rows of
+        # the chunks before a failure are stored and already invalidate ETags.
+        stream = upload.stream if upload else io.BufferedReader(request.stream)
+        report = import_records(connection, entity, read_records(stream, fmt), chunk_size,
+                                import_check(entity))
+        connection.close()
+        return jsonify(report), 200
+    except (ValueError, UnicodeDecodeError) as e:
+        connection.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Error as e:
+        connection.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if entity == 'aircraft':
+            reference_data.invalidate('aircraft')
+        elif entity == 'flights':
+            schedule_index.invalidate()
+
 ######################################
 ##              MAIN                ##
 ######################################
@@ -1215,5 +3712,16 @@ if __name__ == '__main__':
     print("Enter at: http://localhost:5000")
     print("API available at: http://localhost:5000/api")
     print("=" * 50)
+
+    # Debug server: rebuild the static files when one is edited.
+    static_assets.check_changes = True
+    static_assets.load()
+
+    try:
+        reference_data.load()
+        parking_occupancy.load()
+        schedule_index.load()
+    except Error as e:
+        print(f"WARNING: Reference data not preloaded, it will load on first use: {e}")
     
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
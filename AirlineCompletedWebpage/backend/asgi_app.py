@@ -0,0 +1,393 @@
+"""
+Asynchronous serving mode of the airline API (ASGI).
+
+    pip install -r requirements.txt -r requirements-asgi.txt
+    uvicorn asgi_app:application --app-dir backend --port 5001
+
+The read routes the ops screens poll the most (the flight, pilot, cabin
+crew, aircraft and airport collections and single flights) are answered
+here with aiomysql. While a query runs the event loop serves other
+requests, and a request that finds every connection busy waits on the
+pool without holding a thread, so one process keeps hundreds of requests
+in flight.
+
+Every other route, and ?stream= downloads, go to the Flask app of app.py
+on a thread pool. Both halves share the query building, row serialization,
+ETags and response helpers of app.py, so the process serves the same /api
+routes with the same response shapes and headers.
+"""
+import asyncio
+import contextvars
+import io
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import aiomysql
+import pymysql
+from flask import request, g, jsonify, make_response
+from mysql.connector import Error
+
+from app import (app, DB_CONFIG, POOL_CONFIG, POOL_WAIT_WARNING, IN_BATCH_SIZE,
+                 PERSON_FILTERS, AIRCRAFT_FILTERS, AIRPORT_FILTERS,
+                 FLIGHT_LIST_QUERY, FLIGHT_LIST_ORDER, FLIGHT_FILTERS, CREW_BY_FLIGHT_QUERY,
+                 reference_data, parking_occupancy, schedule_index, static_assets, metrics, cache_requests,
+                 json_encoder, build_collection_query, page_rows, collection_response, format_results,
+                 group_crew_rows, serialization_timer, add_flight_codes, add_stage_lengths, table_versions_query, versions_etag,
+                 not_modified, sync_caches)
+from serializers import serialize_rows
+from sql_metrics import AsyncInstrumentedCursor
+
+# aiomysql pool. Connections only wait on the network here, so the pool
+# can be larger than the Flask one without adding threads.
+ASYNC_POOL_CONFIG = {
+    'minsize': POOL_CONFIG['size'],
+    'maxsize': 50,
+    'pool_recycle': POOL_CONFIG['max_lifetime']
+}
+
+# Threads running the Flask routes (and the in-memory reference data loads).
+WSGI_THREADS = 32
+
+pool = None
+executor = ThreadPoolExecutor(max_workers=WSGI_THREADS, thread_name_prefix='wsgi')
+
+
+class DatabaseUnavailable(Exception):
+    pass
+
+
+# ====================================
+# ==         DATABASE ACCESS        ==
+# ====================================
+async def create_pool():
+    return await aiomysql.create_pool(
+        host=DB_CONFIG['host'],
+        port=DB_CONFIG['port'],
+        user=DB_CONFIG['user'],
+        password=DB_CONFIG['password'],
+        db=DB_CONFIG['database'],
+        # Read only routes: no transaction (and no old snapshot) is left
+        # open on a connection going back to the pool.
+        autocommit=True,
+        **ASYNC_POOL_CONFIG
+    )
+
+async def acquire_connection():
+    """
+    pool.acquire() within the pool timeout. The acquire runs in its own
+    task behind asyncio.shield: wait_for can give up (timeout, or the
+    request being cancelled) just as the acquire completes, and the
+    connection it got is then given back instead of leaking.
+    """
+    async def acquire():
+        return await pool.acquire()
+
+    task = asyncio.ensure_future(acquire())
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), POOL_CONFIG['timeout'])
+    except BaseException:
+        task.cancel()
+        task.add_done_callback(release_acquired)
+        raise
+
+def release_acquired(task):
+    """ Done callback of an abandoned acquire: release what it got """
+    if not task.cancelled() and task.exception() is None:
+        pool.release(task.result())
+
+@asynccontextmanager
+async def db_cursor():
+    """ Cursor on a pooled connection; the wait is added to X-DB-Pool-Wait """
+    start = time.monotonic()
+    try:
+        connection = await acquire_connection()
+    except (asyncio.TimeoutError, pymysql.MySQLError) as e:
+        print(f"ERROR: Error while connecting to MYSQL: {e}")
+        raise DatabaseUnavailable()
+    wait = time.monotonic() - start
+    if wait > POOL_WAIT_WARNING:
+        print(f"WARNING: Waited {wait:.3f}s for a database connection.")
+    g.pool_wait = g.get('pool_wait', 0.0) + wait
+    try:
+        async with connection.cursor() as cursor:
+            stats = g.get('sql_stats')
+            yield AsyncInstrumentedCursor(cursor, stats) if stats is not None else cursor
+    finally:
+        pool.release(connection)
+
+@metrics.collector
+def async_pool_metrics():
+    if pool is None:
+        return []
+    return [
+        ('airline_async_db_pool_connections', 'gauge', 'Open aiomysql connections by state.', ('state',),
+         [(('idle',), pool.freesize), (('in_use',), pool.size - pool.freesize)]),
+        ('airline_async_db_pool_limit', 'gauge', 'Connections opened at most by the aiomysql pool.', (),
+         [((), pool.maxsize)]),
+    ]
+
+async def run_sync(func, *args):
+    """ Run blocking code (reference data loads, NumPy) on the thread pool """
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+async def query_collection(cursor, select_query, order_columns, filters, descending=False):
+    """ Same as app.query_collection, on an aiomysql cursor """
+    query, params, limit = build_collection_query(select_query, order_columns, filters, descending)
+    await cursor.execute(query, params)
+    data = await cursor.fetchall()
+    with serialization_timer(len(data)):
+        rows = serialize_rows(cursor.description, data, json_encoder.native)
+    return page_rows(rows, limit, order_columns)
+
+async def fetch_crew_by_flight(cursor, flight_ids):
+    crew_by_flight = {}
+    for start in range(0, len(flight_ids), IN_BATCH_SIZE):
+        batch = flight_ids[start:start + IN_BATCH_SIZE]
+        await cursor.execute(CREW_BY_FLIGHT_QUERY.format(placeholders=', '.join(['%s'] * len(batch))),
+                             tuple(batch))
+        group_crew_rows(crew_by_flight, await cursor.fetchall())
+    return crew_by_flight
+
+async def conditional_etag(tables, extra=''):
+    """ ETag from table_versions like app.conditional; None if it cannot be built """
+    try:
+        async with db_cursor() as cursor:
+            await cursor.execute(table_versions_query(tables), tables)
+            versions = await cursor.fetchall()
+        return versions_etag(tables, versions, extra)
+    except (DatabaseUnavailable, pymysql.MySQLError, Error):
+        return None
+
+
+# ====================================
+# ==          NATIVE ROUTES         ==
+# ====================================
+# (pattern, tables of the conditional GET, handler). Handlers run inside a
+# Flask request context, so request.args, g and jsonify work as in app.py.
+ROUTES = []
+
+def route(pattern, *tables):
+    def decorator(handler):
+        ROUTES.append((re.compile(pattern + '$'), tables, handler))
+        return handler
+    return decorator
+
+async def collection(select_query, order_columns, filters, descending=False):
+    async with db_cursor() as cursor:
+        rows, next_cursor = await query_collection(cursor, select_query, order_columns, filters, descending)
+    return collection_response(rows, next_cursor)
+
+@route(r'/api/pilots', 'pilots')
+async def get_pilots():
+    return await collection("SELECT * FROM pilots", ['pilot_id'], PERSON_FILTERS)
+
+@route(r'/api/crew-members', 'cabincrew')
+async def get_crew_members():
+    return await collection("SELECT * FROM cabincrew", ['crew_member_id'], PERSON_FILTERS)
+
+@route(r'/api/aircraft', 'aircraft')
+async def get_aircraft():
+    if not request.args:
+        return jsonify(await run_sync(reference_data.aircraft_list))
+    return await collection("SELECT * FROM aircraft", ['aircraft_id'], AIRCRAFT_FILTERS)
+
+@route(r'/api/airports', 'airports')
+async def get_airports():
+    if not request.args:
+        return jsonify(await run_sync(reference_data.airports))
+    return await collection("SELECT * FROM airports", ['airport_id'], AIRPORT_FILTERS)
+
+@route(r'/api/flights', 'flights', 'flight_crew_assignment', 'cabincrew', 'airports', 'aircraft')
+async def get_flights():
+    async with db_cursor() as cursor:
+        flights, next_cursor = await query_collection(cursor, FLIGHT_LIST_QUERY, FLIGHT_LIST_ORDER,
+                                                      FLIGHT_FILTERS, descending=True)
+        crew_by_flight = await fetch_crew_by_flight(cursor, [flight['flight_id'] for flight in flights])
+    await run_sync(decorate_flights, flights, crew_by_flight)
+    return collection_response(flights, next_cursor)
+
+def decorate_flights(flights, crew_by_flight):
+    add_flight_codes(flights)
+    add_stage_lengths(flights)
+    for flight in flights:
+        flight['crew_members'] = crew_by_flight.get(flight['flight_id'], [])
+
+@route(r'/api/flights/(?P<flight_id>[0-9]+)', 'flights', 'airports')
+async def get_flight(flight_id):
+    async with db_cursor() as cursor:
+        await cursor.execute("SELECT * FROM flights WHERE flight_id = %s", (int(flight_id),))
+        flights = format_results(cursor, await cursor.fetchall())
+    if not flights:
+        return jsonify({'error': 'Flight not found'}), 404
+    await run_sync(add_stage_lengths, flights)
+    return jsonify(flights[0])
+
+def match_route(method, path):
+    if method != 'GET':
+        return None
+    for pattern, tables, handler in ROUTES:
+        match = pattern.match(path)
+        if match:
+            return tables, handler, match.groupdict()
+    return None
+
+async def call_native(tables, handler, kwargs):
+    """ Handler wrapped like an app.py view: conditional GET and error responses """
+    etag = await conditional_etag(tables)
+    if etag is not None:
+        g.etag = etag
+        if request.if_none_match.contains_weak(etag):
+            cache_requests.inc(cache='conditional_get', result='hit')
+            return not_modified(etag)
+    if etag is not None:
+        cache_requests.inc(cache='conditional_get', result='miss')
+        sync_caches()
+    try:
+        response = make_response(await handler(**kwargs))
+    except DatabaseUnavailable:
+        return make_response(jsonify({'error': 'An error occurred while attempting to connect to the database.'}), 500)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+    except (pymysql.MySQLError, Error) as e:
+        # Error: mysql.connector, from the app.py helpers run through run_sync
+        return make_response(jsonify({'error': str(e)}), 500)
+    if etag is not None and response.status_code == 200:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+# ====================================
+# ==          ASGI SERVER           ==
+# ====================================
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+def wsgi_environ(scope, body):
+    """ PEP 3333 environ of an ASGI http scope """
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'CONTENT_LENGTH': str(len(body)),
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+def encode_headers(headers):
+    return [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+async def serve_native(environ, send, tables, handler, kwargs):
+    # The request context is pushed in this task's own contextvars, so
+    # concurrent requests on the event loop do not see each other's.
+    with app.request_context(environ):
+        # before_request hooks (SQL stats) as for a Flask view.
+        response = app.preprocess_request()
+        if response is None:
+            response = await call_native(tables, handler, kwargs)
+        response = app.process_response(make_response(response))
+    await send({'type': 'http.response.start', 'status': response.status_code,
+                'headers': encode_headers(response.headers.items())})
+    await send({'type': 'http.response.body', 'body': response.get_data()})
+
+async def serve_wsgi(environ, send):
+    """
+    Run the Flask app on the thread pool. Every step runs in the same
+    contextvars Context, so a streamed response (stream_with_context) can
+    be resumed from any worker thread.
+    """
+    context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+
+    def step(function, *args):
+        return loop.run_in_executor(executor, context.run, function, *args)
+
+    body = await step(app, environ, start_response)
+    done = object()
+    try:
+        chunks = iter(body)
+        await send({'type': 'http.response.start', 'status': started['status'],
+                    'headers': encode_headers(started['headers'])})
+        while True:
+            chunk = await step(next, chunks, done)
+            if chunk is done:
+                break
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        if hasattr(body, 'close'):
+            await step(body.close)
+
+async def lifespan(receive, send):
+    global pool
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                pool = await create_pool()
+            except pymysql.MySQLError as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await run_sync(static_assets.load)
+            try:
+                await run_sync(reference_data.load)
+                await run_sync(parking_occupancy.load)
+                await run_sync(schedule_index.load)
+            except Exception as e:
+                print(f"WARNING: Reference data not preloaded, it will load on first use: {e}")
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if pool is not None:
+                pool.close()
+                await pool.wait_closed()
+            executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    body = await read_body(receive)
+    environ = wsgi_environ(scope, body)
+    native = match_route(scope['method'], scope['path'])
+    # Streamed downloads keep the unbuffered cursor of app.stream_collection.
+    if native and pool is not None and b'stream=' not in scope['query_string']:
+        return await serve_native(environ, send, *native)
+    return await serve_wsgi(environ, send)
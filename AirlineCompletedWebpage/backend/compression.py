@@ -0,0 +1,170 @@
+"""
+Response compression and the precompressed frontend.
+
+API responses are compressed on the fly with the best encoding the client
+accepts (brotli when the brotli package is installed, else gzip), only
+above a size threshold: small bodies gain little and cost CPU.
+
+The frontend files are read once and kept in memory with a gzip and a
+brotli copy compressed at the highest level. Each file also gets a
+fingerprinted name (styles.<hash>.css) that index.html is rewritten to
+use, so those URLs can be cached by browsers for a year: a new version of
+a file gets a new name. index.html itself is revalidated with its ETag.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred first.
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'application/javascript',
+                      'text/')
+
+# Levels of the precompressed static files (built once, so the slowest).
+STATIC_LEVELS = {'br': 11, 'gzip': 9}
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_REFERENCE = re.compile(r'(\b(?:href|src)=")([^"?#]+)(")')
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def negotiate(accept_encoding):
+    """ Best encoding of ENCODINGS allowed by an Accept-Encoding header, or None """
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compressible(mimetype):
+    return bool(mimetype) and mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+class Asset:
+    __slots__ = ('name', 'fingerprinted', 'mimetype', 'etag', 'bodies')
+
+    def __init__(self, name, fingerprinted, mimetype, etag, bodies):
+        self.name = name
+        self.fingerprinted = fingerprinted
+        self.mimetype = mimetype
+        self.etag = etag
+        self.bodies = bodies  # encoding (None = identity) -> bytes
+
+
+class StaticAssets:
+    """
+    The files of `folder` in memory, precompressed and fingerprinted.
+    With check_changes the folder is scanned again when a file was
+    modified (development server).
+    """
+
+    def __init__(self, folder, check_changes=False):
+        self.folder = folder
+        self.check_changes = check_changes
+        self._lock = threading.Lock()
+        self._assets = None
+        self._mtimes = None
+        self.loads = 0
+
+    def _scan(self):
+        mtimes = {}
+        for root, _, files in os.walk(self.folder):
+            for filename in files:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, self.folder).replace(os.sep, '/')
+                mtimes[name] = os.stat(path).st_mtime_ns
+        return mtimes
+
+    def load(self):
+        """ Read, fingerprint and compress every file. Returns name -> Asset """
+        mtimes = self._scan()
+        contents = {}
+        for name in mtimes:
+            with open(os.path.join(self.folder, name), 'rb') as stream:
+                contents[name] = stream.read()
+
+        fingerprinted = {}
+        for name, data in contents.items():
+            if name.endswith('.html'):
+                continue
+            stem, extension = os.path.splitext(name)
+            fingerprinted[name] = f"{stem}.{hashlib.sha1(data).hexdigest()[:12]}{extension}"
+
+        def rewrite(match):
+            target = fingerprinted.get(match.group(2))
+            return match.group(1) + (target or match.group(2)) + match.group(3)
+
+        assets = {}
+        for name, data in contents.items():
+            mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            if name.endswith('.html'):
+                data = _REFERENCE.sub(rewrite, data.decode('utf-8')).encode('utf-8')
+            bodies = {None: data}
+            if compressible(mimetype):
+                for encoding in ENCODINGS:
+                    bodies[encoding] = compress(data, encoding, STATIC_LEVELS[encoding])
+            asset = Asset(name, fingerprinted.get(name), mimetype,
+                          hashlib.sha1(data).hexdigest()[:16], bodies)
+            assets[name] = asset
+            if asset.fingerprinted:
+                assets[asset.fingerprinted] = asset
+
+        with self._lock:
+            self._assets = assets
+            self._mtimes = mtimes
+            self.loads += 1
+        return assets
+
+    def get(self, name):
+        """ (asset, immutable) for a plain or fingerprinted name; (None, False) if unknown """
+        assets = self._assets
+        if assets is None or (self.check_changes and self._scan() != self._mtimes):
+            assets = self.load()
+        asset = assets.get(name)
+        if asset is None:
+            return None, False
+        return asset, name == asset.fingerprinted
+
+    def stats(self):
+        assets = self._assets
+        if assets is None:
+            return {'loads': self.loads, 'files': None}
+        files = {asset.name: asset for asset in assets.values()}
+        return {
+            'loads': self.loads,
+            'encodings': list(ENCODINGS),
+            'files': {
+                name: {
+                    'fingerprinted': asset.fingerprinted,
+                    'sizes': {encoding or 'identity': len(body) for encoding, body in asset.bodies.items()}
+                }
+                for name, asset in sorted(files.items())
+            }
+        }
@@ -0,0 +1,210 @@
+"""
+Connection pool for the airline API.
+
+Keeps MySQL connections open between requests so a handler does not pay
+the connect + auth handshake every time it calls get_db_connection().
+The connection handed out behaves like a normal mysql.connector
+connection; calling close() on it gives it back to the pool, and using it
+after that raises PoolError.
+
+This is the only copy: the root app.py and airlinedatabase/backend/app.py
+import it from here.
+"""
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+
+
+class PooledConnection:
+    """ Wrapper around a real connection; close() returns it to the pool """
+
+    def __init__(self, pool, connection, created_at, wait_time):
+        self._pool = pool
+        self._connection = connection
+        self._created_at = created_at
+        self._released = False
+        self.wait_time = wait_time
+
+    def __getattr__(self, name):
+        return getattr(self._live(), name)
+
+    def _live(self):
+        # After close() the connection may already belong to another request.
+        if self._released:
+            raise PoolError('This connection was returned to the pool.')
+        return self._connection
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._live().cursor(*args, **kwargs)
+        if self._pool.cursor_wrapper is not None:
+            cursor = self._pool.cursor_wrapper(cursor)
+        return cursor
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self._connection, self._created_at)
+
+
+class ConnectionPool:
+    """
+    Thread safe pool of MySQL connections.
+
+    size          connections kept open while idle.
+    max_overflow  extra connections opened under load and closed on return.
+    timeout       seconds a request waits for a free connection.
+    validate      ping the connection on checkout and replace it if dead.
+    max_lifetime  seconds after which a connection is closed and reopened.
+    cursor_wrapper  optional callable applied to every cursor handed out
+                  (used for the SQL instrumentation of app.py).
+    """
+
+    def __init__(self, db_config, size=5, max_overflow=10, timeout=10.0,
+                 validate=True, max_lifetime=1800, cursor_wrapper=None):
+        self._db_config = dict(db_config)
+        self.cursor_wrapper = cursor_wrapper
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.validate = validate
+        self.max_lifetime = max_lifetime
+
+        self._idle = deque()
+        self._opened = 0
+        self._condition = threading.Condition()
+
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    # ------------------------------------
+    # CHECKOUT / RELEASE
+    # ------------------------------------
+    def get_connection(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        blocked = False
+
+        with self._condition:
+            while True:
+                if self._idle:
+                    connection, created_at = self._idle.pop()
+                    break
+                if self._opened < self.size + self.max_overflow:
+                    self._opened += 1
+                    connection, created_at = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolError(
+                        f"No connection available after waiting {self.timeout}s "
+                        f"({self._opened} connections in use)."
+                    )
+                blocked = True
+                self._condition.wait(remaining)
+
+        if connection is not None and not self._is_usable(connection, created_at):
+            self._close_quietly(connection)
+            connection = None
+
+        if connection is None:
+            try:
+                connection = mysql.connector.connect(**self._db_config)
+            except Error:
+                with self._condition:
+                    self._opened -= 1
+                    self._condition.notify()
+                raise
+            created_at = time.monotonic()
+
+        wait_time = time.monotonic() - start
+        with self._condition:
+            self._checkouts += 1
+            if blocked:
+                self._waits += 1
+            self._wait_time_total += wait_time
+            self._wait_time_max = max(self._wait_time_max, wait_time)
+
+        return PooledConnection(self, connection, created_at, wait_time)
+
+    def _release(self, connection, created_at):
+        healthy = True
+        try:
+            # Never hand out a connection with an open transaction: the next
+            # request would see an old snapshot or inherit pending writes.
+            if connection.in_transaction:
+                connection.rollback()
+        except Error:
+            healthy = False
+
+        with self._condition:
+            keep = (healthy
+                    and len(self._idle) < self.size
+                    and not self._expired(created_at))
+            if keep:
+                self._idle.append((connection, created_at))
+            else:
+                self._opened -= 1
+            self._condition.notify()
+
+        if not keep:
+            self._close_quietly(connection)
+
+    # ------------------------------------
+    # HELPERS
+    # ------------------------------------
+    def _expired(self, created_at):
+        if not self.max_lifetime:
+            return False
+        return time.monotonic() - created_at > self.max_lifetime
+
+    def _is_usable(self, connection, created_at):
+        if self._expired(created_at):
+            return False
+        if not self.validate:
+            return True
+        try:
+            return connection.is_connected()
+        except Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Error:
+            pass
+
+    def close_all(self):
+        """ Close every idle connection (used on shutdown) """
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._opened -= len(idle)
+        for connection, _ in idle:
+            self._close_quietly(connection)
+
+    def stats(self):
+        """ Current pool state and accumulated wait times (seconds) """
+        with self._condition:
+            return {
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'opened': self._opened,
+                'idle': len(self._idle),
+                'in_use': self._opened - len(self._idle),
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'wait_time_total': round(self._wait_time_total, 6),
+                'wait_time_avg': round(self._wait_time_total / self._checkouts, 6) if self._checkouts else 0.0,
+                'wait_time_max': round(self._wait_time_max, 6),
+            }
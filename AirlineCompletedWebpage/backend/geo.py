@@ -0,0 +1,282 @@
+"""
+Great-circle distances between airports.
+
+With NumPy installed the haversine distance of every airport pair is
+computed in one vectorized pass, saved to disk as a .npy file named after
+a hash of the airport ids and coordinates, and opened again with
+mmap_mode='r'. Worker processes share the file through the page cache
+and it is only rebuilt when the airports change. Without NumPy each
+distance is computed on demand with the math module.
+
+AirportIndex answers "airports near a point" with a KD-tree over the
+airports as 3D unit vectors. On the unit sphere the straight-line (chord)
+distance grows with the great-circle distance, so radius and nearest
+neighbour searches are plain Euclidean searches in the tree, pruned by
+one coordinate per level: O(log n) per query instead of a full scan.
+"""
+import glob
+import hashlib
+import heapq
+import math
+import os
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Block time estimate: a fixed allowance for taxi, climb and descent plus
+# the great-circle distance flown at an average cruise speed.
+BLOCK_FIXED_MINUTES = 30
+CRUISE_SPEED_KMH = 800
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def block_minutes(distance_km):
+    """ Estimated gate to gate time for a stage length """
+    if distance_km is None:
+        return None
+    return round(BLOCK_FIXED_MINUTES + distance_km / CRUISE_SPEED_KMH * 60)
+
+
+def airports_key(airports):
+    """ Hash of the ids and coordinates the matrix is built from """
+    digest = hashlib.sha1()
+    for airport in airports:
+        digest.update(f"{airport['airport_id']}:{airport['latitude']}:{airport['longitude']};".encode())
+    return digest.hexdigest()[:16]
+
+
+def haversine_matrix(latitudes, longitudes):
+    """ n x n great-circle distances in km (float32) from degree arrays """
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    a = (np.sin((lat[:, None] - lat[None, :]) / 2) ** 2
+         + np.cos(lat)[:, None] * np.cos(lat)[None, :]
+         * np.sin((lon[:, None] - lon[None, :]) / 2) ** 2)
+    return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))).astype(np.float32)
+
+
+class DistanceMatrix:
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        # (source, key, index, coords, matrix), replaced as a whole so a
+        # reader never pairs the index of one build with another's matrix.
+        self._state = (None, None, {}, [], None)
+        self.builds = 0
+
+    def _prepare(self, airports):
+        """ State matching `airports` (a refdata snapshot list) """
+        state = self._state
+        if airports is state[0]:
+            return state
+        with self._lock:
+            state = self._state
+            if airports is state[0]:
+                return state
+            key = airports_key(airports)
+            if key == state[1]:
+                state = (airports,) + state[1:]
+            else:
+                state = (airports, key,
+                         {airport['airport_id']: i for i, airport in enumerate(airports)},
+                         [(airport['latitude'], airport['longitude']) for airport in airports],
+                         self._open(airports, key) if np is not None else None)
+            self._state = state
+            return state
+
+    def _open(self, airports, key):
+        path = os.path.join(self.cache_dir, f"distances-{key}.npy")
+        try:
+            return np.load(path, mmap_mode='r')
+        except FileNotFoundError:
+            # Not built yet, or removed by a process that moved on to
+            # other airports: build it (again).
+            pass
+        os.makedirs(self.cache_dir, exist_ok=True)
+        matrix = haversine_matrix([airport['latitude'] for airport in airports],
+                                  [airport['longitude'] for airport in airports])
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as stream:
+            np.save(stream, matrix)
+        os.replace(temporary, path)
+        self.builds += 1
+        for old in glob.glob(os.path.join(self.cache_dir, 'distances-*.npy')):
+            if old != path:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+        try:
+            return np.load(path, mmap_mode='r')
+        except FileNotFoundError:
+            return matrix
+
+    def distance(self, airports, origin_id, destination_id):
+        """ Great-circle km between two airport ids, None if either is unknown """
+        return self.distances(airports, [(origin_id, destination_id)])[0]
+
+    def distances(self, airports, pairs):
+        """ km for each (origin_id, destination_id) pair, in one vectorized lookup """
+        _, _, index, coords, matrix = self._prepare(airports)
+        rows = [index.get(origin) for origin, _ in pairs]
+        columns = [index.get(destination) for _, destination in pairs]
+        known = [i for i, (row, column) in enumerate(zip(rows, columns))
+                 if row is not None and column is not None]
+        result = [None] * len(pairs)
+        if not known:
+            return result
+        if matrix is not None:
+            values = matrix[np.array([rows[i] for i in known]),
+                                  np.array([columns[i] for i in known])]
+            for i, value in zip(known, values.tolist()):
+                result[i] = round(value, 1)
+        else:
+            for i in known:
+                result[i] = round(haversine_km(*coords[rows[i]], *coords[columns[i]]), 1)
+        return result
+
+    def stats(self):
+        _, key, index, _, _ = self._state
+        return {
+            'numpy': np is not None,
+            'airports': len(index),
+            'key': key,
+            'builds': self.builds,
+        }
+
+
+# ====================================
+# ==        NEAREST AIRPORTS        ==
+# ====================================
+def unit_vector(latitude, longitude):
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def km_to_chord(distance_km):
+    return 2 * math.sin(min(math.pi, distance_km / EARTH_RADIUS_KM) / 2)
+
+
+class _Node:
+    __slots__ = ('point', 'item', 'axis', 'left', 'right')
+
+    def __init__(self, point, item, axis, left, right):
+        self.point = point
+        self.item = item
+        self.axis = axis
+        self.left = left
+        self.right = right
+
+
+def _build_tree(entries, depth=0):
+    """ entries: [(point, item)]; splits on x, y, z in turn at the median """
+    if not entries:
+        return None
+    axis = depth % 3
+    entries.sort(key=lambda entry: entry[0][axis])
+    middle = len(entries) // 2
+    point, item = entries[middle]
+    return _Node(point, item, axis,
+                 _build_tree(entries[:middle], depth + 1),
+                 _build_tree(entries[middle + 1:], depth + 1))
+
+
+def _squared(a, b):
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+class AirportIndex:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._source = None
+        self._root = None
+        self.builds = 0
+
+    def _prepare(self, airports):
+        """ Rebuild the tree when the refdata snapshot changed """
+        if airports is self._source:
+            return self._root
+        with self._lock:
+            if airports is not self._source:
+                entries = [(unit_vector(airport['latitude'], airport['longitude']), airport)
+                           for airport in airports]
+                self._root = _build_tree(entries)
+                self._source = airports
+                self.builds += 1
+            return self._root
+
+    def within(self, airports, latitude, longitude, radius_km):
+        """ [(airport, distance_km)] closer than radius_km, nearest first """
+        root = self._prepare(airports)
+        target = unit_vector(latitude, longitude)
+        limit = km_to_chord(radius_km)
+        limit_squared = limit * limit
+        found = []
+        stack = [root] if root else []
+        while stack:
+            node = stack.pop()
+            distance = _squared(node.point, target)
+            if distance <= limit_squared:
+                found.append((distance, node.item['airport_id'], node.item))
+            delta = target[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if delta < 0 else (node.right, node.left)
+            if near:
+                stack.append(near)
+            if far and abs(delta) <= limit:
+                stack.append(far)
+        found.sort(key=lambda entry: (entry[0], entry[1]))
+        return [(item, round(chord_to_km(math.sqrt(distance)), 1)) for distance, _, item in found]
+
+    def nearest(self, airports, latitude, longitude, k, accept=None, radius_km=None):
+        """
+        The k nearest airports [(airport, distance_km)], nearest first.
+        `accept(airport)` can rule airports out; radius_km caps the search.
+        """
+        root = self._prepare(airports)
+        target = unit_vector(latitude, longitude)
+        bound = km_to_chord(radius_km) ** 2 if radius_km is not None else float('inf')
+        heap = []  # max-heap of the best k as (-distance, -airport_id, airport)
+
+        def worst():
+            return -heap[0][0] if len(heap) == k else bound
+
+        def visit(node):
+            if node is None:
+                return
+            distance = _squared(node.point, target)
+            if distance <= worst() and (accept is None or accept(node.item)):
+                entry = (-distance, -node.item['airport_id'], node.item)
+                if len(heap) < k:
+                    heapq.heappush(heap, entry)
+                else:
+                    heapq.heappushpop(heap, entry)
+            delta = target[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if delta < 0 else (node.right, node.left)
+            visit(near)
+            if delta * delta <= worst():
+                visit(far)
+
+        if k > 0:
+            visit(root)
+        found = sorted((-distance, -negative_id, item) for distance, negative_id, item in heap)
+        return [(item, round(chord_to_km(math.sqrt(distance)), 1)) for distance, _, item in found]
+
+    def stats(self):
+        return {'builds': self.builds}
@@ -0,0 +1,72 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A page is requested with ?limit=N and continued with ?cursor=<token>,
+where the token holds the ORDER BY values of the last row returned.
+The next page is then "rows after those values", which MySQL answers
+from the index instead of skipping OFFSET rows.
+"""
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, size):
+    """ Token -> list of `size` sort values. Raises ValueError if invalid """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError('Invalid pagination cursor.')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid pagination cursor.')
+    return values
+
+
+def parse_page_args(args, key_size):
+    """
+    Read limit / cursor from the query string.
+    Returns (limit, cursor_values); limit is None when no page was asked for.
+    """
+    limit = args.get('limit')
+    token = args.get('cursor')
+    if limit is None and token is None:
+        return None, None
+
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError('limit must be an integer.')
+        if limit < 1:
+            raise ValueError('limit must be greater than 0.')
+        limit = min(limit, MAX_PAGE_SIZE)
+
+    after = decode_cursor(token, key_size) if token else None
+    return limit, after
+
+
+def keyset_condition(columns, values, descending=False):
+    """
+    WHERE fragment selecting the rows after `values` in ORDER BY `columns`.
+    (a, b) > (x, y) is written as a > x OR (a = x AND b > y) so MySQL can
+    use a range scan on the index.
+    """
+    op = '<' if descending else '>'
+    clauses = []
+    params = []
+    for i, column in enumerate(columns):
+        parts = [f"{prev} = %s" for prev in columns[:i]]
+        parts.append(f"{column} {op} %s")
+        clauses.append('(' + ' AND '.join(parts) + ')')
+        params.extend(values[:i + 1])
+    return '(' + ' OR '.join(clauses) + ')', params
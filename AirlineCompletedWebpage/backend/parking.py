@@ -0,0 +1,175 @@
+"""
+In-memory occupancy of the aircraft_parking stands, per airport.
+
+The stands are loaded once and then kept up to date by the write handlers
+in app.py, which pass the rows they changed to apply() / remove() after
+committing. Per airport the counts by parking_type and by
+current_occupancy_status are adjusted row by row, so an occupancy
+snapshot never scans the table. Like refdata.py the structure remembers
+the table_versions value it was loaded at: sync() drops it when a
+conditional GET reads another version (a write made by another worker
+process), and it is reloaded after max_age in any case.
+"""
+import threading
+import time
+
+from mysql.connector import Error
+
+PARKING_COLUMNS = ('parking_id', 'airport_id', 'location_identifier', 'parking_type',
+                   'current_occupancy_status', 'aircraft_id')
+
+
+class ParkingOccupancy:
+
+    def __init__(self, pool, max_age=60):
+        self._pool = pool
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._state = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._version = None
+        self.loads = 0
+        self.updates = 0
+
+    # ------------------------------------
+    # LOADING
+    # ------------------------------------
+    def load(self):
+        """ Read every stand and rebuild the structure. Returns the new state """
+        generation = self._generation
+        connection = self._pool.get_connection()
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT version FROM table_versions WHERE table_name = 'aircraft_parking'")
+                version = cursor.fetchone()
+            except Error:
+                # No table_versions (migration 002): only max_age applies.
+                version = None
+            cursor.execute(f"SELECT {', '.join(PARKING_COLUMNS)} FROM aircraft_parking")
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            connection.close()
+
+        state = {'airports': {}, 'stands': {}}
+        for row in rows:
+            _add(state, dict(zip(PARKING_COLUMNS, row)))
+        with self._lock:
+            # An apply() that ran while we were reading is not in `rows`.
+            if self._generation == generation:
+                self._state = state
+                self._loaded_at = time.monotonic()
+                self._version = version[0] if version else None
+            self.loads += 1
+        return state
+
+    def invalidate(self):
+        """ Drop everything; reloaded on next use """
+        with self._lock:
+            self._state = None
+            self._generation += 1
+
+    def sync(self, versions):
+        """
+        Drop the state if `versions` ({table: version}, as read for a
+        conditional GET) has another aircraft_parking version. Our own
+        writes bump it too, so the first read after one reloads once.
+        """
+        if 'aircraft_parking' not in versions:
+            return
+        with self._lock:
+            if self._state is not None and self._version != versions['aircraft_parking']:
+                self._state = None
+                self._generation += 1
+
+    def _current(self):
+        state = self._state
+        if state is None or time.monotonic() - self._loaded_at > self.max_age:
+            state = self.load()
+        return state
+
+    # ------------------------------------
+    # INCREMENTAL UPDATES
+    # ------------------------------------
+    def apply(self, rows):
+        """
+        Insert or replace stands (dicts with PARKING_COLUMNS). All rows are
+        applied under one lock, so a move between two stands is never seen
+        half done.
+        """
+        with self._lock:
+            self._generation += 1
+            if self._state is None:
+                return
+            for row in rows:
+                _discard(self._state, row['parking_id'])
+                _add(self._state, {column: row[column] for column in PARKING_COLUMNS})
+            self.updates += 1
+
+    def remove(self, parking_id):
+        with self._lock:
+            self._generation += 1
+            if self._state is None:
+                return
+            _discard(self._state, parking_id)
+            self.updates += 1
+
+    # ------------------------------------
+    # READS
+    # ------------------------------------
+    def snapshot(self, airport_id):
+        """
+        Counts by parking_type and current_occupancy_status and the list of
+        stands of one airport, ordered by location_identifier
+        """
+        state = self._current()
+        with self._lock:
+            airport = state['airports'].get(airport_id)
+            if airport is None:
+                return {'total': 0, 'by_type': {}, 'by_status': {}, 'stands': []}
+            by_type = {}
+            for (parking_type, status), count in airport['counts'].items():
+                by_type.setdefault(parking_type, {})[status] = count
+            return {
+                'total': len(airport['stands']),
+                'by_type': by_type,
+                'by_status': dict(airport['by_status']),
+                'stands': sorted((dict(stand) for stand in airport['stands'].values()),
+                                 key=lambda stand: stand['location_identifier']),
+            }
+
+    def stats(self):
+        state = self._state
+        return {
+            'loads': self.loads,
+            'updates': self.updates,
+            'stands': len(state['stands']) if state else None,
+        }
+
+
+def _add(state, row):
+    airport = state['airports'].setdefault(row['airport_id'], {'stands': {}, 'counts': {}, 'by_status': {}})
+    airport['stands'][row['parking_id']] = row
+    key = (row['parking_type'], row['current_occupancy_status'])
+    airport['counts'][key] = airport['counts'].get(key, 0) + 1
+    status = row['current_occupancy_status']
+    airport['by_status'][status] = airport['by_status'].get(status, 0) + 1
+    state['stands'][row['parking_id']] = row
+
+
+def _discard(state, parking_id):
+    row = state['stands'].pop(parking_id, None)
+    if row is None:
+        return
+    airport = state['airports'][row['airport_id']]
+    del airport['stands'][parking_id]
+    key = (row['parking_type'], row['current_occupancy_status'])
+    airport['counts'][key] -= 1
+    if not airport['counts'][key]:
+        del airport['counts'][key]
+    status = row['current_occupancy_status']
+    airport['by_status'][status] -= 1
+    if not airport['by_status'][status]:
+        del airport['by_status'][status]
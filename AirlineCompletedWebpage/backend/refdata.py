@@ -0,0 +1,192 @@
+"""
+In-memory reference data: airports and aircraft.
+
+Both tables are small and change rarely, but almost every flight listing
+needs airport codes and tail numbers. They are loaded once into
+dictionaries (id -> row, IATA/ICAO -> id, tail -> id) and reloaded when a
+write handler invalidates them or when an unknown id is looked up.
+
+Writes made by other worker processes are noticed through table_versions:
+each snapshot keeps the version its table had when it was read. sync()
+drops a snapshot whose version differs from the one a conditional GET has
+just put in its ETag, and a snapshot not checked for
+version_check_interval seconds compares it with the counter before it is
+used. max_age stays as a backstop for databases
+without table_versions (migration 002).
+"""
+import threading
+import time
+
+from mysql.connector import Error
+
+from serializers import serialize_rows
+
+
+class ReferenceData:
+
+    def __init__(self, pool, max_age=300, miss_reload_interval=5, version_check_interval=1):
+        self._pool = pool
+        self.max_age = max_age
+        self.miss_reload_interval = miss_reload_interval
+        self.version_check_interval = version_check_interval
+        self._lock = threading.Lock()
+        self._tables = {'airports': None, 'aircraft': None}
+        self._loaded_at = {'airports': 0.0, 'aircraft': 0.0}
+        self._generation = {'airports': 0, 'aircraft': 0}
+        self._versions = {'airports': None, 'aircraft': None}
+        self._checked_at = {'airports': 0.0, 'aircraft': 0.0}
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    # ------------------------------------
+    # LOADING
+    # ------------------------------------
+    def _load_airports(self, cursor):
+        cursor.execute("SELECT * FROM airports ORDER BY airport_id")
+        rows = serialize_rows(cursor.description, cursor.fetchall())
+        return {
+            'rows': rows,
+            'by_id': {row['airport_id']: row for row in rows},
+            'by_iata': {row['iata_code'].upper(): row['airport_id'] for row in rows},
+            'by_icao': {row['icao_code'].upper(): row['airport_id'] for row in rows},
+        }
+
+    def _load_aircraft(self, cursor):
+        cursor.execute("SELECT * FROM aircraft ORDER BY aircraft_id")
+        rows = serialize_rows(cursor.description, cursor.fetchall())
+        return {
+            'rows': rows,
+            'by_id': {row['aircraft_id']: row for row in rows},
+            'by_tail': {row['tail_number'].upper(): row['aircraft_id'] for row in rows},
+        }
+
+    def _read_versions(self, cursor, names):
+        """ {table: version} from table_versions; empty without migration 002 """
+        try:
+            cursor.execute("SELECT table_name, version FROM table_versions WHERE table_name IN ("
+                           + ', '.join(['%s'] * len(names)) + ")", tuple(names))
+            return dict(cursor.fetchall())
+        except Error:
+            return {}
+
+    def load(self, table=None):
+        """ (Re)load one table, or both when table is None. Returns the new snapshots """
+        names = [table] if table else list(self._tables)
+        generation = dict(self._generation)
+        connection = self._pool.get_connection()
+        try:
+            cursor = connection.cursor()
+            # Versions first: a write landing between the two reads leaves
+            # an older version with newer rows, which only costs a reload.
+            versions = self._read_versions(cursor, names)
+            loaded = {}
+            for name in names:
+                loader = self._load_airports if name == 'airports' else self._load_aircraft
+                loaded[name] = loader(cursor)
+            cursor.close()
+        finally:
+            connection.close()
+        now = time.monotonic()
+        with self._lock:
+            for name, snapshot in loaded.items():
+                # Keep the cache empty if a write invalidated it while
+                # this load was reading the old rows.
+                if self._generation[name] != generation[name]:
+                    continue
+                self._tables[name] = snapshot
+                self._loaded_at[name] = now
+                self._checked_at[name] = now
+                self._versions[name] = versions.get(name)
+            self.loads += 1
+        return loaded
+
+    def invalidate(self, table=None):
+        """ Drop a table (or both); it is reloaded on next use """
+        with self._lock:
+            for name in ([table] if table else list(self._tables)):
+                self._tables[name] = None
+                self._generation[name] += 1
+
+    def sync(self, versions):
+        """
+        Drop the snapshots whose table has another version in `versions`
+        ({table: version}, as read for a conditional GET), so the response
+        is built from the rows its ETag names.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for name in self._tables:
+                if name not in versions:
+                    continue
+                if self._tables[name] is not None and self._versions[name] != versions[name]:
+                    self._tables[name] = None
+                    self._generation[name] += 1
+                else:
+                    self._checked_at[name] = now
+
+    def _changed_elsewhere(self, table):
+        """ Whether table_versions has moved on since the snapshot was read """
+        connection = self._pool.get_connection()
+        try:
+            cursor = connection.cursor()
+            version = self._read_versions(cursor, [table]).get(table)
+            cursor.close()
+        finally:
+            connection.close()
+        self._checked_at[table] = time.monotonic()
+        return version != self._versions[table]
+
+    def _snapshot(self, table):
+        snapshot = self._tables[table]
+        now = time.monotonic()
+        if (snapshot is None or now - self._loaded_at[table] > self.max_age
+                or (now - self._checked_at[table] > self.version_check_interval
+                    and self._changed_elsewhere(table))):
+            snapshot = self.load(table)[table]
+        return snapshot
+
+    def _lookup(self, table, index, key):
+        snapshot = self._snapshot(table)
+        value = snapshot[index].get(key)
+        if value is None and time.monotonic() - self._loaded_at[table] > self.miss_reload_interval:
+            # Possibly created by another process since the last load.
+            value = self.load(table)[table][index].get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    # ------------------------------------
+    # LOOKUPS
+    # ------------------------------------
+    def airports(self):
+        return self._snapshot('airports')['rows']
+
+    def airport(self, airport_id):
+        return self._lookup('airports', 'by_id', airport_id)
+
+    def airport_id(self, code):
+        """ Airport id for an IATA (3 letters) or ICAO (4 letters) code """
+        code = code.upper()
+        index = 'by_iata' if len(code) == 3 else 'by_icao'
+        return self._lookup('airports', index, code)
+
+    def aircraft_list(self):
+        return self._snapshot('aircraft')['rows']
+
+    def aircraft(self, aircraft_id):
+        return self._lookup('aircraft', 'by_id', aircraft_id)
+
+    def aircraft_id(self, tail_number):
+        return self._lookup('aircraft', 'by_tail', tail_number.upper())
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'loads': self.loads,
+            'airports': len(self._tables['airports']['rows']) if self._tables['airports'] else None,
+            'aircraft': len(self._tables['aircraft']['rows']) if self._tables['aircraft'] else None,
+        }
@@ -0,0 +1,105 @@
+"""
+Aircraft rotations: the chain of legs each tail flies, in order.
+
+Legs are sorted once by (aircraft, departure) and scanned once. Each leg is
+compared with the previous leg of the same aircraft only, so a whole
+season is processed in O(n log n) for the sort plus O(n) for the scan.
+The scan flags:
+
+* broken_chain  - the leg departs from another airport than the previous
+                  leg arrived at
+* overlap       - the leg departs before the previous one has arrived
+* short_turn    - less ground time than the aircraft's minimum turnaround
+* invalid_leg   - the leg arrives before it departs
+"""
+from datetime import timedelta
+
+# Minimum turnaround by aircraft size (seating_capacity of the aircraft).
+WIDEBODY_SEATS = 250
+MIN_TURNAROUND = timedelta(minutes=35)
+MIN_TURNAROUND_WIDEBODY = timedelta(minutes=60)
+
+LEG_COLUMNS = ('flight_id', 'flight_number', 'aircraft_id', 'departure_airport_id',
+               'arrival_airport_id', 'scheduled_departure_time', 'scheduled_arrival_time',
+               'flight_status')
+
+
+def min_turnaround(aircraft):
+    if aircraft and (aircraft.get('seating_capacity') or 0) >= WIDEBODY_SEATS:
+        return MIN_TURNAROUND_WIDEBODY
+    return MIN_TURNAROUND
+
+
+def build_rotations(legs, aircraft_lookup, airport_lookup):
+    """
+    Group `legs` (tuples of LEG_COLUMNS, any order) into one rotation per
+    aircraft. `aircraft_lookup(id)` and `airport_lookup(id)` return the
+    reference rows (see refdata.py). Returns a list ordered by tail number.
+    """
+    legs = sorted(legs, key=lambda leg: (leg[2], leg[5], leg[0]))
+    rotations = []
+    rotation = None
+    previous = None
+    codes = {}
+
+    def code(airport_id):
+        if airport_id not in codes:
+            airport = airport_lookup(airport_id)
+            codes[airport_id] = airport['iata_code'] if airport else None
+        return codes[airport_id]
+
+    for leg in legs:
+        flight_id, flight_number, aircraft_id, origin, destination, departure, arrival, status = leg
+        if rotation is None or rotation['aircraft_id'] != aircraft_id:
+            aircraft = aircraft_lookup(aircraft_id)
+            turnaround = min_turnaround(aircraft)
+            rotation = {
+                'aircraft_id': aircraft_id,
+                'tail_number': aircraft['tail_number'] if aircraft else None,
+                'min_turnaround_minutes': int(turnaround.total_seconds() // 60),
+                'legs': [],
+                'turns': [],
+                'issues': []
+            }
+            rotations.append(rotation)
+            previous = None
+
+        rotation['legs'].append({
+            'flight_id': flight_id,
+            'flight_number': flight_number,
+            'from': code(origin),
+            'to': code(destination),
+            'start': departure.isoformat(),
+            'end': arrival.isoformat(),
+            'status': status
+        })
+        if arrival <= departure:
+            rotation['issues'].append({'type': 'invalid_leg', 'flight_id': flight_id})
+
+        if previous is not None:
+            ground = departure - previous[6]
+            minutes = int(ground.total_seconds() // 60)
+            turn = {
+                'airport': code(previous[4]),
+                'start': previous[6].isoformat(),
+                'end': departure.isoformat(),
+                'minutes': minutes,
+                'after_flight_id': previous[0],
+                'before_flight_id': flight_id
+            }
+            rotation['turns'].append(turn)
+            issue = None
+            if previous[4] != origin:
+                issue = {'type': 'broken_chain', 'arrived_at': code(previous[4]), 'departs_from': code(origin)}
+            elif ground < timedelta(0):
+                issue = {'type': 'overlap'}
+            elif ground < turnaround:
+                issue = {'type': 'short_turn'}
+            if issue:
+                issue.update({'flight_id': flight_id, 'previous_flight_id': previous[0],
+                              'ground_minutes': minutes})
+                rotation['issues'].append(issue)
+        previous = leg
+
+    rotations.sort(key=lambda r: (r['tail_number'] or '', r['aircraft_id']))
+    return rotations
@@ -0,0 +1,412 @@
+"""
+Double-booking detection for pilots and cabin crew.
+
+The flights of every person (captain, first officer or cabin crew) are
+kept in memory as a list sorted by scheduled departure, with the matching
+arrival times alongside and the latest arrival so far at each position. A
+new assignment [start, end) is checked with a bisect on that list and a
+walk back over the flights that still reach past `start`, so a check is
+O(log n) plus the flights close to the new one, even when the stored
+schedule already has conflicts.
+
+The structure is loaded from flights and flight_crew_assignment in two
+queries and then kept up to date by the write handlers in app.py; like
+refdata.py it is reloaded after max_age to pick up other worker processes.
+It answers without touching the database, but it can be stale by up to
+max_age, so the write handlers only take it as a hint: the check they run
+in the database, inside their transaction, decides, and a disagreement
+reloads the index. audit() loads it again and
+walks every person's list once, which also finds conflicts that were
+stored before the checker existed.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+PILOT = 'pilot'
+CREW = 'crew'
+
+# Flights in these states do not keep anyone busy.
+INACTIVE_STATUSES = ('Canceled',)
+
+# Longest flight accepted. It bounds the database checks of app.py: no
+# flight overlapping [start, end) departs before start - MAX_FLIGHT_DURATION.
+MAX_FLIGHT_DURATION = timedelta(hours=24)
+
+
+def parse_time(value, name):
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO datetime.")
+
+
+def flight_interval(departure, arrival):
+    """ Validated (start, end) of a flight from its scheduled times """
+    start = parse_time(departure, 'scheduled_departure_time')
+    end = parse_time(arrival, 'scheduled_arrival_time')
+    if end <= start:
+        raise ValueError('scheduled_arrival_time must be later than scheduled_departure_time.')
+    if end - start > MAX_FLIGHT_DURATION:
+        raise ValueError(f"A flight cannot last more than {MAX_FLIGHT_DURATION.total_seconds() / 3600:g} hours.")
+    return start, end
+
+
+class ScheduleIndex:
+
+    def __init__(self, pool, max_age=300):
+        self._pool = pool
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._state = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self.loads = 0
+        self.checks = 0
+
+    # ------------------------------------
+    # LOADING
+    # ------------------------------------
+    def _read(self):
+        connection = self._pool.get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("""
+                SELECT flight_id, scheduled_departure_time, scheduled_arrival_time,
+                       pilot_command_id, pilot_first_officer_id, flight_status
+                FROM flights
+                ORDER BY scheduled_departure_time, flight_id
+            """)
+            flights = cursor.fetchall()
+            cursor.execute("SELECT flight_id, crew_member_id FROM flight_crew_assignment")
+            assignments = cursor.fetchall()
+            cursor.close()
+        finally:
+            connection.close()
+
+        # Inactive flights are kept with their crew, out of the timelines,
+        # so a flight that is re-activated brings its crew back with it.
+        state = {'flights': {}, 'people': {}}
+        for flight_id, start, end, command_id, first_officer_id, status in flights:
+            start, end = parse_time(start, 'start'), parse_time(end, 'end')
+            active = status not in INACTIVE_STATUSES
+            state['flights'][flight_id] = {
+                'start': start, 'end': end, 'active': active,
+                'pilots': (command_id, first_officer_id), 'crew': set()
+            }
+            if not active:
+                continue
+            # Rows arrive in departure order, so appending keeps lists sorted.
+            for pilot_id in (command_id, first_officer_id):
+                _timeline(state, PILOT, pilot_id).append(start, end, flight_id)
+        for flight_id, crew_member_id in assignments:
+            flight = state['flights'].get(flight_id)
+            if flight is None:
+                continue
+            flight['crew'].add(crew_member_id)
+            if flight['active']:
+                _timeline(state, CREW, crew_member_id).insert(flight['start'], flight['end'], flight_id)
+        return state
+
+    def load(self):
+        """ Rebuild from the database. Returns the new state """
+        generation = self._generation
+        state = self._read()
+        with self._lock:
+            if self._generation == generation:
+                self._state = state
+                self._loaded_at = time.monotonic()
+            self.loads += 1
+        return state
+
+    def invalidate(self):
+        with self._lock:
+            self._state = None
+            self._generation += 1
+
+    def _current(self):
+        state = self._state
+        if state is None or time.monotonic() - self._loaded_at > self.max_age:
+            state = self.load()
+        return state
+
+    # ------------------------------------
+    # CHECKS
+    # ------------------------------------
+    def conflicts(self, start, end, pilots=(), crew=(), exclude_flight_id=None):
+        """
+        Flights that would overlap [start, end) for any of the given pilots
+        or crew members, ignoring `exclude_flight_id` (the flight being
+        edited). Returns [{'person', 'id', 'flight_id'}, ...]
+        """
+        state = self._current()
+        found = []
+        with self._lock:
+            self.checks += 1
+            for kind, ids in ((PILOT, pilots), (CREW, crew)):
+                for person_id in ids:
+                    timeline = state['people'].get((kind, person_id))
+                    if timeline is None:
+                        continue
+                    for flight_id in timeline.overlapping(start, end):
+                        if flight_id != exclude_flight_id:
+                            found.append({'person': kind, 'id': person_id, 'flight_id': flight_id})
+        return found
+
+    def flight_conflicts(self, flight_id, crew):
+        """ Conflicts of adding `crew` to an existing flight; None if the flight is unknown """
+        state = self._current()
+        flight = state['flights'].get(flight_id)
+        if flight is None:
+            return None
+        if not flight['active']:
+            return []
+        return self.conflicts(flight['start'], flight['end'], crew=crew, exclude_flight_id=flight_id)
+
+    def crew_changes_conflicts(self, assign, unassign=()):
+        """
+        Conflicts of a batch of crew changes: the (flight_id,
+        crew_member_id) pairs of `assign` checked against the stored
+        schedule without the pairs of `unassign`, and against each other.
+        Unknown and inactive flights are skipped. Returns [{'person', 'id', 'flight_id'}, ...]
+        """
+        state = self._current()
+        # Unassigned pairs are gone; assigned ones are checked through `batch`.
+        skip = set(unassign) | set(assign)
+        batch = {}  # crew_member_id -> [(start, end, flight_id)] of `assign`
+        found = []
+        with self._lock:
+            self.checks += 1
+            for flight_id, crew_member_id in assign:
+                flight = state['flights'].get(flight_id)
+                if flight is None or not flight['active']:
+                    continue
+                start, end = flight['start'], flight['end']
+                timeline = state['people'].get((CREW, crew_member_id))
+                for other_id in (timeline.overlapping(start, end) if timeline else ()):
+                    if (other_id, crew_member_id) not in skip:
+                        found.append({'person': CREW, 'id': crew_member_id, 'flight_id': other_id})
+                for other_start, other_end, other_id in batch.get(crew_member_id, ()):
+                    if other_id != flight_id and other_start < end and start < other_end:
+                        found.append({'person': CREW, 'id': crew_member_id, 'flight_id': other_id})
+                batch.setdefault(crew_member_id, []).append((start, end, flight_id))
+        return found
+
+    def flight_crew(self, flight_id):
+        flight = self._current()['flights'].get(flight_id)
+        return sorted(flight['crew']) if flight else []
+
+    def audit(self):
+        """
+        Every overlapping pair in the whole schedule, from a fresh load and a
+        single pass over each person's sorted flights. The flights still in
+        the air at each departure are kept in a heap by arrival, so the pass
+        is O(n log n) plus the pairs it reports.
+        """
+        state = self.load()
+        conflicts = []
+        for (kind, person_id), timeline in state['people'].items():
+            airborne = []  # (end, flight_id) of the flights departed so far
+            for (start, flight_id), end in zip(timeline.keys, timeline.ends):
+                while airborne and airborne[0][0] <= start:
+                    heapq.heappop(airborne)
+                for other_end, other_id in airborne:
+                    conflicts.append({
+                        'person': kind, 'id': person_id,
+                        'flight_id': other_id, 'conflicting_flight_id': flight_id,
+                        'overlap_start': start.isoformat(),
+                        'overlap_end': min(end, other_end).isoformat()
+                    })
+                heapq.heappush(airborne, (end, flight_id))
+        conflicts.sort(key=lambda c: (c['person'], c['id'], c['overlap_start']))
+        return {'people_checked': len(state['people']),
+                'flights_checked': sum(flight['active'] for flight in state['flights'].values()),
+                'conflicts': conflicts}
+
+    # ------------------------------------
+    # INCREMENTAL UPDATES
+    # ------------------------------------
+    def set_flight(self, flight_id, start, end, pilots, status):
+        """ Insert or replace a flight after it was written; its crew is kept """
+        with self._lock:
+            self._generation += 1
+            state = self._state
+            if state is None:
+                return
+            crew = _remove_flight(state, flight_id)
+            active = status not in INACTIVE_STATUSES
+            state['flights'][flight_id] = {'start': start, 'end': end, 'active': active,
+                                           'pilots': tuple(pilots), 'crew': crew}
+            if not active:
+                return
+            for pilot_id in pilots:
+                _timeline(state, PILOT, pilot_id).insert(start, end, flight_id)
+            for crew_member_id in crew:
+                _timeline(state, CREW, crew_member_id).insert(start, end, flight_id)
+
+    def remove_flight(self, flight_id):
+        with self._lock:
+            self._generation += 1
+            if self._state is not None:
+                _remove_flight(self._state, flight_id)
+
+    def add_crew(self, pairs):
+        """ (flight_id, crew_member_id) pairs that were assigned """
+        with self._lock:
+            self._generation += 1
+            state = self._state
+            if state is None:
+                return
+            for flight_id, crew_member_id in pairs:
+                flight = state['flights'].get(flight_id)
+                if flight is None or crew_member_id in flight['crew']:
+                    continue
+                flight['crew'].add(crew_member_id)
+                if flight['active']:
+                    _timeline(state, CREW, crew_member_id).insert(flight['start'], flight['end'], flight_id)
+
+    def remove_crew(self, pairs):
+        with self._lock:
+            self._generation += 1
+            state = self._state
+            if state is None:
+                return
+            for flight_id, crew_member_id in pairs:
+                flight = state['flights'].get(flight_id)
+                if flight is None or crew_member_id not in flight['crew']:
+                    continue
+                flight['crew'].discard(crew_member_id)
+                if flight['active']:
+                    state['people'][(CREW, crew_member_id)].remove(flight['start'], flight_id)
+
+    def stats(self):
+        state = self._state
+        return {
+            'loads': self.loads,
+            'checks': self.checks,
+            'flights': len(state['flights']) if state else None,
+            'people': len(state['people']) if state else None,
+        }
+
+
+class _Timeline:
+    """
+    Flights of one person: keys (start, flight_id) sorted, ends alongside,
+    and reach[i], the latest end among flights 0..i
+    """
+    __slots__ = ('keys', 'ends', 'reach')
+
+    def __init__(self):
+        self.keys = []
+        self.ends = []
+        self.reach = []
+
+    def append(self, start, end, flight_id):
+        self.keys.append((start, flight_id))
+        self.ends.append(end)
+        self.reach.append(max(self.reach[-1], end) if self.reach else end)
+
+    def insert(self, start, end, flight_id):
+        i = bisect_left(self.keys, (start, flight_id))
+        self.keys.insert(i, (start, flight_id))
+        self.ends.insert(i, end)
+        self.reach.insert(i, max(self.reach[i - 1], end) if i else end)
+        # Later positions only change until one already reaches past `end`.
+        for j in range(i + 1, len(self.reach)):
+            if self.reach[j] >= end:
+                break
+            self.reach[j] = end
+
+    def remove(self, start, flight_id):
+        i = bisect_left(self.keys, (start, flight_id))
+        if i < len(self.keys) and self.keys[i] == (start, flight_id):
+            del self.keys[i]
+            del self.ends[i]
+            del self.reach[i]
+            # Recompute until a position comes out as it was: the rest
+            # did not depend on the removed flight.
+            for j in range(i, len(self.reach)):
+                value = max(self.reach[j - 1], self.ends[j]) if j else self.ends[j]
+                if value == self.reach[j]:
+                    break
+                self.reach[j] = value
+
+    def overlapping(self, start, end):
+        """
+        Flights overlapping [start, end). Everything from bisect_left((end,))
+        on departs at or after `end`; walking back, the search ends at the
+        first position whose reach is by `start`, since no flight before it
+        arrives later. Stored conflicts (legacy rows, imports) are handled
+        too: a long flight keeps the reach of the ones after it up.
+        """
+        i = bisect_left(self.keys, (end,))
+        found = []
+        for j in range(i - 1, -1, -1):
+            if self.reach[j] <= start:
+                break
+            if self.ends[j] > start:
+                found.append(self.keys[j][1])
+        return found
+
+
+class BatchConflicts:
+    """
+    Pilot conflicts of flights written in bulk (flight imports): each one
+    against the stored schedule and against the flights accepted before
+    it in the same batch, which are not in the index yet. A flight joins
+    the batch when its check passes; commit() keeps the flights added
+    since the last call once their rows are stored, rollback() takes them
+    out again when the rows were refused.
+    """
+
+    def __init__(self, index):
+        self._index = index
+        self._people = {}
+        self._pending = []
+
+    def check(self, start, end, pilots, key):
+        """ Conflicts of the flight `key`; it joins the batch if there are none """
+        found = self._index.conflicts(start, end, pilots)
+        for pilot_id in pilots:
+            timeline = self._people.get(pilot_id)
+            for other in (timeline.overlapping(start, end) if timeline else ()):
+                found.append({'person': PILOT, 'id': pilot_id, 'flight_id': other})
+        if not found:
+            for pilot_id in pilots:
+                self._people.setdefault(pilot_id, _Timeline()).insert(start, end, key)
+            self._pending.append((start, pilots, key))
+        return found
+
+    def commit(self):
+        self._pending = []
+
+    def rollback(self):
+        for start, pilots, key in self._pending:
+            for pilot_id in pilots:
+                self._people[pilot_id].remove(start, key)
+        self._pending = []
+
+
+def _timeline(state, kind, person_id):
+    timeline = state['people'].get((kind, person_id))
+    if timeline is None:
+        timeline = state['people'][(kind, person_id)] = _Timeline()
+    return timeline
+
+
+def _remove_flight(state, flight_id):
+    """ Take a flight out of every timeline. Returns its crew """
+    flight = state['flights'].pop(flight_id, None)
+    if flight is None:
+        return set()
+    if not flight['active']:
+        return flight['crew']
+    for pilot_id in flight['pilots']:
+        state['people'][(PILOT, pilot_id)].remove(flight['start'], flight_id)
+    for crew_member_id in flight['crew']:
+        state['people'][(CREW, crew_member_id)].remove(flight['start'], flight_id)
+    return flight['crew']
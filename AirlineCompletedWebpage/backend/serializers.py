@@ -0,0 +1,113 @@
+"""
+Row serialization for query results.
+
+serialize_result() in app.py checks the type of every cell. Here the
+column types are read once from cursor.description and a converter is
+picked per column, so rows of ints and strings are just zipped into a
+dict and only DATE / DATETIME / DECIMAL columns get converted.
+
+The encoders turn the result into bytes. OrjsonEncoder handles datetime,
+date and Decimal itself (datetimes in native code), so rows bound for it
+can skip the conversions (row_serializer(..., native=True)); the output
+is the same ISO-8601 strings and floats.
+"""
+import json
+from decimal import Decimal
+
+from mysql.connector.constants import FieldType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+DATE_TYPES = {FieldType.DATE, FieldType.NEWDATE, FieldType.DATETIME, FieldType.TIMESTAMP}
+DECIMAL_TYPES = {FieldType.DECIMAL, FieldType.NEWDECIMAL}
+
+
+def column_converter(type_code):
+    """ Converter for a column type, or None when the value is already JSON ready """
+    if type_code in DATE_TYPES:
+        return _isoformat
+    if type_code in DECIMAL_TYPES:
+        return float
+    return None
+
+
+def row_serializer(description, native=False):
+    """
+    Build a function turning one row into a JSON ready dict, using the
+    column names and types of `description` (cursor.description). With
+    native, dates and decimals are left for the encoder.
+    """
+    columns = tuple(column[0] for column in description)
+    converters = tuple(None if native else column_converter(column[1]) for column in description)
+    conversions = tuple(
+        (name, convert) for name, convert in zip(columns, converters) if convert
+    )
+
+    if not conversions:
+        def serialize(row):
+            return dict(zip(columns, row))
+        return serialize
+
+    def serialize(row):
+        item = dict(zip(columns, row))
+        for name, convert in conversions:
+            value = item[name]
+            if value is not None:
+                item[name] = convert(value)
+        return item
+    return serialize
+
+
+def serialize_rows(description, rows, native=False):
+    serialize = row_serializer(description, native)
+    return [serialize(row) for row in rows]
+
+
+# ====================================
+# ==            ENCODERS            ==
+# ====================================
+class JSONEncoder:
+    """ Standard library json; rows must be JSON ready (native=False) """
+    name = 'json'
+    native = False
+
+    def dumps(self, obj):
+        return json.dumps(obj, sort_keys=True, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+class OrjsonEncoder:
+    """ orjson with datetime / date in native code and Decimal as float """
+    name = 'orjson'
+    native = True
+
+    def dumps(self, obj):
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+ENCODERS = {'json': JSONEncoder, 'orjson': OrjsonEncoder}
+
+
+def get_encoder(name):
+    """ Encoder by name; 'orjson' falls back to json when orjson is not installed """
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown JSON encoder {name!r}, expected one of {sorted(ENCODERS)}.")
+    if name == 'orjson' and orjson is None:
+        print("WARNING: orjson is not installed, using the json encoder.")
+        name = 'json'
+    return ENCODERS[name]()
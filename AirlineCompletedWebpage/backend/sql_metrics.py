@@ -0,0 +1,189 @@
+"""
+Per-request SQL instrumentation.
+
+The connection pool hands out cursors wrapped in InstrumentedCursor while
+a request is being served. Every statement and fetch is timed and counted
+into the RequestStats of that request: number of statements, time spent
+in MySQL, rows fetched, and rows serialized and the time spent turning
+them into JSON.
+
+Statements are grouped by their normalized text (literals and parameter
+lists replaced by placeholders), so the same query run once per item of
+a list, the N+1 pattern, shows up as one statement with a high count.
+Parameters are never logged, only their types.
+"""
+import re
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|%\(\w+\)s')
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_LISTS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(query):
+    """
+    One line, literals and placeholders as '?', value lists as '(...)':
+    IN (%s, %s, %s) and VALUES (%s, %s), (%s, %s) read the same whatever
+    the batch size.
+    """
+    if isinstance(query, (bytes, bytearray)):
+        query = query.decode('utf-8', 'replace')
+    query = _WHITESPACE.sub(' ', query).strip()
+    query = _STRING.sub('?', query)
+    query = _PLACEHOLDER.sub('?', query)
+    query = _NUMBER.sub('?', query)
+    query = _LIST.sub('(...)', query)
+    return _LISTS.sub('(...)', query)
+
+
+def redact_params(params):
+    """ Types of the parameters instead of their values """
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+
+class RequestStats:
+    """ SQL and serialization counters of one request """
+
+    def __init__(self, slow_threshold):
+        self.slow_threshold = slow_threshold
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.serialize_time = 0.0
+        self.serialized = 0
+        self.statements = {}  # normalized sql -> [count, seconds]
+        self.slow = []
+
+    def record(self, query, params, elapsed, executions=1):
+        sql = normalize_sql(query)
+        self.queries += executions
+        self.db_time += elapsed
+        entry = self.statements.get(sql)
+        if entry is None:
+            self.statements[sql] = [executions, elapsed]
+        else:
+            entry[0] += executions
+            entry[1] += elapsed
+        if elapsed >= self.slow_threshold:
+            self.slow.append({'sql': sql, 'params': redact_params(params),
+                              'duration_ms': round(elapsed * 1000, 2)})
+
+    def fetched(self, rows, elapsed):
+        self.rows += rows
+        self.db_time += elapsed
+
+    @contextmanager
+    def serializing(self, rows=0):
+        self.serialized += rows
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.serialize_time += time.perf_counter() - start
+
+    def repeated(self, threshold):
+        """ Statements run `threshold` times or more: [(sql, count, seconds)], worst first """
+        found = [(sql, count, seconds) for sql, (count, seconds) in self.statements.items()
+                 if count >= threshold]
+        return sorted(found, key=lambda entry: -entry[1])
+
+    def server_timing(self, pool_wait=0.0):
+        """ Value of the Server-Timing header (durations in ms) """
+        total = time.perf_counter() - self.started
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries, {self.rows} rows"',
+            f'pool;dur={pool_wait * 1000:.2f}',
+            f'serialize;dur={self.serialize_time * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+
+
+class InstrumentedCursor:
+    """ mysql.connector cursor that reports to a RequestStats """
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, query, params=None, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(query, params, *args, **kwargs)
+        finally:
+            self._stats.record(query, params, time.perf_counter() - start)
+
+    def executemany(self, query, seq_params, *args, **kwargs):
+        seq_params = list(seq_params)
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(query, seq_params, *args, **kwargs)
+        finally:
+            self._stats.record(query, seq_params[0] if seq_params else None,
+                               time.perf_counter() - start, executions=len(seq_params))
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._stats.fetched(1 if row is not None else 0, time.perf_counter() - start)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._stats.fetched(len(rows), time.perf_counter() - start)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._stats.fetched(len(rows), time.perf_counter() - start)
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._stats.fetched(1, 0.0)
+            yield row
+
+
+class AsyncInstrumentedCursor:
+    """ Same for an aiomysql cursor (asgi_app.py) """
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    async def execute(self, query, params=None):
+        start = time.perf_counter()
+        try:
+            return await self._cursor.execute(query, params)
+        finally:
+            self._stats.record(query, params, time.perf_counter() - start)
+
+    async def fetchone(self):
+        start = time.perf_counter()
+        row = await self._cursor.fetchone()
+        self._stats.fetched(1 if row is not None else 0, time.perf_counter() - start)
+        return row
+
+    async def fetchall(self):
+        start = time.perf_counter()
+        rows = await self._cursor.fetchall()
+        self._stats.fetched(len(rows), time.perf_counter() - start)
+        return rows
@@ -0,0 +1,87 @@
+"""
+Load test: the Flask app against the ASGI serving mode (asgi_app.py), with
+many requests in flight at once, like the ops screens polling the API.
+
+Start both servers against the same database, then run the benchmark:
+
+    python backend/app.py                                            # :5000
+    uvicorn asgi_app:application --app-dir backend --port 5001       # :5001
+    python benchmarks/bench_asgi.py [concurrency] [requests] [path ...]
+
+Needs httpx (requirements-asgi.txt). Prints throughput and latency percentiles of each server per
+path; every request is sent without If-None-Match, so each one runs its
+queries instead of being answered 304.
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+SERVERS = {
+    'flask': 'http://localhost:5000',
+    'asgi': 'http://localhost:5001',
+}
+
+DEFAULT_PATHS = [
+    '/api/flights?limit=100',
+    '/api/pilots',
+    '/api/aircraft?status=Active',
+    '/api/flights/1',
+]
+
+
+async def run(base_url, path, concurrency, total):
+    """ `total` GETs of `path`, `concurrency` at a time. Returns (seconds, latencies, errors) """
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker(client):
+        nonlocal errors
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await client.get(path)  # warm up caches and the pool
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return elapsed, latencies, errors
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    paths = sys.argv[3:] or DEFAULT_PATHS
+
+    print(f"{total} requests per path, {concurrency} concurrent")
+    for path in paths:
+        print(path)
+        for name, base_url in SERVERS.items():
+            elapsed, latencies, errors = await run(base_url, path, concurrency, total)
+            print(f"  {name:5} {total / elapsed:8.0f} req/s"
+                  f"  p50 {statistics.median(latencies) * 1000:7.1f} ms"
+                  f"  p99 {percentile(latencies, 0.99) * 1000:7.1f} ms"
+                  f"  errors {errors}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
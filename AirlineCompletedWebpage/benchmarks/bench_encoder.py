@@ -0,0 +1,116 @@
+"""
+Benchmark of the jsonify path with each JSON_ENCODER, on synthetic
+/api/flights and /api/maintenance pages: rows are serialized the way
+query_collection does it and encoded into a Flask response.
+
+    python benchmarks/bench_encoder.py [rows] [repeat]
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from flask.json.provider import DefaultJSONProvider
+from mysql.connector.constants import FieldType
+
+from app import app, EncoderJSONProvider
+from serializers import serialize_rows, get_encoder
+
+FLIGHT_DESCRIPTION = [
+    ('flight_id', FieldType.LONG),
+    ('flight_number', FieldType.VAR_STRING),
+    ('scheduled_departure_time', FieldType.DATETIME),
+    ('scheduled_arrival_time', FieldType.DATETIME),
+    ('flight_status', FieldType.STRING),
+    ('aircraft_id', FieldType.LONG),
+    ('departure_airport_id', FieldType.LONG),
+    ('arrival_airport_id', FieldType.LONG),
+    ('pilot_command_id', FieldType.LONG),
+    ('pilot_first_officer_id', FieldType.LONG),
+]
+
+MAINTENANCE_DESCRIPTION = [
+    ('maintenance_event_id', FieldType.LONG),
+    ('aircraft_id', FieldType.LONG),
+    ('hangar_id', FieldType.LONG),
+    ('maintenance_type', FieldType.VAR_STRING),
+    ('start_date_time', FieldType.DATETIME),
+    ('end_date_time', FieldType.DATETIME),
+    ('maintenance_status', FieldType.STRING),
+    ('description', FieldType.BLOB),
+    ('cost', FieldType.NEWDECIMAL),
+    ('duration_minutes', FieldType.LONG),
+]
+
+
+def flight_rows(count):
+    start = datetime(2025, 1, 1, 6, 0)
+    return [(i + 1, f"AL{1000 + i % 900}", start + timedelta(minutes=20 * i),
+             start + timedelta(minutes=20 * i + 185), 'Scheduled', i % 300 + 1,
+             i % 40 + 1, (i + 7) % 40 + 1, i % 150 + 1, (i + 1) % 150 + 1) for i in range(count)]
+
+
+def maintenance_rows(count):
+    start = datetime(2025, 1, 1, 8, 0)
+    rows = []
+    for i in range(count):
+        begin = start + timedelta(hours=i)
+        end = begin + timedelta(hours=6) if i % 10 else None
+        rows.append((i + 1, i % 300 + 1, i % 12 + 1, 'Routine Check', begin, end, 'Completed',
+                     'General inspection and oil change', Decimal('15000.25'), 360 if end else None))
+    return rows
+
+
+def decorate_flights(flights):
+    """ The fields decorate_flights() adds, with fixed values """
+    for flight in flights:
+        flight.update({'departure_airport': 'JFK', 'arrival_airport': 'LAX', 'aircraft': 'N123AA',
+                       'stage_length_km': 3974.3, 'estimated_block_minutes': 328,
+                       'crew_members': [{'crew_member_id': 1, 'first_name': 'Ana', 'last_name': 'Diaz',
+                                         'current_role': 'Purser'}]})
+
+
+def respond(provider, description, rows, native, decorate=None):
+    items = serialize_rows(description, rows, native)
+    if decorate:
+        decorate(items)
+    return provider.response(items).get_data()
+
+
+def best_of(repeat, func, *args):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    app.debug = False
+    providers = [('json', DefaultJSONProvider(app), False),
+                 ('orjson', EncoderJSONProvider(app, get_encoder('orjson')), True)]
+    payloads = [('/api/flights', FLIGHT_DESCRIPTION, flight_rows(count), decorate_flights),
+                ('/api/maintenance', MAINTENANCE_DESCRIPTION, maintenance_rows(count), None)]
+
+    print(f"{count} rows, best of {repeat}")
+    for path, description, rows, decorate in payloads:
+        outputs = [json.loads(respond(provider, description, rows[:100], native, decorate))
+                   for _, provider, native in providers]
+        assert all(output == outputs[0] for output in outputs)
+        print(path)
+        baseline = None
+        for name, provider, native in providers:
+            elapsed = best_of(repeat, respond, provider, description, rows, native, decorate)
+            baseline = baseline or elapsed
+            print(f"  {name:7}: {elapsed * 1000:8.1f} ms  ({baseline / elapsed:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
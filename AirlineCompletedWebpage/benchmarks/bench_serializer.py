@@ -0,0 +1,83 @@
+"""
+Micro-benchmark: per-cell serialize_result() vs the precompiled row
+serializer, on a synthetic maintenance_events result set.
+
+    python benchmarks/bench_serializer.py [rows] [repeat]
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from mysql.connector.constants import FieldType
+
+from app import serialize_result
+from serializers import serialize_rows, get_encoder
+
+DESCRIPTION = [
+    ('maintenance_event_id', FieldType.LONG),
+    ('aircraft_id', FieldType.LONG),
+    ('hangar_id', FieldType.LONG),
+    ('maintenance_type', FieldType.VAR_STRING),
+    ('start_date_time', FieldType.DATETIME),
+    ('end_date_time', FieldType.DATETIME),
+    ('maintenance_status', FieldType.STRING),
+    ('description', FieldType.BLOB),
+    ('cost', FieldType.NEWDECIMAL),
+]
+
+
+def make_rows(count):
+    start = datetime(2025, 1, 1, 8, 0)
+    rows = []
+    for i in range(count):
+        begin = start + timedelta(hours=i)
+        end = begin + timedelta(hours=6) if i % 10 else None
+        rows.append((i + 1, i % 300 + 1, i % 12 + 1, 'Routine Check', begin, end,
+                     'Completed', 'General inspection and oil change', Decimal('15000.00')))
+    return rows
+
+
+def legacy_format_results(description, data):
+    columns = [column[0] for column in description]
+    results = []
+    for row in data:
+        results.append(dict(zip(columns, [serialize_result(item) for item in row])))
+    return results
+
+
+def best_of(repeat, func, *args):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rows = make_rows(count)
+
+    assert legacy_format_results(DESCRIPTION, rows[:100]) == serialize_rows(DESCRIPTION, rows[:100])
+
+    legacy = best_of(repeat, legacy_format_results, DESCRIPTION, rows)
+    compiled = best_of(repeat, serialize_rows, DESCRIPTION, rows)
+    items = serialize_rows(DESCRIPTION, rows)
+    stdlib = best_of(repeat, lambda data: json.dumps(data, sort_keys=True), items)
+    fast = best_of(repeat, get_encoder('orjson').dumps, items)
+
+    print(f"{count} rows, best of {repeat}")
+    print(f"  serialize_result per cell : {legacy * 1000:8.1f} ms")
+    print(f"  precompiled row serializer: {compiled * 1000:8.1f} ms  ({legacy / compiled:.2f}x)")
+    print(f"  json.dumps                : {stdlib * 1000:8.1f} ms")
+    print(f"  orjson encoder            : {fast * 1000:8.1f} ms  ({stdlib / fast:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
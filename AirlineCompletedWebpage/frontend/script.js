@@ -4,6 +4,24 @@
 
 const API_URL = 'http://localhost:5000/api';
 
+// Collection routes answer one page at a time (100 rows unless ?limit=,
+// at most 500) and name the next page in the X-Next-Cursor header.
+const PAGE_LIMIT = 500;
+
+// Every row of a collection: the first page, then the cursor of each page.
+async function fetchAll(path) {
+    const rows = [];
+    let url = `${API_URL}${path}`;
+    while (url) {
+        const resp = await fetch(url);
+        if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+        rows.push(...await resp.json());
+        const cursor = resp.headers.get('X-Next-Cursor');
+        url = cursor ? `${API_URL}${path}?limit=${PAGE_LIMIT}&cursor=${encodeURIComponent(cursor)}` : null;
+    }
+    return rows;
+}
+
 // Global edit state
 let editMode = {
     active: false,
@@ -58,35 +76,19 @@ function showView(viewName) {
 // ============================================
 async function loadDashboard() {
     try {
-        const [pilots, crew, flights, aircraft, airports, maintenance] = await Promise.all([
-            fetch(`${API_URL}/pilots`).then(r => r.json()),
-            fetch(`${API_URL}/crew-members`).then(r => r.json()),
-            fetch(`${API_URL}/flights`).then(r => r.json()),
-            fetch(`${API_URL}/aircraft`).then(r => r.json()),
-            fetch(`${API_URL}/airports`).then(r => r.json()),
-            fetch(`${API_URL}/maintenance`).then(r => r.json())
-        ]);
-
-        const pilotsArray = Array.isArray(pilots) ? pilots : [];
-        const crewArray = Array.isArray(crew) ? crew : [];
-        const flightsArray = Array.isArray(flights) ? flights : [];
-        const aircraftArray = Array.isArray(aircraft) ? aircraft : [];
-        const airportsArray = Array.isArray(airports) ? airports : [];
-        const maintenanceArray = Array.isArray(maintenance) ? maintenance : [];
+        const dashboard = await fetch(`${API_URL}/dashboard`).then(r => r.json());
+        const stats = dashboard.stats || {};
 
         // Update main stats
-        document.getElementById('stat-pilots').textContent = pilotsArray.filter(p => p.employment_status === 'Active').length;
-        document.getElementById('stat-crew').textContent = crewArray.filter(c => c.employment_status === 'Active').length;
-        document.getElementById('stat-flights').textContent = flightsArray.filter(f => f.flight_status === 'Scheduled').length;
-        document.getElementById('stat-aircraft').textContent = aircraftArray.filter(a => a.status === 'Operational').length;
-        document.getElementById('stat-airports').textContent = airportsArray.length;
-        document.getElementById('stat-maintenance').textContent = maintenanceArray.filter(m => ['InProgress', 'In Progress'].includes(m.maintenance_status)).length;
-
-        // Upcoming scheduled flights (next 5)
-        const upcomingFlights = flightsArray
-            .filter(f => f.flight_status === 'Scheduled')
-            .sort((a, b) => new Date(a.scheduled_departure_time) - new Date(b.scheduled_departure_time))
-            .slice(0, 5);
+        document.getElementById('stat-pilots').textContent = stats.active_pilots ?? 0;
+        document.getElementById('stat-crew').textContent = stats.active_crew ?? 0;
+        document.getElementById('stat-flights').textContent = stats.scheduled_flights ?? 0;
+        document.getElementById('stat-aircraft').textContent = stats.operational_aircraft ?? 0;
+        document.getElementById('stat-airports').textContent = stats.airports ?? 0;
+        document.getElementById('stat-maintenance').textContent = stats.maintenance_in_progress ?? 0;
+
+        // Upcoming scheduled flights (next 5, computed by the API)
+        const upcomingFlights = Array.isArray(dashboard.upcoming_flights) ? dashboard.upcoming_flights : [];
 
         const upcomingHtml = upcomingFlights.length
             ? upcomingFlights.map(f => `
@@ -98,20 +100,15 @@ async function loadDashboard() {
 
         document.getElementById('upcoming-flights').innerHTML = upcomingHtml;
 
-        // Recent maintenance (last 5)
-        const recentMaint = maintenanceArray
-            .sort((a, b) => new Date(b.start_date_time) - new Date(a.start_date_time))
-            .slice(0, 5);
+        // Recent maintenance (last 5, with tail number already resolved)
+        const recentMaint = Array.isArray(dashboard.recent_maintenance) ? dashboard.recent_maintenance : [];
 
         const maintHtml = recentMaint.length
-            ? recentMaint.map(e => {
-                const ac = aircraftArray.find(a => a.aircraft_id === e.aircraft_id);
-                return `
+            ? recentMaint.map(e => `
                     <div class="data-item">
-                        <strong>${ac ? ac.tail_number : 'N/A'}</strong>
+                        <strong>${e.tail_number || 'N/A'}</strong>
                         <small>${e.maintenance_type} - <span class="status-badge status-${e.maintenance_status.toLowerCase().replace(' ', '-')}">${e.maintenance_status}</span></small>
-                    </div>`;
-            }).join('')
+                    </div>`).join('')
             : '<div class="data-item"><small>No maintenance events</small></div>';
 
         document.getElementById('recent-maintenance').innerHTML = maintHtml;
@@ -127,8 +124,7 @@ async function loadDashboard() {
 // ============================================
 async function loadPilots() {
     try {
-        const response = await fetch(`${API_URL}/pilots`);
-        const pilots = await response.json();
+        const pilots = await fetchAll('/pilots');
         const tbody = document.getElementById('pilots-tbody');
         tbody.innerHTML = pilots.map(pilot => `
             <tr>
@@ -477,10 +473,7 @@ function pilotAddForm() {
 
 async function loadCrewMembers() {
     try {
-        const response = await fetch(`${API_URL}/crew-members`);
-        if (!response.ok) throw new Error(`HTTP ${response.status}`);
-
-        const crew = await response.json();
+        const crew = await fetchAll('/crew-members');
         const tbody = document.getElementById('crew-tbody');
 
         tbody.innerHTML = crew.map(c => `
@@ -713,9 +706,7 @@ async function deleteCrewMember(id) {
 
 async function loadFlights() {
     try {
-        const resp = await fetch(`${API_URL}/flights`);
-        if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
-        const flights = await resp.json();
+        const flights = await fetchAll('/flights');
 
         const tbody = document.getElementById('flights-tbody');
         tbody.innerHTML = flights.map(f => `
@@ -754,10 +745,10 @@ async function showFlightModal() {
     try {
         // Cargar datos para selects incluyendo crew members
         const [airports, aircrafts, pilots, crewMembers] = await Promise.all([
-            fetch(`${API_URL}/airports`).then(r => r.json()),
-            fetch(`${API_URL}/aircraft`).then(r => r.json()),
-            fetch(`${API_URL}/pilots`).then(r => r.json()),
-            fetch(`${API_URL}/crew-members`).then(r => r.json())
+            fetchAll('/airports'),
+            fetchAll('/aircraft'),
+            fetchAll('/pilots'),
+            fetchAll('/crew-members')
         ]);
 
         // Si estamos editando, obtener crew members asignados
@@ -987,7 +978,7 @@ async function deleteFlight(id) {
 
 async function loadAircraft() {
     try {
-        const aircraft = await fetch(`${API_URL}/aircraft`).then(r => r.json());
+        const aircraft = await fetchAll('/aircraft');
         const tbody = document.getElementById('aircraft-tbody');
         tbody.innerHTML = aircraft.map(a => `
             <tr>
@@ -1013,7 +1004,7 @@ async function showAircraftModal() {
 
     try {
         // Cargar aeropuertos para "assigned_base_airport_id"
-        const airports = await fetch(`${API_URL}/airports`).then(r => r.json());
+        const airports = await fetchAll('/airports');
 
         modalBody.innerHTML = `
             <form id="aircraft-form">
@@ -1140,7 +1131,7 @@ async function deleteAircraft(id) {
 
 async function loadAirports() {
     try {
-        const airports = await fetch(`${API_URL}/airports`).then(r => r.json());
+        const airports = await fetchAll('/airports');
         const tbody = document.getElementById('airports-tbody');
         tbody.innerHTML = airports.map(a => `
             <tr>
@@ -1233,8 +1224,8 @@ async function deleteAirport(id) {
 async function loadMaintenance() {
     try {
         const [maintenance, aircraft] = await Promise.all([
-            fetch(`${API_URL}/maintenance`).then(r => r.json()),
-            fetch(`${API_URL}/aircraft`).then(r => r.json())
+            fetchAll('/maintenance'),
+            fetchAll('/aircraft')
         ]);
         const tbody = document.getElementById('maintenance-tbody');
         tbody.innerHTML = maintenance.map(e => {
@@ -1335,10 +1326,10 @@ async function deleteMaintenance(id) {
 async function loadReports() {
     try {
         const [pilots, flights, maintenance, aircraft] = await Promise.all([
-            fetch(`${API_URL}/pilots`).then(r => r.json()),
-            fetch(`${API_URL}/flights`).then(r => r.json()),
-            fetch(`${API_URL}/maintenance`).then(r => r.json()),
-            fetch(`${API_URL}/aircraft`).then(r => r.json())
+            fetchAll('/pilots'),
+            fetchAll('/flights'),
+            fetchAll('/maintenance'),
+            fetchAll('/aircraft')
         ]);
 
         // Flight statistics
@@ -1460,8 +1451,8 @@ async function showAssignCrewModal() {
     try {
         // Cargar vuelos y crew members
         const [flights, crewMembers] = await Promise.all([
-            fetch(`${API_URL}/flights`).then(r => r.json()),
-            fetch(`${API_URL}/crew-members`).then(r => r.json())
+            fetchAll('/flights'),
+            fetchAll('/crew-members')
         ]);
 
         modalBody.innerHTML = `
@@ -0,0 +1,10 @@
+-- =================================================
+-- == MIGRATION 001 - KEYSET PAGINATION INDEXES   ==
+-- =================================================
+-- GET /api/maintenance pages by (start_date_time, maintenance_event_id).
+-- InnoDB appends the primary key to secondary indexes, so an index on
+-- start_date_time alone already covers that sort key.
+
+USE airlinedatabase;
+
+CREATE INDEX idx_start_time ON maintenance_events (start_date_time);
@@ -0,0 +1,19 @@
+-- =================================================
+-- == MIGRATION 002 - TABLE VERSION COUNTERS      ==
+-- =================================================
+-- One counter per table, bumped by the API in the same transaction as
+-- every write. GET endpoints build their ETag from these counters, so a
+-- repeat read can be answered with 304 Not Modified by a primary key
+-- lookup instead of running the listing query.
+
+USE airlinedatabase;
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0
+);
+
+INSERT IGNORE INTO table_versions (table_name) VALUES
+('pilots'), ('cabincrew'), ('airports'), ('aircraft'), ('flights'),
+('flight_crew_assignment'), ('flight_plans'), ('aircraft_parking'),
+('maintenance_hangars'), ('maintenance_events');
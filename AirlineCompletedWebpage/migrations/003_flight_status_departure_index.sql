@@ -0,0 +1,10 @@
+-- =================================================
+-- == MIGRATION 003 - DASHBOARD INDEX             ==
+-- =================================================
+-- /api/dashboard reads the next 5 'Scheduled' flights by departure time.
+-- With (flight_status, scheduled_departure_time) MySQL reads exactly those
+-- 5 index entries instead of sorting every scheduled flight.
+
+USE airlinedatabase;
+
+CREATE INDEX idx_status_departure ON flights (flight_status, scheduled_departure_time);
@@ -0,0 +1,20 @@
+-- =================================================
+-- == MIGRATION 004 - DEPARTURES / ARRIVALS BOARD ==
+-- =================================================
+-- /api/airports/<id>/departures and /arrivals select one airport and a
+-- time range. With the airport first and the time second, both endpoints
+-- are a single index range scan already in board order:
+--
+--   EXPLAIN SELECT ... FROM flights f
+--   WHERE f.departure_airport_id = 1
+--     AND f.scheduled_departure_time >= '2025-11-16 00:00:00'
+--     AND f.scheduled_departure_time <  '2025-11-17 00:00:00'
+--   ORDER BY f.scheduled_departure_time, f.flight_id;
+--
+--   -> type: range, key: idx_departure_board, Extra: Using index condition
+--      (no "Using filesort")
+
+USE airlinedatabase;
+
+CREATE INDEX idx_departure_board ON flights (departure_airport_id, scheduled_departure_time);
+CREATE INDEX idx_arrival_board ON flights (arrival_airport_id, scheduled_arrival_time);
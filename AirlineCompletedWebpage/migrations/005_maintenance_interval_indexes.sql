@@ -0,0 +1,24 @@
+-- =================================================
+-- == MIGRATION 005 - MAINTENANCE WINDOW QUERIES  ==
+-- =================================================
+-- /api/maintenance/window finds events overlapping [from, to):
+--     start_date_time < to AND (end_date_time > from OR end_date_time IS NULL)
+-- On its own that is a scan of every event that started before `to`, i.e.
+-- the whole history. Two access paths keep it bounded:
+--
+-- * Closed events are scanned by start_date_time from a fixed margin
+--   before `from` (MAINTENANCE_WINDOW_SCAN_MINUTES in app.py, plus one
+--   minute as TIMESTAMPDIFF rounds down). Events longer than the margin
+--   are rare; duration_minutes is a stored generated column with an
+--   index, so they are found by a range scan of idx_duration instead of
+--   widening the first scan for every query.
+-- * Open events (end_date_time IS NULL, still ongoing) are found through
+--   idx_open_events, whose first column is end_date_time.
+
+USE airlinedatabase;
+
+ALTER TABLE maintenance_events
+    ADD COLUMN duration_minutes INT
+        GENERATED ALWAYS AS (TIMESTAMPDIFF(MINUTE, start_date_time, end_date_time)) STORED,
+    ADD INDEX idx_duration (duration_minutes),
+    ADD INDEX idx_open_events (end_date_time, start_date_time);
@@ -0,0 +1,32 @@
+-- =================================================
+-- ==   MIGRATION 006 - MAINTENANCE TOTALS        ==
+-- =================================================
+-- /api/aircraft/by-tail/<tail>/maintenance returns the number of events,
+-- their total cost and the last completed check together with each page
+-- of history. Aggregating that on every request reads the whole history
+-- of the aircraft, so the totals are kept per aircraft in
+-- maintenance_totals. The maintenance write handlers lock the row, write
+-- the event and adjust the row in the same transaction (see 011).
+
+USE airlinedatabase;
+
+CREATE TABLE maintenance_totals (
+    aircraft_id INT PRIMARY KEY,
+    event_count INT NOT NULL DEFAULT 0,
+    total_cost DECIMAL(14,2) NOT NULL DEFAULT 0,
+    last_completed_event_id INT,
+    FOREIGN KEY (aircraft_id) REFERENCES aircraft(aircraft_id) ON DELETE CASCADE,
+    FOREIGN KEY (last_completed_event_id) REFERENCES maintenance_events(maintenance_event_id) ON DELETE SET NULL
+);
+
+INSERT INTO maintenance_totals (aircraft_id, event_count, total_cost, last_completed_event_id)
+SELECT
+    e.aircraft_id,
+    COUNT(*),
+    COALESCE(SUM(e.cost), 0),
+    (SELECT c.maintenance_event_id FROM maintenance_events c
+     WHERE c.aircraft_id = e.aircraft_id AND c.maintenance_status = 'Completed'
+     ORDER BY c.end_date_time DESC, c.maintenance_event_id DESC
+     LIMIT 1)
+FROM maintenance_events e
+GROUP BY e.aircraft_id;
@@ -0,0 +1,28 @@
+-- =================================================
+-- ==   MIGRATION 007 - CREW / PILOT SCHEDULES    ==
+-- =================================================
+-- /api/crew-members/<id>/schedule and /api/pilots/<id>/schedule look up
+-- one person's flights in a time window.
+--
+-- * flight_crew_assignment only had UNIQUE (flight_id, crew_member_id),
+--   which cannot be searched by crew member. idx_crew_schedule is
+--   (crew_member_id, flight_id), so the flight ids of a crew member are
+--   read from the index alone and joined to flights by primary key.
+--   Migration 012 replaces it with an index bounded by departure time.
+-- * Pilots are referenced from flights. Person first, then departure and
+--   arrival time, lets each role be one range scan that also has the
+--   arrival time at hand for time overlap queries:
+--
+--   EXPLAIN SELECT flight_id, scheduled_departure_time, scheduled_arrival_time
+--   FROM flights WHERE pilot_command_id = 1
+--     AND scheduled_departure_time >= '2025-11-16' AND scheduled_departure_time < '2025-11-23';
+--
+--   -> type: range, key: idx_pilot_command_schedule, Extra: Using where; Using index
+
+USE airlinedatabase;
+
+CREATE INDEX idx_crew_schedule ON flight_crew_assignment (crew_member_id, flight_id);
+CREATE INDEX idx_pilot_command_schedule
+    ON flights (pilot_command_id, scheduled_departure_time, scheduled_arrival_time);
+CREATE INDEX idx_pilot_first_officer_schedule
+    ON flights (pilot_first_officer_id, scheduled_departure_time, scheduled_arrival_time);
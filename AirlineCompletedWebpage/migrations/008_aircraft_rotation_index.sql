@@ -0,0 +1,19 @@
+-- =================================================
+-- ==   MIGRATION 008 - AIRCRAFT ROTATIONS        ==
+-- =================================================
+-- /api/rotations reads the legs of a window ordered by aircraft and
+-- departure, and for a single aircraft filters on aircraft_id first.
+-- idx_aircraft_rotation returns the rows in exactly that order, so
+-- MySQL needs no filesort. For one aircraft the read is a range scan:
+--
+--   EXPLAIN SELECT ... FROM flights
+--   WHERE aircraft_id = 1
+--     AND scheduled_departure_time >= '2025-11-16' AND scheduled_departure_time < '2025-11-23'
+--   ORDER BY aircraft_id, scheduled_departure_time, flight_id;
+--
+--   -> type: range, key: idx_aircraft_rotation (no "Using filesort")
+
+USE airlinedatabase;
+
+CREATE INDEX idx_aircraft_rotation
+    ON flights (aircraft_id, scheduled_departure_time, scheduled_arrival_time);
@@ -0,0 +1,12 @@
+-- =================================================
+-- ==   MIGRATION 009 - FLIGHT PLANS API          ==
+-- =================================================
+-- /api/flight-plans pages through plans in scheduled_departure_time
+-- order and /api/flight-plans/approval approves or rejects every plan of
+-- a day with one range UPDATE. Both read idx_plan_departure; the
+-- ?approved= filter of the listing uses idx_plan_approval.
+
+USE airlinedatabase;
+
+CREATE INDEX idx_plan_departure ON flight_plans (scheduled_departure_time);
+CREATE INDEX idx_plan_approval ON flight_plans (approved_by_authority, scheduled_departure_time);
@@ -0,0 +1,19 @@
+-- =================================================
+-- ==   MIGRATION 010 - ONE STAND PER AIRCRAFT    ==
+-- =================================================
+-- An aircraft can only be parked (or reserved) on one stand at a time.
+-- The API checks that before writing, but two concurrent requests can
+-- both pass the check. A unique key on aircraft_id makes the second one
+-- fail with a duplicate key error, which the API answers with 409. Empty
+-- stands keep aircraft_id NULL, and a unique key allows any number of
+-- NULLs.
+--
+-- The key cannot be added while an aircraft is on more than one stand.
+-- Find those rows first with:
+--
+--   SELECT aircraft_id, COUNT(*) FROM aircraft_parking
+--   WHERE aircraft_id IS NOT NULL GROUP BY aircraft_id HAVING COUNT(*) > 1;
+
+USE airlinedatabase;
+
+ALTER TABLE aircraft_parking ADD UNIQUE KEY unique_parked_aircraft (aircraft_id);
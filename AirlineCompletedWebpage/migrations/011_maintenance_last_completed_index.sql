@@ -0,0 +1,19 @@
+-- =================================================
+-- ==   MIGRATION 011 - LAST COMPLETED CHECK      ==
+-- =================================================
+-- The maintenance write handlers adjust maintenance_totals from the old
+-- and new values of the event they write, instead of aggregating the
+-- aircraft's whole history again. Only the last completed event has to
+-- be looked up again when a completed event is written. That lookup
+-- walks this index backwards and reads one entry:
+--
+--   EXPLAIN SELECT maintenance_event_id FROM maintenance_events
+--   WHERE aircraft_id = 1 AND maintenance_status = 'Completed'
+--   ORDER BY end_date_time DESC, maintenance_event_id DESC LIMIT 1;
+--
+--   -> type: ref, key: idx_aircraft_completed, Extra: Backward index scan; Using index
+
+USE airlinedatabase;
+
+CREATE INDEX idx_aircraft_completed
+    ON maintenance_events (aircraft_id, maintenance_status, end_date_time);
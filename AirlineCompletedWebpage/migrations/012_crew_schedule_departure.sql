@@ -0,0 +1,51 @@
+-- =================================================
+-- ==   MIGRATION 012 - CREW SCHEDULE BY TIME     ==
+-- =================================================
+-- idx_crew_schedule (crew_member_id, flight_id) of migration 007 has no
+-- time column. A crew member's schedule read every assignment the person
+-- ever had and joined each one to flights before filtering on the date,
+-- so its cost grew with years of history.
+--
+-- flight_crew_assignment now carries a copy of the flight's
+-- scheduled_departure_time, and idx_crew_schedule becomes
+-- (crew_member_id, scheduled_departure_time, flight_id). A schedule is
+-- then one index range scan over the requested window, plus a primary key
+-- lookup in flights for each flight found:
+--
+--   EXPLAIN SELECT ... FROM flight_crew_assignment fca
+--   JOIN flights f ON f.flight_id = fca.flight_id
+--   WHERE fca.crew_member_id = 1
+--     AND fca.scheduled_departure_time >= '2025-11-16' AND fca.scheduled_departure_time < '2025-11-23'
+--   ORDER BY fca.scheduled_departure_time, fca.flight_id;
+--
+--   -> fca: type: range, key: idx_crew_schedule, Extra: Using where; Using index
+--      f:   type: eq_ref, key: PRIMARY
+--
+-- Two triggers keep the copy in step for every writer of the tables:
+-- one fills it when an assignment is inserted, the other follows a
+-- flight whose departure time changes.
+
+USE airlinedatabase;
+
+ALTER TABLE flight_crew_assignment ADD COLUMN scheduled_departure_time DATETIME;
+
+UPDATE flight_crew_assignment fca
+JOIN flights f ON f.flight_id = fca.flight_id
+SET fca.scheduled_departure_time = f.scheduled_departure_time;
+
+ALTER TABLE flight_crew_assignment
+    MODIFY scheduled_departure_time DATETIME NOT NULL,
+    DROP INDEX idx_crew_schedule,
+    ADD INDEX idx_crew_schedule (crew_member_id, scheduled_departure_time, flight_id);
+
+CREATE TRIGGER crew_assignment_departure BEFORE INSERT ON flight_crew_assignment
+FOR EACH ROW
+    SET NEW.scheduled_departure_time =
+        (SELECT scheduled_departure_time FROM flights WHERE flight_id = NEW.flight_id);
+
+CREATE TRIGGER flight_departure_to_crew AFTER UPDATE ON flights
+FOR EACH ROW
+    UPDATE flight_crew_assignment
+    SET scheduled_departure_time = NEW.scheduled_departure_time
+    WHERE flight_id = NEW.flight_id
+      AND scheduled_departure_time <> NEW.scheduled_departure_time;
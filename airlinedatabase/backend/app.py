@@ -5,13 +5,19 @@ Servidor Flask con API REST completa + Frontend
 ============================================
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, g
 from flask_cors import CORS
 import mysql.connector
 from mysql.connector import Error
 from datetime import datetime, date
 from decimal import Decimal
 import os
+import sys
+
+# The connection pool lives in AirlineCompletedWebpage/backend/db_pool.py,
+# shared by every app of the repository.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'AirlineCompletedWebpage', 'backend'))
+from db_pool import ConnectionPool
 
 # Configurar Flask para servir archivos estáticos desde la carpeta frontend
 app = Flask(__name__, 
@@ -30,18 +36,37 @@ DB_CONFIG = {
     'port': 3306
 }
 
+# Pool de conexiones (timeout / max_lifetime en segundos)
+POOL_CONFIG = {
+    'size': 5,
+    'max_overflow': 10,
+    'timeout': 10,
+    'validate': True,
+    'max_lifetime': 1800
+}
+
+db_pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+
 # ============================================
 # FUNCIONES AUXILIARES
 # ============================================
 
 def get_db_connection():
-    """Crear conexión a la base de datos"""
+    """Obtener una conexión del pool"""
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
+        connection = db_pool.get_connection()
     except Error as e:
         print(f"Error conectando a MySQL: {e}")
         return None
+    if g:
+        g.setdefault('db_connections', []).append(connection)
+    return connection
+
+@app.teardown_request
+def release_db_connections(exception=None):
+    """Devolver al pool las conexiones que el handler no cerró"""
+    for connection in g.pop('db_connections', []):
+        connection.close()
 
 def serialize_result(obj):
     """Convertir objetos no serializables a JSON"""
@@ -99,10 +124,16 @@ def api_info():
             'maintenance': '/api/maintenance',
             'hangars': '/api/hangars',
             'parkings': '/api/parkings',
-            'flight_plans': '/api/flight-plans'
+            'flight_plans': '/api/flight-plans',
+            'pool': '/api/pool'
         }
     })
 
+@app.route('/api/pool', methods=['GET'])
+def get_pool_stats():
+    """Estado del pool y tiempo de espera por conexión"""
+    return jsonify(db_pool.stats())
+
 # ============================================
 # ENDPOINTS - PILOTOS
 # ============================================